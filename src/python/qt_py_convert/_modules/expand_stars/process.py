@@ -22,9 +22,9 @@
 """
 The imports module is designed to fix the import statements.
 """
-import traceback
 
-from qt_py_convert.general import ALIAS_DICT, change, supported_binding
+from qt_py_convert import binding_catalog
+from qt_py_convert.general import change, supported_binding
 from qt_py_convert.color import color_text, ANSI
 from qt_py_convert.log import get_logger
 
@@ -35,7 +35,7 @@ EXPAND_STARS_LOG = get_logger("expand_stars")
 class Processes(object):
     """Processes class for expand_stars"""
     @staticmethod
-    def _get_children(binding, levels=None):
+    def _get_children(binding, levels=None, names=None):
         """
         You have done the following:
         >>> from <binding>.<levels> import *
@@ -46,51 +46,51 @@ class Processes(object):
 
         But I don't know what the heck you used in the *
         So I am just getting everything bootstrapped in. Sorry-not-sorry
+
+        The members come from the binding_catalog, so the binding is only
+        imported the first time a submodule is seen.
+
+        :param binding: The binding that is star imported from.
+        :type binding: str
+        :param levels: The submodules that are star imported.
+        :type levels: None|list[str...]
+        :param names: Only map the members with these names, see
+            referenced_names. All of the members are mapped when None.
+        :type names: None|set[str...]
+        :return: The member name to "<module>.<member>" mappings.
+        :rtype: dict
         """
-        def _module_filtering(key):
-            import __builtin__
-            if key.startswith("__"):
-                return False
-            elif key in dir(__builtin__):
-                return False
-            return True
-
-        def _members(_mappings, _module_, module_name):
-            members = filter(_module_filtering, dir(_module))
+        def _members(module_name, members):
+            if names is not None:
+                members = names.intersection(members)
             for member in members:
                 mappings[member] = "{mod}.{member}".format(
-                    mod=module_name,
-                    member=member
+                    mod=module_name, member=member
                 )
 
         mappings = {}
-        if levels is None:
-            levels = []
+        module_name = binding
         try:
-            _temp = __import__(binding, fromlist=levels)
+            if not levels:
+                _members(binding, binding_catalog.members(binding))
+            for level in levels or []:
+                module_name = "{binding}.{level}".format(
+                    binding=binding, level=level
+                )
+                _members(level, binding_catalog.members(binding, level))
         except ImportError as err:
-            strerr = str(err).replace("No module named", "")
-
             msg = (
                 "Attempting to resolve a * import from the {mod} "
                 "module failed.\n"
                 "This is usually because the module could not be imported. "
                 "Please check that this script can import it. The error was:\n"
                 "{err}"
-            ).format(mod=strerr, err=str(err))
-            traceback.print_exc()
+            ).format(mod=module_name, err=err)
             raise ImportError(msg)
-        if not levels:
-            _module = _temp
-            _members(mappings, _module, module_name=binding)
-        else:
-            for level in levels:
-                _module = getattr(_temp, level)
-                _members(mappings, _module, module_name=level)
         return mappings
 
     @classmethod
-    def _process_star(cls, red, stars, skip_lineno=False):
+    def _process_star(cls, red, stars, skip_lineno=False, names=None):
         """
         _process_star is designed to replace from X import * methods.
 
@@ -98,6 +98,8 @@ class Processes(object):
         :type red: redbardon.RedBaron
         :param stars: List of redbaron nodes that matched for this proc.
         :type stars: list
+        :param names: The names used in the module, see referenced_names.
+        :type names: None|set[str...]
         """
         mappings = {}
         for star in stars:
@@ -109,7 +111,9 @@ class Processes(object):
             if len(star.parent.value) > 2:
                 pass
 
-            children = cls._get_children(binding.dumps(), second_level_modules)
+            children = cls._get_children(
+                binding.dumps(), second_level_modules, names=names
+            )
             if second_level_modules is None:
                 second_level_modules = children
             text = "from {binding} import {slm}".format(
@@ -151,12 +155,41 @@ def star_process(store):
     return filter_function
 
 
-def process(red, skip_lineno=False, **kwargs):
+def referenced_names(red):
+    """
+    referenced_names collects the names that a star import could have
+    brought into the module. That is every name that is not an attribute of
+    something else and not part of an import, the same names that
+    _convert_body would replace.
+
+    :param red: Redbaron ast.
+    :type red: redbaron.redbaron
+    :return: The names used in the module.
+    :rtype: set[str...]
+    """
+    imported = set()
+    for import_node in red.find_all(("ImportNode", "FromImportNode")):
+        imported.update(id(node) for node in import_node.find_all("NameNode"))
+    names = set()
+    for node in red.find_all("NameNode"):
+        if id(node) in imported:
+            continue
+        parent = node.parent
+        if getattr(parent, "type", None) == "atomtrailers" and \
+                parent.value[0] is not node:
+            continue
+        names.add(node.value)
+    return names
+
+
+def process(red, context, skip_lineno=False, stars=None, **kwargs):
     """
     process is the main function for the import process.
 
     :param red: Redbaron ast.
     :type red: redbaron.redbaron
+    :param context: The state of the current conversion.
+    :type context: qt_py_convert.general.ConversionContext
     :param skip_lineno: An optional performance flag. By default, when the
         script replaces something, it will tell you which line it is
         replacing on. This can be useful for tracking the places that
@@ -164,6 +197,9 @@ def process(red, skip_lineno=False, **kwargs):
         show the line numbers. This can give great performance increases
         because redbaron has trouble calculating the line number sometimes.
     :type skip_lineno: bool
+    :param stars: The star imported FromImportNode values, if the caller has
+        found them already. Otherwise the tree is searched for them.
+    :type stars: None|list
     :param kwargs: Any other kwargs will be ignored.
     :type kwargs: dict
     """
@@ -174,13 +210,15 @@ def process(red, skip_lineno=False, **kwargs):
         text="\"import star\" used. We are bootstrapping code!",
         color=ANSI.colors.red,
     ))
-    EXPAND_STARS_LOG.warning(color_text(
-        text="This will be very slow. It's your own fault.",
-        color=ANSI.colors.red,
-    ))
-    values = red.find_all("FromImportNode", value=star_process(issues))
+    if stars is None:
+        red.find_all("FromImportNode", value=star_process(issues))
+    else:
+        issues[Processes.EXPAND_STR].update(stars)
 
+    # Only the members that are used get a mapping, instead of the
+    #   thousands that a Qt module has.
     mappings = getattr(Processes, Processes.EXPAND_STR)(
-        red, issues[Processes.EXPAND_STR], skip_lineno=skip_lineno
+        red, issues[Processes.EXPAND_STR], skip_lineno=skip_lineno,
+        names=referenced_names(red)
     )
-    return ALIAS_DICT, mappings
+    return context, mappings
@@ -23,7 +23,7 @@
 The from_imports module is designed to fix the from import statements.
 """
 from qt_py_convert._modules.expand_stars import process as stars_process
-from qt_py_convert.general import __supported_bindings__, ALIAS_DICT, change, \
+from qt_py_convert.general import __supported_bindings__, change, \
     supported_binding
 from qt_py_convert.log import get_logger
 
@@ -54,7 +54,7 @@ class Processes(object):
         node.replace(text)
 
     @classmethod
-    def _process_import(cls, red, objects, skip_lineno=False):
+    def _process_import(cls, red, objects, context, skip_lineno=False):
         """
         _process_import is designed to replace from import methods.
 
@@ -62,10 +62,12 @@ class Processes(object):
         :type red: redbardon.RedBaron
         :param objects: List of redbaron nodes that matched for this proc.
         :type objects: list
+        :param context: The state of the current conversion.
+        :type context: qt_py_convert.general.ConversionContext
         :param skip_lineno: Global "skip_lineno" flag.
         :type skip_lineno: bool
         """
-        binding_aliases = ALIAS_DICT
+        binding_aliases = context
         mappings = {}
 
         # Replace each node
@@ -88,11 +90,8 @@ class Processes(object):
                 if _from_as_name.type in IGNORED_IMPORT_TARGETS:
                     continue
                 if _from_as_name.type == "star":
-                    # TODO: Make this a flag and make use the expand module.
-                    _, star_mappings = stars_process(
-                        red
-                    )
-                    mappings.update(star_mappings)
+                    # Already expanded for the whole tree, see process.
+                    continue
                 else:
                     key = _from_as_name.target or _from_as_name.value
                     value = ".".join(from_import_parts)+"."+_from_as_name.value
@@ -148,12 +147,14 @@ def import_process(store):
     return filter_function
 
 
-def process(red, skip_lineno=False, **kwargs):
+def process(red, context, skip_lineno=False, **kwargs):
     """
     process is the main function for the import process.
 
     :param red: Redbaron ast.
     :type red: redbaron.redbaron
+    :param context: The state of the current conversion.
+    :type context: qt_py_convert.general.ConversionContext
     :param skip_lineno: An optional performance flag. By default, when the
         script replaces something, it will tell you which line it is
         replacing on. This can be useful for tracking the places that
@@ -171,7 +172,24 @@ def process(red, skip_lineno=False, **kwargs):
 
     key = Processes.FROM_IMPORT_STR
 
-    if issues[key]:
-        return getattr(Processes, key)(red, issues[key], skip_lineno=skip_lineno)
-    else:
-        return ALIAS_DICT, {}
+    if not issues[key]:
+        return context, {}
+
+    # Every star import in the tree is expanded in one go, before the
+    #   imports are replaced.
+    stars = [
+        node for node, _ in issues[key]
+        if any(target.type == "star" for target in node.parent.targets)
+    ]
+    star_mappings = {}
+    if stars:
+        _, star_mappings = stars_process(
+            red, context, skip_lineno=skip_lineno, stars=stars
+        )
+
+    context, mappings = getattr(Processes, key)(
+        red, issues[key], context, skip_lineno=skip_lineno
+    )
+    # Names that were imported explicitly win over the star imported ones.
+    star_mappings.update(mappings)
+    return context, star_mappings
@@ -22,7 +22,7 @@
 """
 The imports module is designed to fix the import statements.
 """
-from qt_py_convert.general import __supported_bindings__, ALIAS_DICT, change, \
+from qt_py_convert.general import __supported_bindings__, change, \
     supported_binding
 from qt_py_convert.log import get_logger
 
@@ -47,7 +47,7 @@ class Processes(object):
         node.replace(replacement)
 
     @classmethod
-    def _process_import(cls, red, objects, skip_lineno=False):
+    def _process_import(cls, red, objects, context, skip_lineno=False):
         """
         _process_import is designed to replace import methods.
 
@@ -55,10 +55,12 @@ class Processes(object):
         :type red: redbardon.RedBaron
         :param objects: List of redbaron nodes that matched for this proc.
         :type objects: list
+        :param context: The state of the current conversion.
+        :type context: qt_py_convert.general.ConversionContext
         :param skip_lineno: Global "skip_lineno" flag.
         :type skip_lineno: bool
         """
-        binding_aliases = ALIAS_DICT
+        binding_aliases = context
         mappings = {}
 
         # Replace each node
@@ -154,12 +156,14 @@ def import_process(store):
     return filter_function
 
 
-def process(red, skip_lineno=False, **kwargs):
+def process(red, context, skip_lineno=False, **kwargs):
     """
     process is the main function for the import process.
 
     :param red: Redbaron ast.
     :type red: redbaron.redbaron
+    :param context: The state of the current conversion.
+    :type context: qt_py_convert.general.ConversionContext
     :param skip_lineno: An optional performance flag. By default, when the
         script replaces something, it will tell you which line it is
         replacing on. This can be useful for tracking the places that
@@ -177,6 +181,8 @@ def process(red, skip_lineno=False, **kwargs):
     key = Processes.IMPORT_STR
 
     if issues[key]:
-        return getattr(Processes, key)(red, issues[key], skip_lineno=skip_lineno)
+        return getattr(Processes, key)(
+            red, issues[key], context, skip_lineno=skip_lineno
+        )
     else:
-        return ALIAS_DICT, {}
+        return context, {}
@@ -24,15 +24,22 @@ _qsignal module has helper replacement methods for the psep0101 qsignal
 replacement methods.
 
 It uses _c_args to attempt o parse C style args from api v1.0
-"""
-import re
 
+The calls are found with a single scan of the text that pairs up the brackets
+and records the top level commas, so a connect statement is never walked more
+than once no matter how long it gets.
+"""
 from qt_py_convert._modules.psep0101._c_args import parse_args
 
 
-def _connect_repl(match_obj, explicit=False):
+_OPENERS = "([{"
+_CLOSERS = ")]}"
+_QUOTES = "\"'"
+
+
+def _connect_repl(groups, explicit=False):
     template = r"{owner}.{signal}.connect({slot})"
-    groups = match_obj.groupdict()
+    groups = dict(groups)
     if "strslot" in groups and groups["strslot"]:
         template = template.replace("{slot}", "{slot_owner}.{strslot}")
 
@@ -48,9 +55,9 @@ def _connect_repl(match_obj, explicit=False):
     return template.format(**groups)
 
 
-def _disconnect_repl(match_obj, explicit=False):
+def _disconnect_repl(groups, explicit=False):
     template = r"{owner}.{signal}.disconnect({slot})"
-    groups = match_obj.groupdict()
+    groups = dict(groups)
     if "strslot" in groups and groups["strslot"]:
         template = template.replace("{slot}", "{root}.{strslot}")
 
@@ -61,9 +68,9 @@ def _disconnect_repl(match_obj, explicit=False):
     return template.format(**groups)
 
 
-def _emit_repl(match_obj, explicit=False):
+def _emit_repl(groups, explicit=False):
     template = r"{owner}.{signal}.emit({args})"
-    groups = match_obj.groupdict()
+    groups = dict(groups)
 
     if "owner" not in groups or not groups["owner"]:
         template = template.replace("{owner}", "{root}")
@@ -76,33 +83,284 @@ def _emit_repl(match_obj, explicit=False):
     return template.format(**groups)
 
 
+def _scan(text):
+    """
+    _scan walks the text once, skipping over strings and comments.
+
+    :param text: Text of the statement.
+    :type text: str
+    :return: The index of the matching closing bracket for every opening one,
+        the top level commas inside of each bracket and the brackets that
+        have a comment somewhere inside of them.
+    :rtype: tuple[dict,dict,set]
+    """
+    closing = {}
+    commas = {}
+    commented = set()
+    stack = []
+    index = 0
+    length = len(text)
+    while index < length:
+        char = text[index]
+        if char in _QUOTES:
+            quote = char * 3 if text.startswith(char * 3, index) else char
+            index += len(quote)
+            while index < length:
+                if text[index] == "\\":
+                    index += 2
+                elif text.startswith(quote, index):
+                    index += len(quote)
+                    break
+                elif len(quote) == 1 and text[index] == "\n":
+                    break
+                else:
+                    index += 1
+            continue
+        if char == "#":
+            if stack:
+                commented.add(stack[-1])
+            index = text.find("\n", index)
+            if index == -1:
+                break
+            continue
+        if char in _OPENERS:
+            stack.append(index)
+            commas[index] = []
+        elif char in _CLOSERS:
+            if stack:
+                opened = stack.pop()
+                closing[opened] = index
+                if opened in commented and stack:
+                    commented.add(stack[-1])
+        elif char == "," and stack:
+            commas[stack[-1]].append(index)
+        index += 1
+    return closing, commas, commented
+
+
+def _calls(text, method):
+    """
+    _calls finds every "root.method(...)" call in the text.
+
+    :param text: Text of the statement.
+    :type text: str
+    :param method: Name of the method, "connect", "disconnect" or "emit".
+    :type method: str
+    :return: The start of the call, the root that the method is called on
+        (None if it is not a plain dotted name), the index of the closing
+        bracket and the text of each argument.
+    :rtype: Iterator[tuple[int,str|None,int,list[str...]]]
+    """
+    closing, commas, commented = _scan(text)
+    needle = "." + method
+    position = text.find(needle)
+    while position != -1:
+        opened = position + len(needle)
+        while opened < len(text) and text[opened].isspace():
+            opened += 1
+        if text.startswith("(", opened) and opened in closing and \
+                opened not in commented:
+            start = position
+            while start and (text[start - 1].isalnum() or
+                             text[start - 1] in "_."):
+                start -= 1
+            bounds = [opened] + commas[opened] + [closing[opened]]
+            arguments = [
+                text[bounds[index] + 1:bounds[index + 1]]
+                for index in range(len(bounds) - 1)
+            ]
+            yield start, text[start:position] or None, closing[opened], \
+                arguments
+        position = text.find(needle, opened)
+
+
+def _unwrap(argument, function):
+    """
+    _unwrap reads the signature out of a SIGNAL("name(args)") or
+    SLOT("name(args)") call, optionally wrapped in _fromUtf8.
+
+    :return: The signature or None if the argument is not that call.
+    :rtype: str|None
+    """
+    if argument.startswith("QtCore."):
+        argument = argument[len("QtCore."):]
+    if not argument.startswith(function):
+        return None
+    argument = argument[len(function):].lstrip()
+    if not (argument.startswith("(") and argument.endswith(")")):
+        return None
+    argument = argument[1:-1].strip()
+    if argument.startswith("_fromUtf8"):
+        wrapped = argument[len("_fromUtf8"):].lstrip()
+        if wrapped.startswith("(") and wrapped.endswith(")"):
+            argument = wrapped[1:-1].strip()
+    if len(argument) < 2 or argument[0] not in _QUOTES or \
+            argument[-1] not in _QUOTES:
+        return None
+    signature = argument[1:-1]
+    for quote in _QUOTES:
+        if quote in signature:
+            return None
+    return signature
+
+
+def _split_signature(signature, require_args=False):
+    """
+    _split_signature splits "name(args)" into the name and the args.
+
+    :return: name and args (None if there are no brackets) or None if the
+        name is not a valid identifier.
+    :rtype: tuple[str,str|None]|None
+    """
+    opened = signature.find("(")
+    if opened == -1:
+        if require_args:
+            return None
+        name, args = signature, None
+    else:
+        if not signature.endswith(")"):
+            return None
+        name = signature[:opened].rstrip()
+        args = signature[opened + 1:-1]
+    if not name or not (name.replace("_", "a").isalnum()):
+        return None
+    return name, args
+
+
+def _find_signal(arguments, require_args=False):
+    """
+    _find_signal finds the first argument that is a SIGNAL call.
+
+    :return: The index of the argument, the signal name and its args.
+    :rtype: tuple[int,str,str|None]|None
+    """
+    for index, argument in enumerate(arguments):
+        signature = _unwrap(argument.strip(), "SIGNAL")
+        if signature is None:
+            continue
+        split = _split_signature(signature, require_args=require_args)
+        if split is None:
+            return None
+        return (index,) + split
+    return None
+
+
+def _rewrite(function_str, method, build):
+    """
+    _rewrite replaces every call of "method" that "build" knows how to
+    convert.
+
+    :param build: Takes the root and arguments of a call and returns the
+        replacement or None to leave the call alone. The arguments are
+        stripped, except for those after the signal, which are passed on as
+        they were written.
+    :type build: Callable
+    """
+    pieces = []
+    last = 0
+    for start, root, closed, arguments in _calls(function_str, method):
+        if start < last:
+            continue
+        replacement = build(root, arguments)
+        if replacement is None:
+            continue
+        pieces.append(function_str[last:start])
+        pieces.append(replacement)
+        last = closed + 1
+    if not pieces:
+        return function_str
+    pieces.append(function_str[last:])
+    return "".join(pieces)
+
+
+def _join(arguments):
+    return ",".join(arguments).strip()
+
+
+def _build_connect(root, arguments, explicit):
+    if arguments and not arguments[-1].strip():  # Trailing comma.
+        arguments = arguments[:-1]
+    found = _find_signal(arguments)
+    if found is None:
+        return None
+    index, signal, signal_args = found
+    groups = {
+        "root": root, "signal": signal, "signal_args": signal_args,
+        "owner": _join(arguments[:index]) or None,
+        "slot_owner": None, "strslot": None, "slot_args": None, "slot": None,
+    }
+    rest = arguments[index + 1:]
+    if not rest:
+        return None
+    slot_signature = _unwrap(rest[-1].strip(), "SLOT")
+    if slot_signature is not None:
+        split = _split_signature(slot_signature, require_args=True)
+        if split is None:
+            return None
+        groups["strslot"], groups["slot_args"] = split
+        groups["slot_owner"] = _join(rest[:-1]) or None
+        if not groups["slot_owner"] and not root:
+            return None
+    else:
+        groups["slot"] = _join(rest)
+    if not groups["owner"] and not root:
+        return None
+    return _connect_repl(groups, explicit=explicit)
+
+
+def _build_disconnect(root, arguments, explicit):
+    if arguments and not arguments[-1].strip():  # Trailing comma.
+        arguments = arguments[:-1]
+    found = _find_signal(arguments, require_args=True)
+    if found is None or not found[0]:
+        return None
+    index, signal, signal_args = found
+    groups = {
+        "root": root, "signal": signal,
+        "signal_args": signal_args.rstrip(),
+        "owner": _join(arguments[:index]),
+        "slot_owner": None, "strslot": None, "slot_args": None, "slot": None,
+    }
+    rest = arguments[index + 1:]
+    if not rest:
+        return None
+    slot_signature = _unwrap(rest[-1].strip(), "SLOT")
+    if slot_signature is not None:
+        split = _split_signature(slot_signature, require_args=True)
+        if split is None or not root:
+            return None
+        groups["strslot"], groups["slot_args"] = split
+        groups["slot_owner"] = _join(rest[:-1]) or None
+    else:
+        groups["slot"] = _join(rest)
+    return _disconnect_repl(groups, explicit=explicit)
+
+
+def _build_emit(root, arguments, explicit):
+    found = _find_signal(arguments)
+    if found is None:
+        return None
+    index, signal, signal_args = found
+    owner = _join(arguments[:index]) or None
+    if not owner and not root:
+        return None
+    groups = {
+        "root": root, "owner": owner, "signal": signal,
+        "signal_args": signal_args,
+        "args": _join(arguments[index + 1:]),
+    }
+    return _emit_repl(groups, explicit=explicit)
+
+
 def process_connect(function_str, explicit=False):
-    SIGNAL_RE = re.compile(
-        r"""
-(?P<root>[\w\.]+)?\.connect(?:\s+)?\((?:[\s\n]+)?
-
-# Making the owner optional. 
-# _connect_repl has been updated to use root if owner is missing.
-(?:(?P<owner>.*?),(?:[\s\n]+)?)?   
-
-(?:QtCore\.)?SIGNAL(?:\s+)?(?:\s+)?\((?:[\s\n]+)?(?:_fromUtf8(?:\s+)?\()?(?:[\s\n]+)?[\'\"](?P<signal>\w+)(?:(?:\s+)?\((?P<signal_args>.*?)\))?[\'\"](?:[\s\n]+)?\)?(?:[\s\n]+)?\),(?:[\s\n]+)?
-
-  # Either QtCore.SLOT("thing()") or an actual callable in scope.
-  # If it is the former, we are assuming that the str name is owned by root.
-    (?:(?:(?P<slot_owner>.*>?),(?:[\s\n]+)?)?(?:(?:QtCore\.)?SLOT(?:\s+)?\((?:[\s\n]+)?(?:_fromUtf8(?:\s+)?\()?(?:[\s\n]+)?[\'\"](?P<strslot>.*?)(?:\s+)?\((?P<slot_args>.*?)\)[\'\"](?:[\s\n]+)?\)?(?:[\s\n]+)?\))
-  |
-    (?:(?:[\s\n]+)?(?P<slot>.*?)(?:,)?(?:[\s\n]+)?))
-\)""",
-        re.VERBOSE | re.MULTILINE
-    )
-    # match = SIGNAL_RE.search(function_str)
-    replacement_str = SIGNAL_RE.sub(
-        lambda match: _connect_repl(match, explicit=explicit),
-        function_str
+    """
+    'self.connect(self, QtCore.SIGNAL("textChanged()"), self.slot_textChanged)',
+    "self.textChanged.connect(self.slot_textChanged)"
+    """
+    return _rewrite(
+        function_str, "connect",
+        lambda root, arguments: _build_connect(root, arguments, explicit)
     )
-    if replacement_str != function_str:
-        return replacement_str
-    return function_str
 
 
 def process_disconnect(function_str, explicit=False):
@@ -110,45 +368,18 @@ def process_disconnect(function_str, explicit=False):
     'self.disconnect(self, QtCore.SIGNAL("textChanged()"), self.slot_textChanged)',
     "self.textChanged.disconnect(self.slot_textChanged)"
     """
-    SIGNAL_RE = re.compile(
-        r"""
-(?P<root>[\w\.]+)?\.disconnect(?:\s+)?\((?:[\s\n]+)?
-(?P<owner>.*?),(?:[\s\n]+)?
-(?:QtCore\.)?SIGNAL(?:\s+)?\((?:[\s\n]+)?(?:_fromUtf8(?:\s+)?(?:\s+)?\()?(?:[\s\n]+)?[\'\"](?P<signal>\w+)(?:\s+)?\((?P<signal_args>.*?)(?:\s+)?\)[\'\"](?:[\s\n]+)?\)?(?:[\s\n]+)?\),(?:[\s\n]+)?
-
-  # Either QtCore.SLOT("thing()") or an actual callable in scope.
-  # If it is the former, we are assuming that the str name is owned by root.
-    (?:(?:(?P<slot_owner>.*>?),(?:[\s\n]+)?)?(?:(?:QtCore\.)?SLOT(?:\s+)?\((?:[\s\n]+)?(?:_fromUtf8(?:\s+)?\()?(?:[\s\n]+)?[\'\"](?P<strslot>.*?)(?:\s+)?\((?P<slot_args>.*?)(?:\s+)?\)[\'\"](?:[\s\n]+)?\)?(?:[\s\n]+)?\))
-  |
-    (?:(?:[\s\n]+)?(?P<slot>.*?)(?:,)?(?:[\s\n]+)?))
-(?:\s+)?\)""",
-        re.VERBOSE
-    )
-    replacement_str = SIGNAL_RE.sub(
-        lambda match: _disconnect_repl(match, explicit=explicit),
-        function_str
+    return _rewrite(
+        function_str, "disconnect",
+        lambda root, arguments: _build_disconnect(root, arguments, explicit)
     )
-    if replacement_str != function_str:
-        return replacement_str
-    return function_str
 
 
 def process_emit(function_str, explicit=False):
-    SIGNAL_RE = re.compile(
-        r"""
-(?P<root>[\w\.]+)?\.emit(?:\s+)?\((?:[\s\n]+)?
-(?:(?P<owner>.*?),(?:[\s\n]+)?)?
-(?:QtCore\.)?SIGNAL(?:\s+)?(?:\s+)?\((?:[\s\n]+)?(?:_fromUtf8(?:\s+)?\()?(?:[\s\n]+)?[\'\"](?P<signal>\w+)(?:(?:\s+)?\((?P<signal_args>.*?)\))?[\'\"](?:[\s\n]+)?\)?(?:[\s\n]+)?\)
-
-  # Getting the args.
-(?:,(?:[\s\n]+)?(?:[\s\n]+)?(?P<args>.*)
-(?:\s+)?)?(?:[\s\n]+)?(?:\s+)?\)""",
-        re.VERBOSE
-    )
-    replacement_str = SIGNAL_RE.sub(
-        lambda match: _emit_repl(match, explicit=explicit),
-        function_str
+    """
+    'self.emit(QtCore.SIGNAL("textChanged()"), text)',
+    "self.textChanged.emit(text)"
+    """
+    return _rewrite(
+        function_str, "emit",
+        lambda root, arguments: _build_emit(root, arguments, explicit)
     )
-    if replacement_str != function_str:
-        return replacement_str
-    return function_str
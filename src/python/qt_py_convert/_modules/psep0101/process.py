@@ -33,6 +33,7 @@ import sys
 
 from qt_py_convert.general import change, ErrorClass
 from qt_py_convert.log import get_logger
+from qt_py_convert.visitor import TreeVisitor
 from qt_py_convert._modules.psep0101 import _qsignal
 from qt_py_convert._modules.psep0101 import _conversion_methods
 
@@ -50,7 +51,7 @@ text_type = str if sys.version_info[0] == 3 else unicode
 class Processes(object):
     """Processes class for psesp0101"""
     @staticmethod
-    def _process_qvariant(red, objects, skip_lineno=False, **kwargs):
+    def _process_qvariant(red, objects, context, visitor, skip_lineno=False, **kwargs):
         """
         _process_qvariant is designed to replace QVariant code.
 
@@ -58,6 +59,10 @@ class Processes(object):
         :type red: redbardon.RedBaron
         :param objects: List of redbaron nodes that matched for this proc.
         :type objects: list
+        :param context: The state of the current conversion.
+        :type context: qt_py_convert.general.ConversionContext
+        :param visitor: The tree visitor for the current conversion.
+        :type visitor: qt_py_convert.visitor.TreeVisitor
         :param skip_lineno: Global "skip_lineno" flag.
         :type skip_lineno: bool
         """
@@ -67,7 +72,7 @@ class Processes(object):
 
         # Replace each node
         for node in objects:
-            raw = node.parent.dumps()
+            raw = visitor.dumps(node.parent)
             matched = qvariant_expr.search(raw)
             if matched:
                 if not matched.groupdict()["is_instance"]:
@@ -76,6 +81,7 @@ class Processes(object):
                     #   resolved in api 2.0.
                     # We are adding it to warnings and continuing on.
                     ErrorClass.from_node(
+                        context=context,
                         node=node,
                         reason="""
 As of api v2.0, there is no concept of a "QVariant" object.
@@ -109,10 +115,10 @@ You will probably want to remove the usage of this entirely."""
                         replacement=changed.strip(" "),
                         skip_lineno=skip_lineno,
                     )
-                    node.parent.replace(changed.strip(" "))
+                    visitor.replace(node.parent, changed.strip(" "))
 
     @staticmethod
-    def _process_qstring(red, objects, skip_lineno=False, **kwargs):
+    def _process_qstring(red, objects, context, visitor, skip_lineno=False, **kwargs):
         """
         _process_qstring is designed to replace QString code.
 
@@ -120,12 +126,16 @@ You will probably want to remove the usage of this entirely."""
         :type red: redbardon.RedBaron
         :param objects: List of redbaron nodes that matched for this proc.
         :type objects: list
+        :param context: The state of the current conversion.
+        :type context: qt_py_convert.general.ConversionContext
+        :param visitor: The tree visitor for the current conversion.
+        :type visitor: qt_py_convert.visitor.TreeVisitor
         :param skip_lineno: Global "skip_lineno" flag.
         :type skip_lineno: bool
         """
         # Replace each node
         for node in objects:
-            raw = node.parent.dumps()
+            raw = visitor.dumps(node.parent)
             changed = re.sub(
                 r"((?:QtCore\.)?QString(?:\.fromUtf8)?)",
                 text_type.__name__,
@@ -139,10 +149,10 @@ You will probably want to remove the usage of this entirely."""
                     skip_lineno=skip_lineno,
                 )
 
-                node.parent.replace(changed)
+                visitor.replace(node.parent, changed)
 
     @staticmethod
-    def _process_qstringlist(red, objects, skip_lineno=False, **kwargs):
+    def _process_qstringlist(red, objects, context, visitor, skip_lineno=False, **kwargs):
         """
         _process_qstringlist is designed to replace QStringList code.
 
@@ -150,6 +160,10 @@ You will probably want to remove the usage of this entirely."""
         :type red: redbardon.RedBaron
         :param objects: List of redbaron nodes that matched for this proc.
         :type objects: list
+        :param context: The state of the current conversion.
+        :type context: qt_py_convert.general.ConversionContext
+        :param visitor: The tree visitor for the current conversion.
+        :type visitor: qt_py_convert.visitor.TreeVisitor
         :param skip_lineno: Global "skip_lineno" flag.
         :type skip_lineno: bool
         """
@@ -157,7 +171,7 @@ You will probably want to remove the usage of this entirely."""
         #       Probably just need support for construction and isinstance.
         # Replace each node
         for node in objects:
-            raw = node.parent.dumps()
+            raw = visitor.dumps(node.parent)
             changed = re.sub(
                 r"((?:QtCore\.)?QStringList)",
                 "list",
@@ -171,10 +185,10 @@ You will probably want to remove the usage of this entirely."""
                     skip_lineno=skip_lineno,
                 )
 
-                node.parent.replace(changed)
+                visitor.replace(node.parent, changed)
 
     @staticmethod
-    def _process_qchar(red, objects, skip_lineno=False, **kwargs):
+    def _process_qchar(red, objects, context, visitor, skip_lineno=False, **kwargs):
         """
         _process_qchar is designed to replace QChar code.
 
@@ -182,12 +196,16 @@ You will probably want to remove the usage of this entirely."""
         :type red: redbardon.RedBaron
         :param objects: List of redbaron nodes that matched for this proc.
         :type objects: list
+        :param context: The state of the current conversion.
+        :type context: qt_py_convert.general.ConversionContext
+        :param visitor: The tree visitor for the current conversion.
+        :type visitor: qt_py_convert.visitor.TreeVisitor
         :param skip_lineno: Global "skip_lineno" flag.
         :type skip_lineno: bool
         """
         # Replace each node
         for node in objects:
-            raw = node.parent.dumps()
+            raw = visitor.dumps(node.parent)
             changed = re.sub(
                 r"((?:QtCore\.)?QChar)",
                 text_type.__name__,
@@ -201,10 +219,10 @@ You will probably want to remove the usage of this entirely."""
                     skip_lineno=skip_lineno,
                 )
 
-                node.parent.replace(changed)
+                visitor.replace(node.parent, changed)
 
     @staticmethod
-    def _process_to_methods(red, objects, skip_lineno=False, **kwargs):
+    def _process_to_methods(red, objects, context, visitor, skip_lineno=False, **kwargs):
         """
         Attempts at fixing the "toString" "toBool" "toPyObject" etc
         PyQt4-apiv1.0 helper methods.
@@ -213,11 +231,15 @@ You will probably want to remove the usage of this entirely."""
         :type red: redbardon.RedBaron
         :param objects: List of redbaron nodes that matched for this proc.
         :type objects: list
+        :param context: The state of the current conversion.
+        :type context: qt_py_convert.general.ConversionContext
+        :param visitor: The tree visitor for the current conversion.
+        :type visitor: qt_py_convert.visitor.TreeVisitor
         :param skip_lineno: Global "skip_lineno" flag.
         :type skip_lineno: bool
         """
         for node in objects:
-            raw = node.parent.dumps()
+            raw = visitor.dumps(node.parent)
             changed = _conversion_methods.to_methods(raw)
             if changed != raw:
                     change(
@@ -227,11 +249,11 @@ You will probably want to remove the usage of this entirely."""
                         skip_lineno=skip_lineno,
                     )
 
-                    node.parent.replace(changed)
+                    visitor.replace(node.parent, changed)
                     continue
 
     @staticmethod
-    def _process_qsignal(red, objects, skip_lineno=False, explicit_signals_flag=False):
+    def _process_qsignal(red, objects, context, visitor, skip_lineno=False, explicit_signals_flag=False):
         """
         _process_qsignal is designed to replace QSignal code.
         It calls out to the _qsignal module and can fix disconnects, connects,
@@ -241,11 +263,15 @@ You will probably want to remove the usage of this entirely."""
         :type red: redbardon.RedBaron
         :param objects: List of redbaron nodes that matched for this proc.
         :type objects: list
+        :param context: The state of the current conversion.
+        :type context: qt_py_convert.general.ConversionContext
+        :param visitor: The tree visitor for the current conversion.
+        :type visitor: qt_py_convert.visitor.TreeVisitor
         :param skip_lineno: Global "skip_lineno" flag.
         :type skip_lineno: bool
         """
         for node in objects:
-            raw = node.parent.dumps()
+            raw = visitor.dumps(node.parent)
 
             if "disconnect" in raw:
                 changed = _qsignal.process_disconnect(raw, explicit=explicit_signals_flag)
@@ -257,7 +283,7 @@ You will probably want to remove the usage of this entirely."""
                         skip_lineno=skip_lineno,
                     )
 
-                    node.parent.replace(changed)
+                    visitor.replace(node.parent, changed)
                     continue
             if "connect" in raw:
                 changed = _qsignal.process_connect(raw, explicit=explicit_signals_flag)
@@ -268,7 +294,7 @@ You will probably want to remove the usage of this entirely."""
                         replacement=changed,
                         skip_lineno=skip_lineno,
                     )
-                    node.parent.replace(changed)
+                    visitor.replace(node.parent, changed)
                     continue
             if "emit" in raw:
                 changed = _qsignal.process_emit(raw, explicit=explicit_signals_flag)
@@ -280,11 +306,11 @@ You will probably want to remove the usage of this entirely."""
                         replacement=changed,
                         skip_lineno=skip_lineno,
                     )
-                    node.parent.replace(changed)
+                    visitor.replace(node.parent, changed)
                     continue
 
     @staticmethod
-    def _process_qstringref(red, objects, skip_lineno=False, **kwargs):
+    def _process_qstringref(red, objects, context, visitor, skip_lineno=False, **kwargs):
         """
         _process_qstringref is designed to replace QStringRefs
 
@@ -292,12 +318,16 @@ You will probably want to remove the usage of this entirely."""
         :type red: redbardon.RedBaron
         :param objects: List of redbaron nodes that matched for this proc.
         :type objects: list
+        :param context: The state of the current conversion.
+        :type context: qt_py_convert.general.ConversionContext
+        :param visitor: The tree visitor for the current conversion.
+        :type visitor: qt_py_convert.visitor.TreeVisitor
         :param skip_lineno: Global "skip_lineno" flag.
         :type skip_lineno: bool
         """
         # Replace each node
         for node in objects:
-            raw = node.parent.dumps()
+            raw = visitor.dumps(node.parent)
             changed = re.sub(
                 r"((?:QtCore\.)?QStringRef)",
                 text_type.__name__,
@@ -310,7 +340,7 @@ You will probably want to remove the usage of this entirely."""
                     replacement=changed,
                     skip_lineno=skip_lineno,
                 )
-                node.parent.replace(changed)
+                visitor.replace(node.parent, changed)
 
     QSTRING_PROCESS_STR = "QSTRING_PROCESS"
     QSTRINGLIST_PROCESS_STR = "QSTRINGLIST_PROCESS"
@@ -359,32 +389,35 @@ def psep_process(store):
         r"to[A-Z][A-Za-z]+\(\)"
     )
 
-    def filter_function(value):
+    def filter_function(value, text=None):
         """
         filter_function takes an AtomTrailersNode or a DottedNameNode and will
         filter them out if they match something that has changed in psep0101.
+        "text" is the current text of the node if the caller has it.
         """
+        if text is None:
+            text = value.dumps()
         found = False
-        if _qstring_expression.search(value.dumps()):
+        if _qstring_expression.search(text):
             store[Processes.QSTRING_PROCESS_STR].add(value)
             found = True
-        if _qstringlist_expression.search(value.dumps()):
+        if _qstringlist_expression.search(text):
             store[Processes.QSTRINGLIST_PROCESS_STR].add(value)
             found = True
-        if _qchar_expression.search(value.dumps()):
+        if _qchar_expression.search(text):
             store[Processes.QCHAR_PROCESS_STR].add(value)
             found = True
-        if _qstringref_expression.search(value.dumps()):
+        if _qstringref_expression.search(text):
             store[Processes.QSTRINGREF_PROCESS_STR].add(value)
             found = True
-        if _qsignal_expression.search(value.dumps()):
+        if _qsignal_expression.search(text):
             store[Processes.QSIGNAL_PROCESS_STR].add(value)
             found = True
-        if _qvariant_expression.search(value.dumps()):
+        if _qvariant_expression.search(text):
             store[Processes.QVARIANT_PROCESS_STR].add(value)
             found = True
         if Processes.TOMETHOD_PROCESS_STR in store:
-            if _to_method_expression.search(value.dumps()):
+            if _to_method_expression.search(text):
                 store[Processes.TOMETHOD_PROCESS_STR].add(value)
                 found = True
         if found:
@@ -392,12 +425,14 @@ def psep_process(store):
     return filter_function
 
 
-def process(red, skip_lineno=False, tometh_flag=False, explicit_signals_flag=False, **kwargs):
+def process(red, context, skip_lineno=False, tometh_flag=False, explicit_signals_flag=False, visitor=None, **kwargs):
     """
     process is the main function for the psep0101 process.
 
     :param red: Redbaron ast.
     :type red: redbaron.redbaron
+    :param context: The state of the current conversion.
+    :type context: qt_py_convert.general.ConversionContext
     :param skip_lineno: An optional performance flag. By default, when the
         script replaces something, it will tell you which line it is
         replacing on. This can be useful for tracking the places that
@@ -411,6 +446,9 @@ def process(red, skip_lineno=False, tometh_flag=False, explicit_signals_flag=Fal
         confirm that you don't have any custom objects with the same method
         signature to PyQt4's apiv1.0 ones.
     :type tometh_flag: bool
+    :param visitor: The tree visitor shared by the conversion stages. A new
+        one is created from "red" when it is not passed.
+    :type visitor: qt_py_convert.visitor.TreeVisitor
     :param kwargs: Any other kwargs will be ignored.
     :type kwargs: dict
     """
@@ -427,19 +465,29 @@ def process(red, skip_lineno=False, tometh_flag=False, explicit_signals_flag=Fal
     if tometh_flag:
         psep_issues[Processes.TOMETHOD_PROCESS_STR] = set()
 
-    red.find_all("AtomTrailersNode", value=psep_process(psep_issues))
-    red.find_all("DottedNameNode", value=psep_process(psep_issues))
+    if visitor is None:
+        visitor = TreeVisitor(red)
 
-    name_nodes = red.find_all("NameNode")
     filter_function = psep_process(psep_issues)
-    for name in name_nodes:
-        filter_function(name)
+    # AtomTrailersNodes and DottedNameNodes are matched on their value like
+    #   red.find_all(..., value=filter_function) would.
+    visitor.register(
+        (TreeVisitor.ATOMTRAILERS, TreeVisitor.DOTTED_NAME),
+        lambda node: filter_function(node.value, visitor.dumps(node))
+    )
+    visitor.register(
+        (TreeVisitor.NAME,),
+        lambda node: filter_function(node, visitor.dumps(node))
+    )
+    visitor.dispatch()
 
     for issue in psep_issues:
         if psep_issues[issue]:
             getattr(Processes, issue)(
                 red,
                 psep_issues[issue],
+                context,
+                visitor,
                 skip_lineno=skip_lineno,
                 explicit_signals_flag=explicit_signals_flag
             )
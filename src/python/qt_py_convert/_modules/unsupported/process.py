@@ -21,15 +21,17 @@
 # language governing permissions and limitations under the Apache License.
 import re
 
-from qt_py_convert.general import ALIAS_DICT, ErrorClass
+from qt_py_convert.general import ErrorClass
+from qt_py_convert.visitor import TreeVisitor
 
 
 class Processes(object):
 
     @staticmethod
-    def _process_load_ui_type(red, objects, skip_lineno=False):
+    def _process_load_ui_type(red, objects, context, skip_lineno=False):
         for node in objects:
             ErrorClass.from_node(
+                context=context,
                 node=node,
                 reason="""
     The Qt.py module does not support uic.loadUiType as it is not a method in PySide.
@@ -56,13 +58,16 @@ def unsupported_process(store):
         r"(?:uic\.)?loadUiType", re.DOTALL
     )
 
-    def filter_function(value):
+    def filter_function(value, text=None):
         """
         filter_function takes an AtomTrailersNode or a DottedNameNode and will
         filter them out if they match something that is unsupported in Qt.py
+        "text" is the current text of the node if the caller has it.
         """
+        if text is None:
+            text = value.dumps()
         found = False
-        if _loaduitype_expression.search(value.dumps()):
+        if _loaduitype_expression.search(text):
             store[Processes.LOADUITYPE_STR].add(value)
             found = True
         if found:
@@ -70,12 +75,14 @@ def unsupported_process(store):
     return filter_function
 
 
-def process(red, skip_lineno=False, **kwargs):
+def process(red, context, skip_lineno=False, visitor=None, **kwargs):
     """
     process is the main function for the import process.
 
     :param red: Redbaron ast.
     :type red: redbaron.redbaron
+    :param context: The state of the current conversion.
+    :type context: qt_py_convert.general.ConversionContext
     :param skip_lineno: An optional performance flag. By default, when the
         script replaces something, it will tell you which line it is
         replacing on. This can be useful for tracking the places that
@@ -83,6 +90,9 @@ def process(red, skip_lineno=False, **kwargs):
         show the line numbers. This can give great performance increases
         because redbaron has trouble calculating the line number sometimes.
     :type skip_lineno: bool
+    :param visitor: The tree visitor shared by the conversion stages. A new
+        one is created from "red" when it is not passed.
+    :type visitor: qt_py_convert.visitor.TreeVisitor
     :param kwargs: Any other kwargs will be ignored.
     :type kwargs: dict
     """
@@ -90,12 +100,19 @@ def process(red, skip_lineno=False, **kwargs):
         Processes.LOADUITYPE_STR: set(),
     }
 
-    red.find_all("AtomTrailersNode", value=unsupported_process(issues))
-    red.find_all("DottedNameNode", value=unsupported_process(issues))
+    if visitor is None:
+        visitor = TreeVisitor(red)
+
+    filter_function = unsupported_process(issues)
+    visitor.register(
+        (TreeVisitor.ATOMTRAILERS, TreeVisitor.DOTTED_NAME),
+        lambda node: filter_function(node.value, visitor.dumps(node))
+    )
+    visitor.dispatch()
     key = Processes.LOADUITYPE_STR
 
     if issues[key]:
-        return getattr(Processes, key)(red, issues[key],
+        return getattr(Processes, key)(red, issues[key], context,
                                        skip_lineno=skip_lineno)
     else:
-        return ALIAS_DICT, {}
+        return context, {}
@@ -0,0 +1,313 @@
+# Copyright 2018 Digital Domain 3.0
+#
+# Licensed under the Apache License, Version 2.0 (the "Apache License")
+# with the following modification; you may not use this file except in
+# compliance with the Apache License and the following modification to it:
+# Section 6. Trademarks. is deleted and replaced with:
+#
+# 6. Trademarks. This License does not grant permission to use the trade
+#    names, trademarks, service marks, or product names of the Licensor
+#    and its affiliates, except as required to comply with Section 4(c) of
+#    the License and to reproduce the content of the NOTICE file.
+#
+# You may obtain a copy of the Apache License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the Apache License with the above modification is
+# distributed on an "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY
+# KIND, either express or implied. See the Apache License for the specific
+# language governing permissions and limitations under the Apache License.
+"""
+binding_catalog holds the member names of each submodule of a binding, so
+that a "from <binding>.<module> import *" can be expanded without importing
+the binding.
+
+The catalog for a binding is a json file named after it, in the first folder
+of QT_PY_CONVERT_CATALOG (os.pathsep separated) or the user cache folder.
+The other folders of QT_PY_CONVERT_CATALOG are only read from, which lets a
+studio share a catalog that was generated on a host with the bindings.
+
+A catalog records which install of the binding it was made from. When that
+install changes, the catalog is thrown away and filled again. A submodule
+that is not in the catalog yet is imported once and then written to it.
+When the binding is not installed at all, the catalog is used as is.
+
+Fill in the whole catalog for a binding with:
+
+    python -m qt_py_convert.binding_catalog PyQt4 [PySide ...]
+"""
+import json
+import os
+import pkgutil
+import sys
+import tempfile
+import threading
+
+from qt_py_convert.log import get_logger
+
+CATALOG_LOG = get_logger("binding_catalog")
+
+CATALOG_ENV = "QT_PY_CONVERT_CATALOG"
+# Bump when the layout of the catalog files changes.
+CATALOG_VERSION = 1
+# Key that the members of the binding package itself are stored under.
+TOP_LEVEL = ""
+
+try:
+    import __builtin__ as _builtins
+except ImportError:  # Python 3
+    import builtins as _builtins
+
+_BUILTIN_NAMES = frozenset(dir(_builtins))
+
+_catalogs = {}
+_lock = threading.Lock()
+
+
+def default_folders():
+    """
+    default_folders returns the folders that catalogs are looked up in.
+    The first one is also where new members are written to.
+
+    :rtype: list[str...]
+    """
+    folders = os.environ.get(CATALOG_ENV)
+    if folders:
+        return [folder for folder in folders.split(os.pathsep) if folder]
+    cache_home = os.environ.get("XDG_CACHE_HOME") or os.path.join(
+        os.path.expanduser("~"), ".cache"
+    )
+    return [os.path.join(cache_home, "qt_py_convert", "binding_catalog")]
+
+
+def fingerprint(binding):
+    """
+    fingerprint identifies the installed copy of a binding by the path and
+    modified time of its package, which does not import it.
+
+    :param binding: Name of the binding.
+    :type binding: str
+    :return: The fingerprint or None if the binding is not installed.
+    :rtype: str|None
+    """
+    try:
+        from importlib.util import find_spec
+    except ImportError:  # Python 2
+        import imp
+        try:
+            fh, path, _ = imp.find_module(binding)
+        except ImportError:
+            return None
+        if fh is not None:
+            fh.close()
+    else:
+        try:
+            spec = find_spec(binding)
+        except (ImportError, ValueError):
+            return None
+        if spec is None:
+            return None
+        path = spec.origin
+        if not path or not os.path.exists(path):
+            path = list(spec.submodule_search_locations or [None])[0]
+    if not path or not os.path.exists(path):
+        return None
+    return "{path}:{mtime}".format(path=path, mtime=os.path.getmtime(path))
+
+
+def public_members(module):
+    """
+    public_members is what a star import of "module" brings in, minus the
+    builtins.
+
+    :param module: An imported module.
+    :type module: module
+    :rtype: list[str...]
+    """
+    return sorted(
+        name for name in dir(module)
+        if not name.startswith("__") and name not in _BUILTIN_NAMES
+    )
+
+
+def _native(value):
+    """json hands back unicode on python 2, the rest of the code wants str."""
+    if sys.version_info[0] == 2 and not isinstance(value, str):
+        return value.encode("utf-8")
+    return value
+
+
+class BindingCatalog(object):
+    """
+    BindingCatalog is the member names of the submodules of one binding.
+    """
+    def __init__(self, binding, folders=None):
+        """
+        :param binding: Name of the binding.
+        :type binding: str
+        :param folders: Folders to look the catalog up in, the first one is
+            written to. Defaults to default_folders().
+        :type folders: None|list[str...]
+        """
+        super(BindingCatalog, self).__init__()
+        self.binding = binding
+        self.folders = folders or default_folders()
+        self.path = os.path.join(self.folders[0], binding + ".json")
+        self.fingerprint = fingerprint(binding)
+        self.modules = {}
+        self._load()
+
+    def __repr__(self):
+        return "<BindingCatalog %s modules:%d>" % (
+            self.binding, len(self.modules)
+        )
+
+    def _load(self):
+        for folder in self.folders:
+            path = os.path.join(folder, self.binding + ".json")
+            try:
+                with open(path, "rb") as fh:
+                    data = json.loads(fh.read().decode("utf-8"))
+            except (IOError, OSError, ValueError):
+                continue
+            if data.get("version") != CATALOG_VERSION:
+                continue
+            if (self.fingerprint is not None and
+                    data.get("fingerprint") != self.fingerprint):
+                CATALOG_LOG.debug(
+                    "{path} is from another install of {binding}, "
+                    "ignoring it.".format(path=path, binding=self.binding)
+                )
+                continue
+            self.modules = dict(
+                (_native(name), [_native(member) for member in members])
+                for name, members in data.get("modules", {}).items()
+            )
+            return
+
+    def members(self, module=TOP_LEVEL):
+        """
+        members returns the names a star import of the submodule brings in.
+
+        :param module: Name of the submodule, TOP_LEVEL for the binding.
+        :type module: str
+        :return: The member names.
+        :rtype: list[str...]
+        :raises ImportError: When the submodule is not in the catalog and can
+            not be imported.
+        """
+        if module in self.modules:
+            return self.modules[module]
+        if self.fingerprint is None:
+            raise ImportError(
+                "No module named {name} and it is not in the catalog "
+                "{path}".format(
+                    name=".".join(filter(None, [self.binding, module])),
+                    path=self.path,
+                )
+            )
+        self.modules[module] = public_members(self._import(module))
+        self.save()
+        return self.modules[module]
+
+    def _import(self, module):
+        _temp = __import__(self.binding, fromlist=[module] if module else [])
+        if not module:
+            return _temp
+        return getattr(_temp, module)
+
+    def generate(self):
+        """
+        generate imports every submodule of the binding and records them.
+
+        :return: The names of the submodules that were recorded.
+        :rtype: list[str...]
+        """
+        package = self._import(TOP_LEVEL)
+        names = []
+        paths = getattr(package, "__path__", [])
+        for _, name, _ in pkgutil.iter_modules(paths):
+            if name.startswith("_"):
+                continue
+            try:
+                self.modules[name] = public_members(self._import(name))
+            except Exception as err:  # Anything can happen importing these.
+                CATALOG_LOG.debug("Skipping {binding}.{name}: {err}".format(
+                    binding=self.binding, name=name, err=err
+                ))
+                continue
+            names.append(name)
+        # After the submodules, so that they are all members of the package.
+        self.modules[TOP_LEVEL] = public_members(package)
+        self.save()
+        return names
+
+    def save(self):
+        """save writes the catalog atomically."""
+        data = json.dumps(
+            {
+                "version": CATALOG_VERSION,
+                "binding": self.binding,
+                "fingerprint": self.fingerprint,
+                "modules": self.modules,
+            },
+            sort_keys=True
+        ).encode("utf-8")
+        folder = os.path.dirname(self.path)
+        try:
+            if not os.path.isdir(folder):
+                os.makedirs(folder)
+            fd, temp_path = tempfile.mkstemp(dir=folder, suffix=".tmp")
+            with os.fdopen(fd, "wb") as fh:
+                fh.write(data)
+            os.rename(temp_path, self.path)
+        except (IOError, OSError) as err:
+            CATALOG_LOG.warning(
+                "Could not write the catalog {path}: {err}".format(
+                    path=self.path, err=err
+                )
+            )
+
+
+def catalog(binding):
+    """
+    catalog returns the BindingCatalog for a binding, loading it the first
+    time it is asked for.
+
+    :param binding: Name of the binding.
+    :type binding: str
+    :rtype: BindingCatalog
+    """
+    key = (binding, tuple(default_folders()))
+    with _lock:
+        if key not in _catalogs:
+            _catalogs[key] = BindingCatalog(binding, list(key[1]))
+        return _catalogs[key]
+
+
+def members(binding, module=TOP_LEVEL):
+    """
+    members returns the names a star import of "<binding>.<module>" brings in.
+
+    :param binding: Name of the binding.
+    :type binding: str
+    :param module: Name of the submodule, TOP_LEVEL for the binding.
+    :type module: str
+    :rtype: list[str...]
+    :raises ImportError: When the submodule is not in the catalog and can not
+        be imported.
+    """
+    found = catalog(binding)
+    with _lock:
+        return found.members(module)
+
+
+if __name__ == "__main__":
+    for _binding in sys.argv[1:]:
+        _catalog = BindingCatalog(_binding)
+        _modules = _catalog.generate()
+        print("{catalog} {path}: {modules}".format(
+            catalog=_catalog, path=_catalog.path, modules=", ".join(_modules)
+        ))
@@ -0,0 +1,371 @@
+# Copyright 2018 Digital Domain 3.0
+#
+# Licensed under the Apache License, Version 2.0 (the "Apache License")
+# with the following modification; you may not use this file except in
+# compliance with the Apache License and the following modification to it:
+# Section 6. Trademarks. is deleted and replaced with:
+#
+# 6. Trademarks. This License does not grant permission to use the trade
+#    names, trademarks, service marks, or product names of the Licensor
+#    and its affiliates, except as required to comply with Section 4(c) of
+#    the License and to reproduce the content of the NOTICE file.
+#
+# You may obtain a copy of the Apache License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the Apache License with the above modification is
+# distributed on an "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY
+# KIND, either express or implied. See the Apache License for the specific
+# language governing permissions and limitations under the Apache License.
+"""
+cache is a content addressed, on disk store of conversion results.
+
+Entries are keyed by a hash of the source text, the conversion flags, the
+Qt.py version, the custom binding environment and the qt_py_convert version.
+A hit hands back the converted text, the aliases, the mappings and the errors
+without parsing the source at all.
+"""
+import hashlib
+import json
+import os
+import sys
+import tempfile
+
+from qt_py_convert import __version__
+from qt_py_convert.general import ConversionContext, ErrorClass, \
+    __supported_bindings__, _custom_misplaced_members
+from qt_py_convert.log import get_logger
+from qt_py_convert.qt_members import Qt
+
+CACHE_LOG = get_logger("cache")
+
+# 512MB
+DEFAULT_MAX_SIZE = 512 * 1024 * 1024
+# When evicting, we clean down to this fraction of the max size so that we
+# are not evicting again on the very next write.
+_LOW_WATER_MARK = 0.9
+_EXTENSION = ".json"
+# Lives beside the two character entry folders, so it is never evicted.
+_TIMINGS_FILE = "timings.json"
+
+
+def _to_bytes(text):
+    if isinstance(text, bytes):
+        return text
+    return text.encode("utf-8")
+
+
+def _native(text):
+    """json hands back unicode on python 2, the rest of the code wants str."""
+    if sys.version_info[0] == 2 and not isinstance(text, str):
+        return text.encode("utf-8")
+    return text
+
+
+def environment_key(skip_lineno=False, tometh_flag=False,
+                    explicit_signals_flag=False, span_edits_flag=False):
+    """
+    environment_key describes everything besides the source text that can
+    change the result of a conversion. The flags, the Qt.py and
+    qt_py_convert versions and the custom binding environment.
+
+    :param skip_lineno: The run "skip_lineno" flag.
+    :type skip_lineno: bool
+    :param tometh_flag: The run "tometh_flag" flag.
+    :type tometh_flag: bool
+    :param explicit_signals_flag: The run "explicit_signals_flag" flag.
+    :type explicit_signals_flag: bool
+    :param span_edits_flag: The run "span_edits_flag" flag.
+    :type span_edits_flag: bool
+    :return: A json string of the environment.
+    :rtype: str
+    """
+    return json.dumps(
+        [
+            __version__,
+            Qt.__version__,
+            Qt.__binding__,
+            list(__supported_bindings__),
+            _custom_misplaced_members,
+            bool(skip_lineno),
+            bool(tometh_flag),
+            bool(explicit_signals_flag),
+            bool(span_edits_flag),
+        ],
+        sort_keys=True
+    )
+
+
+class ResultCache(object):
+    """
+    ResultCache is a directory of json files, one per converted source.
+    It is safe to share between processes. Writes are atomic and the least
+    recently used entries are evicted once the directory grows past
+    "max_size" bytes.
+    """
+    def __init__(self, path, max_size=DEFAULT_MAX_SIZE):
+        """
+        :param path: Directory that the cache lives in.
+        :type path: str
+        :param max_size: Size cap of the cache in bytes.
+        :type max_size: int
+        """
+        super(ResultCache, self).__init__()
+        self.path = os.path.abspath(path)
+        self.max_size = max_size
+        self._size = None
+
+    def __repr__(self):
+        return "<ResultCache path:\"%s\" max_size:%d>" % (
+            self.path, self.max_size
+        )
+
+    @staticmethod
+    def key(text, skip_lineno=False, tometh_flag=False,
+            explicit_signals_flag=False, span_edits_flag=False):
+        """
+        key builds the cache key for a conversion.
+
+        :param text: Text from a python file that you want to process.
+        :type text: str
+        :param skip_lineno: The run "skip_lineno" flag.
+        :type skip_lineno: bool
+        :param tometh_flag: The run "tometh_flag" flag.
+        :type tometh_flag: bool
+        :param explicit_signals_flag: The run "explicit_signals_flag" flag.
+        :type explicit_signals_flag: bool
+        :param span_edits_flag: The run "span_edits_flag" flag.
+        :type span_edits_flag: bool
+        :return: Hex digest identifying the conversion.
+        :rtype: str
+        """
+        environment = environment_key(
+            skip_lineno=skip_lineno,
+            tometh_flag=tometh_flag,
+            explicit_signals_flag=explicit_signals_flag,
+            span_edits_flag=span_edits_flag
+        )
+        digest = hashlib.sha1(_to_bytes(environment))
+        digest.update(b"\0")
+        digest.update(_to_bytes(text))
+        return digest.hexdigest()
+
+    def _entry_path(self, key):
+        return os.path.join(self.path, key[:2], key + _EXTENSION)
+
+    def get(self, key, context=None):
+        """
+        get returns the cached result for "key".
+
+        :param key: Key built from ResultCache.key
+        :type key: str
+        :param context: Optional context to restore the aliases and errors
+            into. A new one is created when it is not passed.
+        :type context: qt_py_convert.general.ConversionContext
+        :return: The same tuple that run returns or None on a miss.
+        :rtype: tuple[qt_py_convert.general.ConversionContext,dict,str]|None
+        """
+        entry_path = self._entry_path(key)
+        try:
+            with open(entry_path, "rb") as fh:
+                data = json.loads(fh.read().decode("utf-8"))
+        except (IOError, OSError, ValueError):
+            return None
+
+        try:
+            # Bump the modified time, it is what the LRU eviction sorts on.
+            os.utime(entry_path, None)
+        except OSError:
+            pass
+        CACHE_LOG.debug("Cache hit {key}".format(key=key))
+
+        if context is None:
+            context = ConversionContext()
+        for name, values in data["aliases"].items():
+            context[_native(name)] = set(_native(value) for value in values)
+        for row_from, row_to, reason in data["errors"]:
+            ErrorClass(
+                row_from=row_from,
+                row_to=row_to,
+                reason=_native(reason),
+                context=context
+            )
+        mappings = dict(
+            (_native(name), _native(value))
+            for name, value in data["mappings"].items()
+        )
+        return context, mappings, _native(data["dumps"])
+
+    def put(self, key, aliases, mappings, dumps):
+        """
+        put stores the result of a conversion under "key".
+
+        :param key: Key built from ResultCache.key
+        :type key: str
+        :param aliases: The ConversionContext returned from run.
+        :type aliases: qt_py_convert.general.ConversionContext
+        :param mappings: The mappings returned from run.
+        :type mappings: dict
+        :param dumps: The converted text returned from run.
+        :type dumps: str
+        """
+        errors = aliases.get(ConversionContext.ERRORS, set())
+        try:
+            data = json.dumps({
+                "aliases": dict(
+                    (name, sorted(values))
+                    for name, values in aliases.items()
+                    if name != ConversionContext.ERRORS
+                ),
+                "errors": sorted(
+                    (error.row, error.row_to, error.reason)
+                    for error in errors
+                ),
+                "mappings": mappings,
+                "dumps": dumps,
+            })
+        except (TypeError, ValueError, UnicodeDecodeError) as err:
+            CACHE_LOG.debug("Not caching {key}: {err}".format(key=key, err=err))
+            return
+
+        entry_path = self._entry_path(key)
+        data = _to_bytes(data)
+        try:
+            if not os.path.isdir(os.path.dirname(entry_path)):
+                os.makedirs(os.path.dirname(entry_path))
+            fd, temp_path = tempfile.mkstemp(
+                dir=os.path.dirname(entry_path), suffix=".tmp"
+            )
+            with os.fdopen(fd, "wb") as fh:
+                fh.write(data)
+            # An entry that is written again only grows the cache by the
+            #   difference.
+            try:
+                replaced = os.stat(entry_path).st_size
+            except OSError:
+                replaced = 0
+            # Rename is atomic, other processes never see a partial entry.
+            os.rename(temp_path, entry_path)
+        except (IOError, OSError) as err:
+            CACHE_LOG.warning(
+                "Could not write cache entry {path}: {err}".format(
+                    path=entry_path, err=err
+                )
+            )
+            return
+
+        if self._size is None:
+            self.size()
+        else:
+            self._size += len(data) - replaced
+        if self._size > self.max_size:
+            self.evict()
+
+    def timings(self):
+        """
+        timings returns how long each file took the last time it was
+        converted with this cache. process_folder uses it to start the most
+        expensive files first.
+
+        :return: Dictionary of absolute file path to (size, seconds).
+        :rtype: dict
+        """
+        try:
+            with open(os.path.join(self.path, _TIMINGS_FILE), "rb") as fh:
+                data = json.loads(fh.read().decode("utf-8"))
+        except (IOError, OSError, ValueError):
+            return {}
+        return dict(
+            (_native(fp), (size, seconds))
+            for fp, (size, seconds) in data.items()
+        )
+
+    def record_timings(self, results):
+        """
+        record_timings stores the size and the total time of every file that
+        was processed, next to the timings from earlier runs.
+
+        :param results: The records returned from _process_file.
+        :type results: list[qt_py_convert.general.FileResult]
+        """
+        history = self.timings()
+        for result in results:
+            if "total" not in result.timings:
+                continue
+            fp = os.path.abspath(result.path)
+            try:
+                size = os.path.getsize(fp)
+            except OSError:
+                continue
+            history[fp] = (size, result.timings["total"])
+
+        timings_path = os.path.join(self.path, _TIMINGS_FILE)
+        try:
+            if not os.path.isdir(self.path):
+                os.makedirs(self.path)
+            fd, temp_path = tempfile.mkstemp(dir=self.path, suffix=".tmp")
+            with os.fdopen(fd, "wb") as fh:
+                fh.write(_to_bytes(json.dumps(history, sort_keys=True)))
+            os.rename(temp_path, timings_path)
+        except (IOError, OSError) as err:
+            CACHE_LOG.warning(
+                "Could not write the timings to {path}: {err}".format(
+                    path=timings_path, err=err
+                )
+            )
+
+    def _entries(self):
+        """_entries yields (mtime, size, path) for every cache entry."""
+        if not os.path.isdir(self.path):
+            return
+        for root, _, files in os.walk(self.path):
+            if root == self.path:  # Entries only live in the sub folders.
+                continue
+            for fn in files:
+                if not fn.endswith(_EXTENSION):
+                    continue
+                entry_path = os.path.join(root, fn)
+                try:
+                    stat = os.stat(entry_path)
+                except OSError:
+                    continue
+                yield stat.st_mtime, stat.st_size, entry_path
+
+    def size(self):
+        """
+        size is the total size of the entries on disk.
+        It is remembered for put to count on from, so calling it before
+        handing the cache to worker processes saves each of them the walk.
+
+        :return: Size in bytes.
+        :rtype: int
+        """
+        self._size = sum(size for _, size, _ in self._entries())
+        return self._size
+
+    def evict(self):
+        """
+        evict removes the least recently used entries until the cache is
+        back under its size cap.
+        """
+        entries = sorted(self._entries())
+        total = sum(size for _, size, _ in entries)
+        target = self.max_size * _LOW_WATER_MARK
+        removed = 0
+        for _, size, entry_path in entries:
+            if total <= target:
+                break
+            try:
+                os.remove(entry_path)
+            except OSError:
+                continue
+            total -= size
+            removed += 1
+        CACHE_LOG.debug(
+            "Evicted {count} cache entries from {path}".format(
+                count=removed, path=self.path
+            )
+        )
+        self._size = total
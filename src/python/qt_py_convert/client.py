@@ -0,0 +1,185 @@
+# Copyright 2018 Digital Domain 3.0
+#
+# Licensed under the Apache License, Version 2.0 (the "Apache License")
+# with the following modification; you may not use this file except in
+# compliance with the Apache License and the following modification to it:
+# Section 6. Trademarks. is deleted and replaced with:
+#
+# 6. Trademarks. This License does not grant permission to use the trade
+#    names, trademarks, service marks, or product names of the Licensor
+#    and its affiliates, except as required to comply with Section 4(c) of
+#    the License and to reproduce the content of the NOTICE file.
+#
+# You may obtain a copy of the Apache License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the Apache License with the above modification is
+# distributed on an "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY
+# KIND, either express or implied. See the Apache License for the specific
+# language governing permissions and limitations under the Apache License.
+"""
+client is the thin counterpart of qt_py_convert.server.
+
+It only imports the standard library so that editor and pre-commit hooks can
+hand their files to an already running "qt_py_convert --serve" process
+without paying for redbaron, Qt.py or a binding to be imported.
+
+Messages are json objects, one per line, in both directions. A request holds
+the "source" text and the conversion "flags". The response holds the
+converted "source", whether it "changed" and the formatted "errors".
+"""
+import json
+import socket
+import sys
+
+
+# The conversion flags that a request may turn on. They are the keyword
+#   arguments of qt_py_convert.run.run.
+FLAGS = (
+    "skip_lineno",
+    "tometh_flag",
+    "explicit_signals_flag",
+    "span_edits_flag",
+)
+
+
+class ServerError(RuntimeError):
+    """ServerError is raised when the server could not handle a request."""
+
+
+def _native(text):
+    """json hands back unicode on python 2, the rest of the code wants str."""
+    if sys.version_info[0] == 2 and not isinstance(text, str):
+        return text.encode("utf-8")
+    return text
+
+
+def write_message(stream, message):
+    """
+    write_message sends a single json message down the stream.
+
+    :param stream: File object wrapping the socket, opened for writing.
+    :type stream: file
+    :param message: The message to send.
+    :type message: dict
+    """
+    stream.write(json.dumps(message).encode("utf-8") + b"\n")
+    stream.flush()
+
+
+def read_message(stream):
+    """
+    read_message reads the next json message from the stream.
+
+    :param stream: File object wrapping the socket, opened for reading.
+    :type stream: file
+    :return: The message or None if the other end closed the connection.
+    :rtype: dict|None
+    """
+    line = stream.readline()
+    if not line:
+        return None
+    return json.loads(line.decode("utf-8"))
+
+
+class Client(object):
+    """
+    Client is a connection to a running conversion server.
+    Several requests can be sent over the same connection.
+    """
+    def __init__(self, socket_path, timeout=None):
+        """
+        :param socket_path: Path of the unix socket the server listens on.
+        :type socket_path: str
+        :param timeout: Optional timeout in seconds for each request.
+        :type timeout: float|None
+        """
+        super(Client, self).__init__()
+        self._socket = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        self._socket.settimeout(timeout)
+        self._socket.connect(socket_path)
+        self._rfile = self._socket.makefile("rb")
+        self._wfile = self._socket.makefile("wb")
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+    def close(self):
+        for stream in (self._rfile, self._wfile):
+            try:
+                stream.close()
+            except socket.error:
+                pass
+        self._socket.close()
+
+    def request(self, message):
+        """
+        request sends a message and waits for the response to it.
+
+        :param message: The request.
+        :type message: dict
+        :return: The response from the server.
+        :rtype: dict
+        """
+        write_message(self._wfile, message)
+        response = read_message(self._rfile)
+        if response is None:
+            raise ServerError("The server closed the connection.")
+        if response.get("failure"):
+            raise ServerError(_native(response["failure"]))
+        return response
+
+    def convert(self, source, **flags):
+        """
+        convert has the server convert the source text.
+
+        :param source: Text from a python file that you want to process.
+        :type source: str
+        :param flags: Any of the FLAGS. See qt_py_convert.run.run.
+        :type flags: bool
+        :return: The converted text, whether it changed and the formatted
+            errors that were recovered from it.
+        :rtype: tuple[str,bool,list[str...]]
+        """
+        unknown = set(flags) - set(FLAGS)
+        if unknown:
+            raise TypeError(
+                "Unknown conversion flags: {0}".format(", ".join(sorted(unknown)))
+            )
+        response = self.request({"source": source, "flags": flags})
+        return (
+            _native(response["source"]),
+            response["changed"],
+            [_native(error) for error in response["errors"]],
+        )
+
+    def ping(self):
+        """
+        :return: The qt_py_convert version that the server is running.
+        :rtype: str
+        """
+        return _native(self.request({"command": "ping"})["version"])
+
+    def shutdown(self):
+        """shutdown asks the server to stop once this request is answered."""
+        self.request({"command": "shutdown"})
+
+
+def convert(socket_path, source, **flags):
+    """
+    convert is a one shot helper around Client.convert.
+
+    :param socket_path: Path of the unix socket the server listens on.
+    :type socket_path: str
+    :param source: Text from a python file that you want to process.
+    :type source: str
+    :return: The converted text, whether it changed and the formatted errors.
+    :rtype: tuple[str,bool,list[str...]]
+    """
+    with Client(socket_path) as client:
+        return client.convert(source, **flags)
@@ -45,11 +45,30 @@ class ANSI(object):
         strike = 9
 
 
-def supports_color():
+# "always", "never" or "auto". Anything else is treated as "auto".
+COLOR_ENV = "QT_PY_CONVERT_COLOR"
+# https://no-color.org
+NO_COLOR_ENV = "NO_COLOR"
+
+_supports_color = None
+
+
+def _detect_color():
     """
-    Returns True if the running system's terminal supports color, and False
-    otherwise.
+    _detect_color does the actual check behind supports_color.
+    tput is only run when we are writing to a terminal.
     """
+    mode = os.environ.get(COLOR_ENV, "auto").lower()
+    if mode in ("always", "1", "yes", "true"):
+        return True
+    if mode in ("never", "0", "no", "false") or NO_COLOR_ENV in os.environ:
+        return False
+
+    # isatty is not always implemented, #6223.
+    is_a_tty = hasattr(sys.stdout, 'isatty') and sys.stdout.isatty()
+    if not is_a_tty:
+        return False
+
     plat = sys.platform
     supported_platform = plat != 'Pocket PC' and (plat != 'win32' or
                                                   'ANSICON' in os.environ)
@@ -65,19 +84,45 @@ def supports_color():
     except OSError:  # Cannot find tput on windows
         return False
 
-    # isatty is not always implemented, #6223.
-    is_a_tty = hasattr(sys.stdout, 'isatty') and sys.stdout.isatty()
-    if (not supported_platform or not is_a_tty) and not has_colors:
+    if not supported_platform and not has_colors:
         return False
     return True
 
 
-SUPPORTS_COLOR = supports_color()
+def supports_color():
+    """
+    Returns True if the running system's terminal supports color, and False
+    otherwise.
+
+    The check runs the first time that something is colored and is cached
+    from then on, so importing qt_py_convert never starts a subprocess.
+    It can be forced with the QT_PY_CONVERT_COLOR environment variable or
+    set_color.
+    """
+    global _supports_color
+    if _supports_color is None:
+        _supports_color = _detect_color()
+    return _supports_color
 
 
-def color_text(color=ANSI.colors.white, text="", style=ANSI.styles.plain):
+def set_color(mode):
     """
-    _color will print the ansi text coloring code for the text.
+    set_color overrides the color detection.
+    The mode is put in the environment as well, so that worker processes
+    use it too.
+
+    :param mode: "always", "never" or "auto".
+    :type mode: str
+    """
+    global _supports_color
+    os.environ[COLOR_ENV] = mode
+    _supports_color = None
+
+
+def ansi_text(color=ANSI.colors.white, text="", style=ANSI.styles.plain):
+    """
+    ansi_text wraps the text in the ansi coloring codes, whether the terminal
+    supports them or not.
 
     :param color: Ansi color code number.
     :type color: int
@@ -86,9 +131,22 @@ def color_text(color=ANSI.colors.white, text="", style=ANSI.styles.plain):
     :return: The colored version of the text
     :rtype: str
     """
-    if not SUPPORTS_COLOR:
-        return text
     return "\033[{color};{style}m{message}\033[0m".format(
         style=style, color=color, message=text
     )
 
+
+def color_text(color=ANSI.colors.white, text="", style=ANSI.styles.plain):
+    """
+    _color will print the ansi text coloring code for the text.
+
+    :param color: Ansi color code number.
+    :type color: int
+    :param text: Text that you want colored.
+    :type text: str
+    :return: The colored version of the text
+    :rtype: str
+    """
+    if not supports_color():
+        return text
+    return ansi_text(color=color, text=text, style=style)
@@ -19,7 +19,7 @@
 # distributed on an "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY
 # KIND, either express or implied. See the Apache License for the specific
 # language governing permissions and limitations under the Apache License.
-from qt_py_convert.color import ANSI, SUPPORTS_COLOR, color_text
+from qt_py_convert.color import ANSI, color_text, supports_color
 
 
 class Chunk(object):
@@ -136,7 +136,7 @@ def _equalize(first, second, sep=(" ", ".", ",", "(")):
 
 
 def highlight_diffs(first, second, sep=(" ", ".", ",", "(")):
-    if not SUPPORTS_COLOR:
+    if not supports_color():
         return first, second
     first_chunks, second_chunks = _equalize(first, second, sep=sep)
     first_out = ""
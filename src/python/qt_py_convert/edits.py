@@ -0,0 +1,205 @@
+# Copyright 2018 Digital Domain 3.0
+#
+# Licensed under the Apache License, Version 2.0 (the "Apache License")
+# with the following modification; you may not use this file except in
+# compliance with the Apache License and the following modification to it:
+# Section 6. Trademarks. is deleted and replaced with:
+#
+# 6. Trademarks. This License does not grant permission to use the trade
+#    names, trademarks, service marks, or product names of the Licensor
+#    and its affiliates, except as required to comply with Section 4(c) of
+#    the License and to reproduce the content of the NOTICE file.
+#
+# You may obtain a copy of the Apache License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the Apache License with the above modification is
+# distributed on an "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY
+# KIND, either express or implied. See the Apache License for the specific
+# language governing permissions and limitations under the Apache License.
+"""
+edits is the span based edit engine used when converting with
+"span_edits_flag" turned on.
+
+Instead of splicing every rewrite into the redbaron tree with node.replace,
+the stages record (start, end, replacement) edits against the text of the
+tree. The output is then built with a single linear pass over that text.
+"""
+import bisect
+
+from qt_py_convert.log import get_logger
+
+
+EDITS_LOG = get_logger("edits")
+
+
+class SpanEdits(object):
+    """
+    SpanEdits holds the accepted edits against a source text.
+
+    Replacements are given for a whole span, built from the text that
+    text_of returns for it. Only the part that actually changes is kept as
+    the edit, which keeps edits from different stages apart as much as
+    possible. When edits do meet they are resolved in the order that they
+    are added. That is the order that the stages ran in, so the outcome is
+    always the same for the same input:
+      - An edit that covers earlier edits replaces them. It was built from
+        the text returned by text_of, which already contains them.
+      - An edit that lands inside of, or only partly over, an earlier edit
+        is dropped. The text it was meant for is already gone.
+    """
+    def __init__(self, text):
+        """
+        :param text: The source text that the offsets are relative to.
+        :type text: str
+        """
+        super(SpanEdits, self).__init__()
+        self.text = text
+        self.dropped = []
+        self._starts = []
+        self._edits = []
+
+    def __len__(self):
+        return len(self._edits)
+
+    def _overlapping(self, start, end):
+        """
+        _overlapping returns the index range of the accepted edits that
+        overlap with start:end.
+        """
+        first = bisect.bisect_left(self._starts, start)
+        # The edit before "first" starts before us, but can still reach in.
+        if first and self._edits[first - 1][1] > start:
+            first -= 1
+        last = first
+        while last < len(self._edits) and self._edits[last][0] < end:
+            last += 1
+        return first, last
+
+    def _contained(self, start, end):
+        first, last = self._overlapping(start, end)
+        return [
+            edit for edit in self._edits[first:last]
+            if edit[0] >= start and edit[1] <= end
+        ]
+
+    def _to_source(self, start, end, edited_start, edited_end):
+        """
+        _to_source maps edited_start:edited_end of text_of(start, end) back
+        to offsets in the source text.
+
+        :return: The source offsets or None if the range touches text that
+            was put there by an earlier edit.
+        :rtype: tuple[int,int]|None
+        """
+        edited = 0
+        source = start
+        for edit_start, edit_end, replacement in \
+                self._contained(start, end) + [(end, end, "")]:
+            gap = edit_start - source
+            if edited <= edited_start and edited_end <= edited + gap:
+                return (
+                    source + edited_start - edited,
+                    source + edited_end - edited
+                )
+            edited += gap + len(replacement)
+            source = edit_end
+        return None
+
+    def add(self, start, end, replacement):
+        """
+        add records that start:end of the text should become "replacement".
+
+        :param start: Offset of the first character to replace.
+        :type start: int
+        :param end: Offset after the last character to replace.
+        :type end: int
+        :param replacement: The text to put there instead. It is relative
+            to text_of(start, end), not the original source.
+        :type replacement: str
+        :return: True if the edit was accepted.
+        :rtype: bool
+        """
+        current = self.text_of(start, end)
+        if current == replacement:
+            return True
+
+        # Trim what did not change off of both ends.
+        prefix = 0
+        limit = min(len(current), len(replacement))
+        while prefix < limit and current[prefix] == replacement[prefix]:
+            prefix += 1
+        suffix = 0
+        while suffix < limit - prefix and \
+                current[-suffix - 1] == replacement[-suffix - 1]:
+            suffix += 1
+        source = self._to_source(
+            start, end, prefix, len(current) - suffix
+        )
+        if source is not None:
+            start, end = source
+            replacement = replacement[prefix:len(replacement) - suffix]
+
+        first, last = self._overlapping(start, end)
+        for edit_start, edit_end, _ in self._edits[first:last]:
+            if edit_start < start or edit_end > end:
+                EDITS_LOG.debug(
+                    "Dropping edit of {start}:{end} to \"{replacement}\", it "
+                    "overlaps the edit of {edit_start}:{edit_end}.".format(
+                        start=start, end=end, replacement=replacement,
+                        edit_start=edit_start, edit_end=edit_end,
+                    )
+                )
+                self.dropped.append((start, end, replacement))
+                return False
+        self._starts[first:last] = [start]
+        self._edits[first:last] = [(start, end, replacement)]
+        return True
+
+    def touched(self, start, end):
+        """
+        touched tells us if any accepted edit overlaps start:end.
+
+        :param start: Offset of the first character.
+        :type start: int
+        :param end: Offset after the last character.
+        :type end: int
+        :rtype: bool
+        """
+        first, last = self._overlapping(start, end)
+        return first < last
+
+    def text_of(self, start, end):
+        """
+        text_of returns the current text of start:end with all of the
+        accepted edits inside of it applied.
+
+        :param start: Offset of the first character.
+        :type start: int
+        :param end: Offset after the last character.
+        :type end: int
+        :return: The edited text.
+        :rtype: str
+        """
+        return self._join(start, end, self._contained(start, end))
+
+    def apply(self):
+        """
+        apply builds the edited text in one pass over the source.
+
+        :return: The source text with every accepted edit applied.
+        :rtype: str
+        """
+        return self._join(0, len(self.text), self._edits)
+
+    def _join(self, start, end, edits):
+        pieces = []
+        position = start
+        for edit_start, edit_end, replacement in edits:
+            pieces.append(self.text[position:edit_start])
+            pieces.append(replacement)
+            position = edit_end
+        pieces.append(self.text[position:end])
+        return "".join(pieces)
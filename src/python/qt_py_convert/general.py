@@ -24,13 +24,13 @@ general is utility functions for the qt_py_convert library
 """
 import copy
 import json
+import logging
 import os
 import re
 
-import Qt
-
 from qt_py_convert.color import ANSI, color_text
 from qt_py_convert.diff import highlight_diffs
+from qt_py_convert.lines import node_lines
 from qt_py_convert.log import get_logger
 
 
@@ -42,9 +42,79 @@ class WriteFlag(object):
     WRITE_TO_STDOUT = 0b0010
 
 
+class ChangeEvent(object):
+    """
+    ChangeEvent is a single replacement made by one of the stages.
+
+    It is handed to the logger as the message itself. Logging only turns it
+    into text when a handler writes the record out, so the diff highlighting
+    and the coloring are only paid for when somebody reads them.
+    """
+    def __init__(self, stage, original, replacement, lines=None, msg=None,
+                 skip_lineno=False):
+        """
+        :param stage: Name of the logger of the stage making the change.
+        :type stage: str
+        :param original: Text of the node that is being replaced.
+        :type original: str
+        :param replacement: Replacement string.
+        :type replacement: str
+        :param lines: First and last line of the node, None if unknown.
+        :type lines: None|tuple[int,int]
+        :param msg: Optional custom message to write out.
+        :type msg: None|str
+        :param skip_lineno: Leave the line number out of the message.
+        :type skip_lineno: bool
+        """
+        super(ChangeEvent, self).__init__()
+        self.stage = stage
+        self.original = original
+        self.replacement = replacement
+        self.lines = lines
+        self.msg = msg
+        self.skip_lineno = skip_lineno
+
+    def __repr__(self):
+        return "<ChangeEvent stage:%s lines:%s>" % (self.stage, self.lines)
+
+    @property
+    def failed(self):
+        """True if the line of the node was asked for and not found."""
+        return not self.skip_lineno and self.lines is None
+
+    def render(self):
+        """
+        render builds the highlighted message for the change.
+
+        :rtype: str
+        """
+        msg = self.msg
+        if msg is None:
+            msg = "Replacing \"{original}\" with \"{replacement}\""
+        line = None
+        if self.failed:
+            msg = (
+                color_text(color=ANSI.colors.orange, text="WARNING:") +
+                " Could not replace \"{original}\" with \"{replacement}\""
+            )
+        elif not self.skip_lineno:
+            msg += " at line {line}"
+            line = self.lines[0]
+        original, replacement = highlight_diffs(
+            self.original, self.replacement
+        )
+        return msg.format(
+            original=original, replacement=replacement, line=line
+        )
+
+    __str__ = render
+
+
 def change(logger, node, replacement, skip_lineno=False, msg=None):
     """
     A helper function to print information about replacing a node.
+    Nothing is done unless the logger writes out debug messages, see
+    ChangeEvent.
 
     :param logger: A python logger
     :type logger: logger.Logger
@@ -59,28 +129,18 @@ def change(logger, node, replacement, skip_lineno=False, msg=None):
     :return: Returns the result of the handler.
     :rtype: None
     """
-    failure_message = (
-            color_text(color=ANSI.colors.orange, text="WARNING:") +
-            " Could not replace \"{original}\" with \"{replacement}\""
+    if not logger.isEnabledFor(logging.DEBUG):
+        return None
+    event = ChangeEvent(
+        stage=logger.name,
+        original=str(node).strip("\n"),
+        replacement=replacement,
+        lines=None if skip_lineno else node_lines(node),
+        msg=msg,
+        skip_lineno=skip_lineno,
     )
-    if msg is None:
-        msg = "Replacing \"{original}\" with \"{replacement}\""
-
-    _orig = str(node).strip("\n")
-    _repl = replacement
-    original, replacement = highlight_diffs(_orig, _repl)
-    if not skip_lineno:
-        msg += " at line {line}"
-        if not hasattr(node, "absolute_bounding_box"):
-            msg = failure_message
-            line = "N/A"
-        else:
-            line = node.absolute_bounding_box.top_left.line - 1
-
-    result = logger.debug(
-            msg.format(**locals())
-        )
-    if msg == failure_message:
+    result = logger.debug(event)
+    if event.failed:
         result = 1
     return result
 
@@ -128,28 +188,73 @@ class ErrorClass(object):
 
     It takes a redbaron node and a str to describe why it can't be fixed.
     """
-    def __init__(self, row_from, row_to, reason):
+    def __init__(self, row_from, row_to, reason, context):
         """
-        :param node: Redbaron node that can't be fixed.
-        :type node: redbaron.Node
+        :param row_from: First row of the code that can't be fixed.
+        :type row_from: int
+        :param row_to: Last row of the code that can't be fixed.
+        :type row_to: int
         :param reason: Reason that the thing cannot be fixed.
         :type reason: str
+        :param context: The conversion that the error belongs to.
+        :type context: ConversionContext
         """
         super(ErrorClass, self).__init__()
 
         self.row = row_from
         self.row_to = row_to
         self.reason = reason
-        ALIAS_DICT["errors"].add(self)
+        context[context.ERRORS].add(self)
 
     @classmethod
-    def from_node(cls, node, reason):
-        bbox = node.absolute_bounding_box
+    def from_node(cls, node, reason, context):
+        lines = node_lines(node)
+        row, row_to = lines if lines is not None else (0, 0)
+        return cls(row_from=row, row_to=row_to, reason=reason, context=context)
 
-        row = bbox.top_left.line - 1
-        row_to = bbox.bottom_right.line - 1
-        reason = reason
-        return cls(row_from=row, row_to=row_to, reason=reason)
+
+class FileResult(object):
+    """
+    FileResult is a small record describing what happened to a single file.
+
+    It is what gets sent back from the worker processes when converting in
+    parallel, so it deliberately holds no source code. Just whether the file
+    changed, the already formatted error messages and how long it took.
+    """
+    def __init__(self, path, changed=False, errors=None, timings=None,
+                 short_circuited=False, aborted=False, output=None):
+        """
+        :param path: The source file that was processed.
+        :type path: str
+        :param changed: True if the converted code was written out.
+        :type changed: bool
+        :param output: The file that the converted code was written to.
+            None if it was not written to a file.
+        :type output: str|None
+        :param short_circuited: True if the file never mentioned a binding and
+            was not parsed at all.
+        :type short_circuited: bool
+        :param aborted: True if the conversion was given up on because it
+            took too long or its worker process died.
+        :type aborted: bool
+        :param errors: Formatted error messages recovered from the file.
+        :type errors: list[str...]
+        :param timings: Seconds spent on each step of the conversion.
+        :type timings: dict
+        """
+        super(FileResult, self).__init__()
+        self.path = path
+        self.changed = changed
+        self.errors = errors or []
+        self.timings = timings or {}
+        self.short_circuited = short_circuited
+        self.aborted = aborted
+        self.output = output
+
+    def __repr__(self):
+        return "<FileResult path:\"%s\" changed:%s errors:%d>" % (
+            self.path, self.changed, len(self.errors)
+        )
 
 
 class UserInputRequiredException(BaseException):
@@ -159,9 +264,14 @@ class UserInputRequiredException(BaseException):
     """
 
 
-class AliasDictClass(dict):
+class ConversionContext(dict):
     """
-    Global state data store
+    ConversionContext is the state data store for a single conversion.
+
+    A new one is created by every call to run() and is handed explicitly to
+    each of the _modules processes. Nothing is shared at the module level, so
+    several conversions can run on threads in the same interpreter without
+    mixing up their bindings, aliases and errors.
     """
     BINDINGS = "bindings"
     ALIASES = "root_aliases"
@@ -170,7 +280,7 @@ class AliasDictClass(dict):
     ERRORS = "errors"
 
     def __init__(self):
-        super(AliasDictClass, self).__init__(
+        super(ConversionContext, self).__init__(
             dict([
                 (self.BINDINGS, set()),
                 (self.ALIASES, set()),
@@ -180,21 +290,6 @@ class AliasDictClass(dict):
             ])
         )
 
-    def clean(self):
-        """clean will reset the AliasDict global object."""
-        GENERAL_LOGGER.debug(color_text(
-            text="Cleaning the global AliasDict",
-            color=ANSI.colors.red
-        ))
-        self[self.BINDINGS] = set()
-        self[self.ALIASES] = set()
-        self[self.USED] = set()
-        self[self.WARNINGS] = set()
-        self[self.ERRORS] = set()
-
-
-ALIAS_DICT = AliasDictClass()
-
 
 def merge_dict(lhs, rhs, keys=None, keys_both=False):
     """
@@ -252,6 +347,39 @@ def supported_binding(binding_str):
     return None
 
 
+# "Qt" is matched as a whole word so that files already importing from Qt.py
+#   still get their misplaced members fixed.
+_binding_reference_regex = re.compile(
+    r"\b(?:{names})\b".format(
+        names="|".join(
+            re.escape(name)
+            for name in sorted(
+                set(__supported_bindings__) |
+                set(__suplimentary_bindings__) |
+                set(["Qt"]),
+                key=len, reverse=True
+            )
+        )
+    )
+)
+
+
+def references_bindings(text):
+    """
+    references_bindings is the cheap lexical check that runs before we hand a
+    file over to redbaron.
+    It just scans the raw text for the name of any binding that we support,
+    so it can give false positives (comments, strings) but never skips a
+    file that imports one of them.
+
+    :param text: Text from a python file.
+    :type text: str
+    :return: True if the text mentions a binding and should be converted.
+    :rtype: bool
+    """
+    return _binding_reference_regex.search(text) is not None
+
+
 def is_py(path):
     """
     My helper method for process_folder to decide if a file is a python file
@@ -308,3 +436,23 @@ def build_exc(error, line_data):
         ),
         color=ANSI.colors.red,
     ))
+
+
+def format_errors(errors, line_data):
+    """
+    format_errors builds the user facing message for each ErrorClass.
+
+    :param errors: The ErrorClass instances recovered from a file.
+    :type errors: Iterable[qt_py_convert.general.ErrorClass]
+    :param line_data: List of lines from the file we are working on.
+    :type line_data: List[str...]
+    :return: One formatted message per error.
+    :rtype: list[str...]
+    """
+    messages = []
+    for error in errors:
+        try:
+            build_exc(error, line_data)
+        except UserInputRequiredException as err:
+            messages.append(str(err))
+    return messages
@@ -0,0 +1,138 @@
+# Copyright 2018 Digital Domain 3.0
+#
+# Licensed under the Apache License, Version 2.0 (the "Apache License")
+# with the following modification; you may not use this file except in
+# compliance with the Apache License and the following modification to it:
+# Section 6. Trademarks. is deleted and replaced with:
+#
+# 6. Trademarks. This License does not grant permission to use the trade
+#    names, trademarks, service marks, or product names of the Licensor
+#    and its affiliates, except as required to comply with Section 4(c) of
+#    the License and to reproduce the content of the NOTICE file.
+#
+# You may obtain a copy of the Apache License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the Apache License with the above modification is
+# distributed on an "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY
+# KIND, either express or implied. See the Apache License for the specific
+# language governing permissions and limitations under the Apache License.
+"""
+lines finds the line numbers of redbaron nodes.
+
+node.absolute_bounding_box walks the tree up to the node and adds up the
+length of everything before it, every time it is asked. That is why the
+line numbers used to be turned off with "skip_lineno" wherever speed
+mattered.
+
+A LineIndex renders the tree once, taking note of where every node starts
+and ends, and keeps the offsets that each line starts at. A node's line is
+then a dictionary lookup and a binary search.
+
+The positions are those of the tree when it was indexed, so tracking the
+tree straight after parsing gives the lines of the original source, even
+after earlier replacements changed the number of lines. Nodes that were
+created later by a replacement fall back to absolute_bounding_box.
+
+A tree that is never modified, as with span edits, can be tracked lazily.
+Its index is only built the first time that node_lines is asked for one of
+its nodes, so conversions that never log a change or hit an error never
+render it.
+"""
+import bisect
+import re
+import weakref
+
+from qt_py_convert.visitor import render_spans
+
+_NEWLINE = re.compile(r"\n")
+
+_indexes = weakref.WeakKeyDictionary()
+
+
+class LineIndex(object):
+    """
+    LineIndex maps the nodes of a redbaron tree to their lines.
+    """
+    def __init__(self, red):
+        """
+        :param red: The redbaron ast to index.
+        :type red: redbaron.RedBaron
+        """
+        super(LineIndex, self).__init__()
+        self._nodes = []
+        text, self._spans = render_spans(red, nodes=self._nodes)
+        self._starts = [0]
+        self._starts.extend(match.end() for match in _NEWLINE.finditer(text))
+
+    def line(self, offset):
+        """
+        line returns the zero based line that an offset is on.
+
+        :param offset: Offset into the text of the tree.
+        :type offset: int
+        :rtype: int
+        """
+        return bisect.bisect_right(self._starts, offset) - 1
+
+    def node_lines(self, node):
+        """
+        node_lines returns the zero based first and last line of a node.
+
+        :param node: A node of the indexed tree.
+        :type node: redbaron.Node
+        :return: The lines or None if the node is not in the index.
+        :rtype: tuple[int,int]|None
+        """
+        span = self._spans.get(id(node))
+        if span is None:
+            return None
+        start, end = span
+        return self.line(start), self.line(end)
+
+
+def track(red, lazy=False):
+    """
+    track indexes the lines of a tree for node_lines.
+    The index goes away with the tree.
+
+    :param red: The redbaron ast to index.
+    :type red: redbaron.RedBaron
+    :param lazy: Leave building the index to the first node_lines call for
+        the tree. Only use it for trees that are not modified before then.
+    :type lazy: bool
+    """
+    if lazy:
+        _indexes.setdefault(red, None)
+    else:
+        _indexes[red] = LineIndex(red)
+
+
+def node_lines(node):
+    """
+    node_lines returns the zero based first and last line of a node.
+    The index of its tree is used if the tree was tracked, otherwise it
+    falls back to redbaron's absolute_bounding_box.
+
+    :param node: Redbaron node.
+    :type node: redbaron.Node
+    :return: The lines or None if they can not be worked out.
+    :rtype: tuple[int,int]|None
+    """
+    index = None
+    if _indexes:
+        root = getattr(node, "root", None)
+        if root is not None and root in _indexes:
+            index = _indexes[root]
+            if index is None:
+                index = _indexes[root] = LineIndex(root)
+    if index is not None:
+        lines = index.node_lines(node)
+        if lines is not None:
+            return lines
+    if not hasattr(node, "absolute_bounding_box"):
+        return None
+    bbox = node.absolute_bounding_box
+    return bbox.top_left.line - 1, bbox.bottom_right.line - 1
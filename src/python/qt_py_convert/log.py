@@ -23,12 +23,17 @@ import logging
 import os
 import sys
 
-from qt_py_convert.color import ANSI, color_text
+from qt_py_convert.color import ANSI, ansi_text, supports_color
 
 __BASE_LOGGING_NAME = "QtPyConvert"
 
 
 class ColoredFormatter(logging.Formatter):
+    """
+    ColoredFormatter picks between the plain and the colored format when a
+    record is formatted, so that creating a logger does not have to check
+    the terminal.
+    """
     COLORS = {
         'WARNING': ANSI.colors.orange,
         'INFO': ANSI.colors.white,
@@ -37,29 +42,34 @@ class ColoredFormatter(logging.Formatter):
         'ERROR': ANSI.colors.red
     }
 
-    def __init__(self, fmt, dt=None):
+    def __init__(self, fmt, dt=None, colored_fmt=None):
         logging.Formatter.__init__(self, fmt, dt)
+        self._colored = logging.Formatter(colored_fmt or fmt, dt)
 
     def format(self, record):
+        if not supports_color():
+            return logging.Formatter.format(self, record)
         levelname = record.levelname
         if levelname in self.COLORS:
-            levelname_color = color_text(
+            levelname_color = ansi_text(
                 text=levelname,
                 color=self.COLORS[levelname],
                 style=ANSI.styles.strong
             )
             record.levelname = levelname_color
-        return logging.Formatter.format(self, record)
+        return self._colored.format(record)
 
 
 def get_formatter(name="%(name)s", name_color=ANSI.colors.purple,
                   name_style=ANSI.styles.plain, msg_color=ANSI.colors.white):
 
-    custom_name = color_text(text=name, color=name_color, style=name_style)
-    message = color_text(text="%(message)s", color=msg_color)
+    template = "%(asctime)s - %(levelname)s | [{name}] {message}"
+    custom_name = ansi_text(text=name, color=name_color, style=name_style)
+    message = ansi_text(text="%(message)s", color=msg_color)
     formatter = ColoredFormatter(
-        "%(asctime)s - %(levelname)s | [" + custom_name + "] " + message,
-        "%Y-%m-%d %H:%M:%S"
+        template.format(name=name, message="%(message)s"),
+        "%Y-%m-%d %H:%M:%S",
+        colored_fmt=template.format(name=custom_name, message=message),
     )
     return formatter
 
@@ -0,0 +1,231 @@
+# Copyright 2018 Digital Domain 3.0
+#
+# Licensed under the Apache License, Version 2.0 (the "Apache License")
+# with the following modification; you may not use this file except in
+# compliance with the Apache License and the following modification to it:
+# Section 6. Trademarks. is deleted and replaced with:
+#
+# 6. Trademarks. This License does not grant permission to use the trade
+#    names, trademarks, service marks, or product names of the Licensor
+#    and its affiliates, except as required to comply with Section 4(c) of
+#    the License and to reproduce the content of the NOTICE file.
+#
+# You may obtain a copy of the Apache License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the Apache License with the above modification is
+# distributed on an "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY
+# KIND, either express or implied. See the Apache License for the specific
+# language governing permissions and limitations under the Apache License.
+"""
+manifest remembers what process_folder did to each file, so that the next
+run over the same tree can skip the files that have not changed since.
+
+Each entry holds the size, modified time and content hash of the file as it
+was left after the run, and the outcome of its conversion. A file whose size
+and modified time still match is skipped with a single stat call. When only
+the modified time moved, the content hash decides. A file that was written
+somewhere else also keeps the size and modified time of that output, so
+that it is converted again once its output is removed or edited.
+"""
+import hashlib
+import json
+import os
+import tempfile
+
+from qt_py_convert.log import get_logger
+
+MANIFEST_LOG = get_logger("manifest")
+
+MANIFEST_NAME = ".qt_py_convert_manifest.json"
+# Bump when the layout of the entries changes.
+MANIFEST_VERSION = 2
+
+CHANGED = "changed"
+UNCHANGED = "unchanged"
+SKIPPED = "skipped"
+ERRORS = "errors"
+ABORTED = "aborted"
+# Files with these outcomes are always converted again, so that their errors
+#   keep getting reported until they are fixed.
+_RETRY = (ERRORS, ABORTED)
+
+
+def _sha1(fp):
+    digest = hashlib.sha1()
+    with open(fp, "rb") as fh:
+        for block in iter(lambda: fh.read(1024 * 1024), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def outcome(result):
+    """
+    outcome summarizes a FileResult for the manifest.
+
+    :param result: The record returned from _process_file.
+    :type result: qt_py_convert.general.FileResult
+    :return: One of CHANGED, UNCHANGED, SKIPPED, ERRORS or ABORTED.
+    :rtype: str
+    """
+    if result.aborted:
+        return ABORTED
+    if result.errors:
+        return ERRORS
+    if result.short_circuited:
+        return SKIPPED
+    if result.changed:
+        return CHANGED
+    return UNCHANGED
+
+
+class Manifest(object):
+    """
+    Manifest is a json file of absolute source path to entry.
+    It is only read and written by the parent process.
+    """
+    def __init__(self, path, environment):
+        """
+        :param path: Path of the manifest file.
+        :type path: str
+        :param environment: Everything besides the source that changes the
+            conversion. See qt_py_convert.cache.environment_key. A manifest
+            written with a different environment is ignored.
+        :type environment: str
+        """
+        super(Manifest, self).__init__()
+        self.path = os.path.abspath(path)
+        self.environment = hashlib.sha1(
+            environment.encode("utf-8")
+        ).hexdigest()
+        self.entries = {}
+        try:
+            with open(self.path, "rb") as fh:
+                data = json.loads(fh.read().decode("utf-8"))
+        except (IOError, OSError, ValueError):
+            return
+        if data.get("version") != MANIFEST_VERSION or \
+                data.get("environment") != self.environment:
+            MANIFEST_LOG.debug(
+                "Ignoring {path}, it was written by a different "
+                "conversion.".format(path=self.path)
+            )
+            return
+        self.entries = data["files"]
+
+    def __repr__(self):
+        return "<Manifest path:\"%s\" entries:%d>" % (
+            self.path, len(self.entries)
+        )
+
+    def unchanged(self, fp):
+        """
+        unchanged checks if the file is the same as the last run left it.
+
+        :param fp: Path of the source file.
+        :type fp: str
+        :return: True if the file can be skipped.
+        :rtype: bool
+        """
+        entry = self.entries.get(os.path.abspath(fp))
+        if entry is None or entry["outcome"] in _RETRY:
+            return False
+        if not self._output_unchanged(entry):
+            return False
+        try:
+            stat = os.stat(fp)
+        except OSError:
+            return False
+        if stat.st_size != entry["size"]:
+            return False
+        if stat.st_mtime == entry["mtime"]:
+            return True
+        # Touched, checked out again, ... The content decides.
+        try:
+            if _sha1(fp) != entry["sha1"]:
+                return False
+        except (IOError, OSError):
+            return False
+        entry["mtime"] = stat.st_mtime
+        return True
+
+    @staticmethod
+    def _output_unchanged(entry):
+        """
+        _output_unchanged checks that the output of an entry was left alone.
+
+        :param entry: The manifest entry of a source file.
+        :type entry: dict
+        :rtype: bool
+        """
+        output = entry.get("output")
+        if output is None:
+            return True
+        try:
+            stat = os.stat(output["path"])
+        except OSError:
+            return False
+        return stat.st_size == output["size"] and \
+            stat.st_mtime == output["mtime"]
+
+    def record(self, result):
+        """
+        record stores the state that the file was left in by the conversion.
+
+        :param result: The record returned from _process_file.
+        :type result: qt_py_convert.general.FileResult
+        """
+        fp = os.path.abspath(result.path)
+        try:
+            stat = os.stat(fp)
+            sha1 = _sha1(fp)
+        except (IOError, OSError):
+            self.entries.pop(fp, None)
+            return
+        output = None
+        if result.output and os.path.abspath(result.output) != fp:
+            output_path = os.path.abspath(result.output)
+            try:
+                output_stat = os.stat(output_path)
+            except OSError:
+                self.entries.pop(fp, None)
+                return
+            output = {
+                "path": output_path,
+                "size": output_stat.st_size,
+                "mtime": output_stat.st_mtime,
+            }
+        self.entries[fp] = {
+            "size": stat.st_size,
+            "mtime": stat.st_mtime,
+            "sha1": sha1,
+            "outcome": outcome(result),
+            "output": output,
+        }
+
+    def save(self):
+        """save writes the manifest atomically."""
+        data = json.dumps(
+            {
+                "version": MANIFEST_VERSION,
+                "environment": self.environment,
+                "files": self.entries,
+            },
+            sort_keys=True
+        ).encode("utf-8")
+        folder = os.path.dirname(self.path)
+        try:
+            if not os.path.isdir(folder):
+                os.makedirs(folder)
+            fd, temp_path = tempfile.mkstemp(dir=folder, suffix=".tmp")
+            with os.fdopen(fd, "wb") as fh:
+                fh.write(data)
+            os.rename(temp_path, self.path)
+        except (IOError, OSError) as err:
+            MANIFEST_LOG.warning(
+                "Could not write the manifest {path}: {err}".format(
+                    path=self.path, err=err
+                )
+            )
@@ -21,14 +21,107 @@
 # language governing permissions and limitations under the Apache License.
 import re
 
-import Qt
+try:
+    from types import MappingProxyType as _frozen
+except ImportError:  # Python 2
+    _frozen = dict
 
 from qt_py_convert.log import get_logger
+from qt_py_convert.qt_members import Qt
 from qt_py_convert.general import _custom_misplaced_members
 
 MAPPINGS_LOG = get_logger("mappings")
 
 
+def _build_member_modules():
+    """
+    _build_member_modules maps every member of the Qt.py common members to
+    the module that it lives in. A member listed under more than one module
+    goes to the first of them, like the old per module expressions did.
+    """
+    member_modules = {}
+    for module_name in Qt._common_members:
+        for member in Qt._common_members[module_name]:
+            member_modules.setdefault(member, module_name)
+    return member_modules
+
+
+# Merged misplaced member tables, keyed by the sorted bindings they were
+#   merged for. See _misplaced_table.
+_MISPLACED_TABLES = {}
+
+# "QLineEdit" -> "QtWidgets", "QLine" -> "QtCore", ...
+MEMBER_MODULES = _build_member_modules()
+# Longest first, a "module.member" mapping may have a prefix, "PyQt4.QtGui".
+_MODULE_NAMES = sorted(Qt._common_members, key=len, reverse=True)
+# The member name in "<module>.<member>" ends at the first of these.
+_MEMBER_END = re.compile(r"[.\[(\n]")
+
+
+def attribute_module(text):
+    """
+    attribute_module looks up where the member in "<module>.<member>..."
+    lives in Qt.py. It is a split and a dictionary lookup, so "QtGui.QLine"
+    and "QtGui.QLineEdit" are told apart by the whole member name.
+
+    :param text: Dumps of an AtomTrailersNode or DottedNameNode.
+    :type text: str
+    :return: The Qt.py module of the member and the text from the member
+        onwards, or None if the text does not start with a common module
+        followed by one of its members.
+    :rtype: tuple[str,str]|None
+    """
+    module, dot, rest = text.partition(".")
+    if not dot or module not in Qt._common_members:
+        return None
+    end = _MEMBER_END.search(rest)
+    member = rest[:end.start()] if end else rest
+    target = MEMBER_MODULES.get(member)
+    if target is None:
+        return None
+    return target, rest
+
+
+def _misplaced_table(bindings):
+    """
+    _misplaced_table merges the misplaced members of the bindings into a
+    single source to destination table.
+    Tables are built once for each combination of bindings and are read
+    only, nothing that happens to one file can leak into the next.
+
+    :param bindings: The bindings that a file imported.
+    :type bindings: Iterable[str]
+    :return: Read only dictionary of misplaced source to Qt.py destination.
+    :rtype: dict
+    """
+    key = tuple(sorted(bindings))
+    table = _MISPLACED_TABLES.get(key)
+    if table is not None:
+        return table
+
+    members = dict(Qt._misplaced_members.get(Qt.__binding__.lower(), {}))
+    for binding in key:
+        if binding in Qt._misplaced_members:
+            MAPPINGS_LOG.debug("Merging {misplaced} to bindings".format(
+                misplaced=Qt._misplaced_members.get(binding, {})
+            ))
+            members.update(Qt._misplaced_members.get(binding, {}))
+        elif binding in _custom_misplaced_members:
+            members.update(_custom_misplaced_members.get(binding, {}))
+        else:
+            MAPPINGS_LOG.debug(
+                "Could not find misplaced members for {}".format(binding)
+            )
+
+    table = {}
+    for source, dest in members.items():
+        if isinstance(dest, (list, tuple)):
+            dest = dest[0]
+        table[source] = dest
+    table = _MISPLACED_TABLES[key] = _frozen(table)
+    return table
+
+
 def misplaced_members(aliases, mappings):
     """
     misplaced_members uses the internal "_misplaced_members" from Qt.py as
@@ -36,6 +129,10 @@ def misplaced_members(aliases, mappings):
     detected binding members. The Qt.py misplaced members aid in updating
     bindings to Qt5 compatible locations.
 
+    Every mapping that points at a misplaced member is pointed at its new
+    location. Every other misplaced member is added to the mappings so that
+    it is converted wherever it is used.
+
     :param aliases: Aliases is the replacement information that is build
         automatically from qt_py_convert.
     :type aliases: dict
@@ -44,42 +141,44 @@ def misplaced_members(aliases, mappings):
     :return: A tuple of aliases and mappings that have been updated.
     :rtype: tuple[dict,dict]
     """
-    members = Qt._misplaced_members.get(Qt.__binding__.lower(), {})
-    for binding in aliases["bindings"]:
-        if binding in Qt._misplaced_members:
-            MAPPINGS_LOG.debug("Merging {misplaced} to bindings".format(
-                misplaced=Qt._misplaced_members.get(binding, {})
-            ))
-            members.update(Qt._misplaced_members.get(binding, {}))
-        elif binding in _custom_misplaced_members:
-            members.update(_custom_misplaced_members.get(binding, {}))
-        else:
+    if not aliases["bindings"]:
+        return aliases, mappings
+    table = _misplaced_table(aliases["bindings"])
+    if not table:
+        return aliases, mappings
+
+    # Reverse index of the mappings, the misplaced source to the keys that
+    #   map to it.
+    referenced = {}
+    for current_key, value in mappings.items():
+        if value in table:
+            referenced.setdefault(value, []).append(current_key)
+
+    _msg = "Replacing \"{original}\" with \"{replacement}\" in mappings"
+    for source, keys in referenced.items():
+        dest = table[source]
+        for current_key in keys:
             MAPPINGS_LOG.debug(
-                "Could not find misplaced members for {}".format(binding)
+                _msg.format(original=source, replacement=dest)
             )
+            mappings[current_key] = dest
 
-        _msg = "Replacing \"{original}\" with \"{replacement}\" in mappings"
-        if members:
-            for source in members:
-                replaced = False
-                dest = members[source]
-                if isinstance(dest, (list, tuple)):
-                    dest, _ = members[source]
-                for current_key in mappings:
-                    if mappings[current_key] == source:
-                        MAPPINGS_LOG.debug(
-                            _msg.format(
-                                original=mappings[current_key],
-                                replacement=dest
-                            )
-                        )
-                        mappings[current_key] = dest
-                        replaced = True
-                if not replaced:
-                    MAPPINGS_LOG.debug(
-                        "Adding {bind} in mappings".format(bind=dest)
-                    )
-                    mappings[source] = dest
+    # Add every misplaced member that nothing pointed at.
+    previous = dict(
+        (source, mappings[source])
+        for source in referenced if source in mappings
+    )
+    mappings.update(table)
+    for source in referenced:
+        if source in previous:
+            mappings[source] = previous[source]
+        else:
+            del mappings[source]
+    MAPPINGS_LOG.debug(
+        "Added {count} misplaced members in mappings".format(
+            count=len(table) - len(referenced)
+        )
+    )
     return aliases, mappings
 
 
@@ -87,7 +186,7 @@ def convert_mappings(aliases, mappings):
     """
     convert_mappings will build a proper mapping dictionary using any
     aliases that we have discovered previously.
-    It builds regular expressions based off of the Qt._common_members and will
+    It looks the member of each mapping up in MEMBER_MODULES and will
     replace the mappings that are used with updated ones in Qt.py
 
     :param aliases: Aliases is the replacement information that is build
@@ -99,32 +198,20 @@ def convert_mappings(aliases, mappings):
         however it is updating the aliases["used"] set.
     :rtype: dict
     """
-    expressions = [
-        re.compile(
-            r"(?P<module>{modules})\.(?P<widget>{widgets})$".format(
-                # Regular expression
-                modules="|".join(
-                    re.escape(name) for name in Qt._common_members.keys()
-                ),
-                widgets="|".join(
-                    re.escape(widget) for widget in Qt._common_members[module]
-                )
-            )
-        )
-        for module in Qt._common_members.keys()
-    ]
     for from_mapping in mappings:
-        iterable = zip(Qt._common_members.keys(), expressions)
-        for module_name, expression in iterable:
-            modified_mapping = expression.sub(
-                r"{module}.\2".format(module=module_name),
-                mappings[from_mapping]
-            )
-            if modified_mapping != mappings[from_mapping]:
+        head, dot, member = mappings[from_mapping].rpartition(".")
+        module_name = MEMBER_MODULES.get(member)
+        if not dot or module_name is None:
+            continue
+        for name in _MODULE_NAMES:
+            if head.endswith(name):
                 # Mapping changed
                 # _---------------------------_ #
                 # We shouldn't be adding it here.
                 # We don't know if it's used yet.
                 #       aliases["used"].add(module_name)
-                mappings[from_mapping] = modified_mapping
+                mappings[from_mapping] = "{prefix}{module}.{member}".format(
+                    prefix=head[:-len(name)], module=module_name, member=member
+                )
+                break
     return mappings
@@ -0,0 +1,395 @@
+# Copyright 2018 Digital Domain 3.0
+#
+# Licensed under the Apache License, Version 2.0 (the "Apache License")
+# with the following modification; you may not use this file except in
+# compliance with the Apache License and the following modification to it:
+# Section 6. Trademarks. is deleted and replaced with:
+#
+# 6. Trademarks. This License does not grant permission to use the trade
+#    names, trademarks, service marks, or product names of the Licensor
+#    and its affiliates, except as required to comply with Section 4(c) of
+#    the License and to reproduce the content of the NOTICE file.
+#
+# You may obtain a copy of the Apache License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the Apache License with the above modification is
+# distributed on an "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY
+# KIND, either express or implied. See the Apache License for the specific
+# language governing permissions and limitations under the Apache License.
+"""
+parallel holds the process pool helpers used to spread file conversions
+across several worker processes.
+"""
+import collections
+import multiprocessing
+import os
+import time
+
+try:
+    from multiprocessing.connection import wait as _wait
+except ImportError:  # Python 2
+    import select
+
+    def _wait(connections, timeout=None):
+        return select.select(connections, [], [], timeout)[0]
+
+from qt_py_convert.log import get_logger
+
+
+PARALLEL_LOG = get_logger("parallel")
+
+# Files are packed into tasks of up to this many bytes of source, so that a
+#   worker is not sent a message per file when the files are tiny.
+DEFAULT_BATCH_SIZE = 64 * 1024
+# Keep at least this many batches per worker so that packing does not leave
+#   workers idle on small trees.
+_BATCHES_PER_WORKER = 4
+
+
+def resolve_jobs(jobs):
+    """
+    resolve_jobs turns the user facing "jobs" value into a worker count.
+
+    :param jobs: Number of workers requested. Anything below 1 means "use
+        every core on this machine".
+    :type jobs: int|None
+    :return: The number of worker processes to start.
+    :rtype: int
+    """
+    if jobs is None:
+        return 1
+    if jobs < 1:
+        try:
+            return multiprocessing.cpu_count()
+        except NotImplementedError:
+            return 1
+    return jobs
+
+
+def largest_first(files, history=None):
+    """
+    largest_first orders the files so that the most expensive ones are
+    handed to the workers first. Starting them last would leave a single
+    worker busy with them long after the others ran out of work.
+
+    The cost is the time a file took before, if it has not changed size
+    since. Every other file is estimated from its size.
+
+    :param files: File paths to order.
+    :type files: list[str...]
+    :param history: Dictionary of absolute file path to (size, seconds) from
+        earlier runs. See qt_py_convert.cache.ResultCache.timings.
+    :type history: dict|None
+    :return: The files, most expensive first. Ties keep their order.
+    :rtype: list[str...]
+    """
+    history = history or {}
+    total_size = sum(size for size, _ in history.values())
+    total_seconds = sum(seconds for _, seconds in history.values())
+    # Seconds per byte. Without any history the sizes are compared as is.
+    rate = float(total_seconds) / total_size if total_size else 1.0
+
+    def _cost(fp):
+        try:
+            size = os.path.getsize(fp)
+        except OSError:
+            return 0
+        previous = history.get(os.path.abspath(fp))
+        if previous and previous[0] == size:
+            return previous[1]
+        return size * rate
+
+    costs = dict((fp, _cost(fp)) for fp in files)
+    return sorted(files, key=costs.get, reverse=True)
+
+
+def batch_by_size(files, jobs, batch_size=DEFAULT_BATCH_SIZE):
+    """
+    batch_by_size packs the files into batches of up to "batch_size" bytes.
+    Files at least that large are put in a batch of their own. The order of
+    the files is kept, so largest_first ordering carries over to the batches.
+
+    :param files: File paths to pack.
+    :type files: list[str...]
+    :param jobs: Number of workers the batches are spread across. The batch
+        size shrinks so that each of them gets several batches.
+    :type jobs: int
+    :param batch_size: Maximum number of bytes in a batch. Anything below 1
+        puts every file in a batch of its own.
+    :type batch_size: int
+    :return: List of batches of file paths.
+    :rtype: list[list[str...]]
+    """
+    if batch_size < 1:
+        return [[fp] for fp in files]
+
+    sizes = {}
+    for fp in files:
+        try:
+            sizes[fp] = os.path.getsize(fp)
+        except OSError:
+            sizes[fp] = 0
+    limit = min(
+        batch_size,
+        sum(sizes.values()) // (max(jobs, 1) * _BATCHES_PER_WORKER)
+    )
+
+    batches = []
+    batch, batch_bytes = [], 0
+    for fp in files:
+        if batch and batch_bytes + sizes[fp] > limit:
+            batches.append(batch)
+            batch, batch_bytes = [], 0
+        batch.append(fp)
+        batch_bytes += sizes[fp]
+    if batch:
+        batches.append(batch)
+    return batches
+
+
+def imap_unordered(function, tasks, jobs):
+    """
+    imap_unordered runs "function" over every task in a pool of "jobs"
+    worker processes, yielding the results as soon as they come back.
+
+    Both the function and the tasks have to be picklable. Workers are
+    expected to return small result records rather than converted source so
+    that the cost of sending results back stays negligible.
+
+    :param function: Module level callable run in the workers.
+    :type function: callable
+    :param tasks: Iterable of arguments. Each one is passed to "function".
+    :type tasks: list
+    :param jobs: Number of worker processes to start.
+    :type jobs: int
+    :return: Generator of the values returned by "function".
+    :rtype: generator
+    """
+    tasks = list(tasks)
+    jobs = min(resolve_jobs(jobs), len(tasks)) or 1
+    if jobs == 1:
+        for task in tasks:
+            yield function(task)
+        return
+
+    PARALLEL_LOG.debug(
+        "Starting {jobs} workers for {count} tasks".format(
+            jobs=jobs, count=len(tasks)
+        )
+    )
+    pool = multiprocessing.Pool(processes=jobs)
+    try:
+        for result in pool.imap_unordered(function, tasks):
+            yield result
+        pool.close()
+    except BaseException:
+        pool.terminate()
+        raise
+    finally:
+        pool.join()
+
+
+# Messages sent from a guarded worker back to the parent.
+_STARTED = "started"
+_FINISHED = "finished"
+
+
+def _guarded_worker(function, connection):
+    """
+    _guarded_worker is the main loop of the imap_guarded worker processes.
+    It converts batches until it is sent None, reporting every item it
+    starts so that the parent knows which one it is stuck on.
+    """
+    while True:
+        try:
+            batch = connection.recv()
+        except EOFError:
+            break
+        if batch is None:
+            break
+        for index, item in enumerate(batch):
+            connection.send((_STARTED, index))
+            connection.send((_FINISHED, function(item)))
+    connection.close()
+
+
+class _GuardedWorker(object):
+    """_GuardedWorker is the parent side of a single worker process."""
+    def __init__(self, function):
+        super(_GuardedWorker, self).__init__()
+        self.connection, child = multiprocessing.Pipe()
+        self.process = multiprocessing.Process(
+            target=_guarded_worker, args=(function, child)
+        )
+        self.process.daemon = True
+        self.process.start()
+        child.close()
+        self.batch = None
+        self.index = None
+        self.started = None
+        self.results = []
+        self.items_done = 0
+
+    def send(self, batch):
+        self.batch = batch
+        self.index = None
+        self.started = None
+        self.results = []
+        self.connection.send(batch)
+
+    def stop(self):
+        try:
+            self.connection.send(None)
+        except (IOError, OSError):
+            pass
+        self.process.join(1)
+        self.kill()
+
+    def kill(self):
+        if self.process.is_alive():
+            self.process.terminate()
+        self.process.join()
+        self.connection.close()
+
+
+def imap_guarded(function, batches, jobs, timeout=None, max_items=None, on_failure=None):
+    """
+    imap_guarded is imap_unordered for inputs that may never finish.
+    Every worker reports the item it starts on. An item that runs longer than
+    "timeout" seconds, or that takes its worker down with it, gets the
+    result of "on_failure" instead, its worker is replaced and the rest of
+    its batch is handed out again. Workers are also replaced after they
+    have processed "max_items" items, to cap how much memory they can grow.
+    A batch that is larger than what a worker has left is split, so its
+    results are yielded in more than one list.
+
+    :param function: Callable run on each item in the workers.
+    :type function: callable
+    :param batches: Lists of items. A batch is sent to a worker in one go.
+    :type batches: list[list]
+    :param jobs: Number of worker processes to start. At least one worker is
+        started when there is anything to do, even when jobs is 1.
+    :type jobs: int
+    :param timeout: Seconds an item may take before its worker is killed.
+        None waits forever.
+    :type timeout: float|None
+    :param max_items: Number of items a worker processes before it is
+        replaced. None keeps the workers for the whole run.
+    :type max_items: int|None
+    :param on_failure: Called with the item and the reason it failed to
+        build the result that is yielded in place of it.
+    :type on_failure: callable
+    :return: Generator of lists of results, in the order the items were in
+        their batch.
+    :rtype: generator
+    """
+    pending = collections.deque(batch for batch in batches if batch)
+    if not pending:
+        return
+    jobs = min(resolve_jobs(jobs), len(pending))
+    PARALLEL_LOG.debug(
+        "Starting {jobs} guarded workers for {count} tasks".format(
+            jobs=jobs, count=len(pending)
+        )
+    )
+    idle = [_GuardedWorker(function) for _ in range(jobs)]
+    busy = []
+
+    def _replace(worker, reason):
+        """
+        Kills the worker, fails the item it was stuck on and requeues the
+        items that have no result yet. A worker that died in between two
+        items was not stuck on any of them.
+        """
+        worker.kill()
+        busy.remove(worker)
+        index = len(worker.results)
+        if worker.index == index:
+            worker.results.append(on_failure(worker.batch[index], reason))
+            index += 1
+        if worker.batch[index:]:
+            pending.appendleft(worker.batch[index:])
+        if pending:
+            idle.append(_GuardedWorker(function))
+        return worker.results
+
+    try:
+        while pending or busy:
+            while pending and idle:
+                worker = idle.pop()
+                batch = pending.popleft()
+                if max_items:
+                    # Never send a worker more than it has left, the rest of
+                    # the batch goes to its replacement.
+                    left = max_items - worker.items_done
+                    if len(batch) > left:
+                        pending.appendleft(batch[left:])
+                        batch = batch[:left]
+                worker.send(batch)
+                busy.append(worker)
+
+            wait_for = None
+            if timeout is not None:
+                now = time.time()
+                deadlines = [
+                    worker.started + timeout - now
+                    for worker in busy if worker.started is not None
+                ]
+                if deadlines:
+                    wait_for = max(min(deadlines), 0)
+            ready = _wait([worker.connection for worker in busy], wait_for)
+
+            for worker in list(busy):
+                if worker.connection not in ready:
+                    continue
+                try:
+                    message = worker.connection.recv()
+                except (EOFError, IOError, OSError):
+                    results = _replace(worker, "Its worker process exited.")
+                    if results:
+                        yield results
+                    continue
+                if message[0] == _STARTED:
+                    worker.index = message[1]
+                    worker.started = time.time()
+                    continue
+
+                worker.results.append(message[1])
+                worker.started = None
+                worker.items_done += 1
+                if len(worker.results) < len(worker.batch):
+                    continue
+                busy.remove(worker)
+                yield worker.results
+                if max_items and worker.items_done >= max_items:
+                    PARALLEL_LOG.debug(
+                        "Replacing a worker after {count} items".format(
+                            count=worker.items_done
+                        )
+                    )
+                    worker.stop()
+                    if pending:
+                        idle.append(_GuardedWorker(function))
+                else:
+                    idle.append(worker)
+
+            if timeout is None:
+                continue
+            now = time.time()
+            for worker in list(busy):
+                if worker.started is not None and \
+                        now - worker.started > timeout:
+                    yield _replace(
+                        worker,
+                        "It did not finish within {timeout} seconds.".format(
+                            timeout=timeout
+                        )
+                    )
+    finally:
+        for worker in idle:
+            worker.stop()
+        for worker in busy:
+            worker.kill()
@@ -0,0 +1,297 @@
+# Copyright 2018 Digital Domain 3.0
+#
+# Licensed under the Apache License, Version 2.0 (the "Apache License")
+# with the following modification; you may not use this file except in
+# compliance with the Apache License and the following modification to it:
+# Section 6. Trademarks. is deleted and replaced with:
+#
+# 6. Trademarks. This License does not grant permission to use the trade
+#    names, trademarks, service marks, or product names of the Licensor
+#    and its affiliates, except as required to comply with Section 4(c) of
+#    the License and to reproduce the content of the NOTICE file.
+#
+# You may obtain a copy of the Apache License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the Apache License with the above modification is
+# distributed on an "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY
+# KIND, either express or implied. See the Apache License for the specific
+# language governing permissions and limitations under the Apache License.
+"""
+qt_members holds the parts of Qt.py that qt_py_convert reads, without
+importing Qt.py.
+
+Importing Qt.py imports a real binding, which costs every process several
+hundred milliseconds and tens of MB, and needs a binding on the converting
+host at all. We only read "_common_members", "_misplaced_members",
+"__version__" and "__binding__" from it, so those are kept in a snapshot
+file that is loaded instead.
+
+The live import is only used when:
+  - The snapshot file is missing or was written in an older format.
+  - QT_PY_CONVERT_LIVE_MEMBERS is set in the environment.
+
+An installed Qt.py with a different version than the snapshot is only noted
+in the debug log. Qt.py 2 dropped the PyQt4 and PySide members that the
+conversion is built on, so the snapshot of the last 1.x release is what we
+want even when a newer Qt.py is installed. Regenerate the snapshot after
+upgrading Qt.py within the supported versions with:
+
+    python -m qt_py_convert.qt_members
+"""
+import collections
+import json
+import logging
+import os
+import re
+import sys
+
+from qt_py_convert.log import get_logger
+
+MEMBERS_LOG = get_logger("qt_members")
+
+SNAPSHOT_VERSION = 1
+SNAPSHOT_PATH = os.path.join(os.path.dirname(__file__), "qt_members.json")
+LIVE_MEMBERS_ENV = "QT_PY_CONVERT_LIVE_MEMBERS"
+
+_version_regex = re.compile(
+    r"^__version__\s*=\s*[\"'](?P<version>[^\"']+)[\"']", re.MULTILINE
+)
+
+
+class QtMembers(object):
+    """
+    QtMembers has the same "_common_members", "_misplaced_members",
+    "__version__" and "__binding__" attributes as the Qt.py module.
+    """
+    def __init__(self, version, binding, common_members, misplaced_members,
+                 source):
+        """
+        :param version: Qt.py version the members came from.
+        :type version: str
+        :param binding: The binding Qt.py had loaded.
+        :type binding: str
+        :param common_members: Qt.py "_common_members".
+        :type common_members: dict
+        :param misplaced_members: Qt.py "_misplaced_members".
+        :type misplaced_members: dict
+        :param source: Where the members came from, "snapshot" or "live".
+        :type source: str
+        """
+        super(QtMembers, self).__init__()
+        self.__version__ = version
+        self.__binding__ = binding
+        self._common_members = common_members
+        self._misplaced_members = misplaced_members
+        self.source = source
+
+    def __repr__(self):
+        return "<QtMembers Qt.py:%s binding:%s from:%s>" % (
+            self.__version__, self.__binding__, self.source
+        )
+
+
+def _installed_version():
+    """
+    _installed_version reads the version of the installed Qt.py from its
+    source, which does not import a binding.
+
+    :return: The version or None if Qt.py could not be found.
+    :rtype: str|None
+    """
+    path = None
+    try:
+        from importlib.util import find_spec
+    except ImportError:  # Python 2
+        import imp
+        try:
+            fh, path, _ = imp.find_module("Qt")
+        except ImportError:
+            return None
+        if fh is not None:
+            fh.close()
+    else:
+        spec = find_spec("Qt")
+        if spec is None:
+            return None
+        path = spec.origin
+    if not path or not path.endswith(".py") or not os.path.isfile(path):
+        return None
+    with open(path) as fh:
+        match = _version_regex.search(fh.read())
+    return match.group("version") if match else None
+
+
+def _serializable(misplaced_members):
+    """
+    Qt.py stores [destination, function] for members it wraps itself.
+    The function is not used by us, so only the destination is kept.
+    """
+    out = collections.OrderedDict()
+    for binding, members in misplaced_members.items():
+        out[binding] = collections.OrderedDict()
+        for source, dest in members.items():
+            if isinstance(dest, (list, tuple)):
+                dest = [dest[0], None]
+            out[binding][source] = dest
+    return out
+
+
+def live():
+    """
+    live imports Qt.py and reads the members off of it.
+
+    :rtype: QtMembers
+    """
+    import Qt
+    return QtMembers(
+        version=Qt.__version__,
+        binding=Qt.__binding__,
+        common_members=Qt._common_members,
+        misplaced_members=Qt._misplaced_members,
+        source="live",
+    )
+
+
+def generate(path=SNAPSHOT_PATH):
+    """
+    generate writes a snapshot of the installed Qt.py to "path".
+
+    :param path: File to write the snapshot to.
+    :type path: str
+    :return: The members that were written.
+    :rtype: QtMembers
+    """
+    members = live()
+    data = collections.OrderedDict([
+        ("snapshot_version", SNAPSHOT_VERSION),
+        ("version", members.__version__),
+        ("binding", members.__binding__),
+        ("common_members", members._common_members),
+        ("misplaced_members", _serializable(members._misplaced_members)),
+    ])
+    with open(path, "w") as fh:
+        json.dump(data, fh, indent=1)
+        fh.write("\n")
+    return members
+
+
+def _native(value):
+    """json hands back unicode on python 2, the rest of the code wants str."""
+    if sys.version_info[0] != 2:
+        return value
+    if isinstance(value, unicode):
+        return value.encode("utf-8")
+    if isinstance(value, list):
+        return [_native(item) for item in value]
+    if isinstance(value, dict):
+        return collections.OrderedDict(
+            (_native(key), _native(item)) for key, item in value.items()
+        )
+    return value
+
+
+def from_snapshot(path=SNAPSHOT_PATH):
+    """
+    from_snapshot reads the members from a snapshot file.
+
+    :param path: The snapshot file.
+    :type path: str
+    :return: The members or None if the snapshot can not be used.
+    :rtype: QtMembers|None
+    """
+    try:
+        with open(path) as fh:
+            data = _native(
+                json.load(fh, object_pairs_hook=collections.OrderedDict)
+            )
+    except (IOError, OSError, ValueError) as err:
+        MEMBERS_LOG.debug("Could not read the Qt.py snapshot: {err}".format(
+            err=err
+        ))
+        return None
+    if data.get("snapshot_version") != SNAPSHOT_VERSION:
+        MEMBERS_LOG.debug(
+            "The Qt.py snapshot is version {found}, expected {expected}."
+            .format(found=data.get("snapshot_version"),
+                    expected=SNAPSHOT_VERSION)
+        )
+        return None
+    return QtMembers(
+        version=data["version"],
+        binding=data["binding"],
+        common_members=data["common_members"],
+        misplaced_members=data["misplaced_members"],
+        source="snapshot",
+    )
+
+
+def _live_or(members, reason):
+    """
+    _live_or imports Qt.py, falling back to "members" when that fails.
+    Importing Qt.py needs a binding, which the converting host may not have.
+
+    :param members: The members to use when Qt.py can not be imported.
+    :type members: QtMembers|None
+    :param reason: Why the live members are wanted, for the warning.
+    :type reason: str
+    :rtype: QtMembers
+    """
+    try:
+        return live()
+    except ImportError as err:
+        if members is None:
+            raise
+        MEMBERS_LOG.warning(
+            "{reason} but importing Qt.py failed: {err} Using the snapshot "
+            "of Qt.py {snapshot} instead.".format(
+                reason=reason, err=str(err).rstrip(".") + ".",
+                snapshot=members.__version__
+            )
+        )
+        return members
+
+
+def load(path=SNAPSHOT_PATH):
+    """
+    load returns the snapshot of the Qt.py members, falling back to
+    importing Qt.py when the snapshot can not be used.
+
+    :param path: The snapshot file.
+    :type path: str
+    :rtype: QtMembers
+    """
+    if os.environ.get(LIVE_MEMBERS_ENV):
+        return live()
+    members = from_snapshot(path)
+    if members is None:
+        fallback = None
+        if path != SNAPSHOT_PATH:
+            fallback = from_snapshot(SNAPSHOT_PATH)
+        return _live_or(
+            fallback, "The Qt.py snapshot {path} can not be used".format(
+                path=path
+            )
+        )
+    if MEMBERS_LOG.isEnabledFor(logging.DEBUG):
+        installed = _installed_version()
+        if installed is not None and installed != members.__version__:
+            MEMBERS_LOG.debug(
+                "Qt.py {installed} is installed but the snapshot is from "
+                "{snapshot}. Using the snapshot, set {env} to import Qt.py "
+                "instead.".format(
+                    installed=installed, snapshot=members.__version__,
+                    env=LIVE_MEMBERS_ENV
+                )
+            )
+    return members
+
+
+# Used in place of "import Qt".
+Qt = load()
+
+
+if __name__ == "__main__":
+    print(generate(sys.argv[1] if len(sys.argv) > 1 else SNAPSHOT_PATH))
@@ -19,17 +19,20 @@
 # distributed on an "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY
 # KIND, either express or implied. See the Apache License for the specific
 # language governing permissions and limitations under the Apache License.
+import functools
+import json
 import os
 import re
 import sys
+import time
 import traceback
 
-
-import Qt
+from qt_py_convert.qt_members import Qt
 if Qt.__version__ < "1.2.0.b2":
     raise ImportError(
         "Improper Qt.py version installed. Qt.py must be version 1.2.0.b2 or above. Version %s installed instead." % Qt.__version__
     )
+import baron
 import redbaron
 
 from qt_py_convert._modules import from_imports
@@ -37,11 +40,20 @@ from qt_py_convert._modules import imports
 from qt_py_convert._modules import psep0101
 from qt_py_convert._modules import unsupported
 from qt_py_convert.general import merge_dict, ErrorClass, \
-    ALIAS_DICT, change, UserInputRequiredException, ANSI,  \
-    __suplimentary_bindings__, is_py, build_exc, WriteFlag
+    ConversionContext, change, UserInputRequiredException, ANSI,  \
+    __suplimentary_bindings__, is_py, format_errors, WriteFlag, FileResult, \
+    references_bindings
 from qt_py_convert.color import color_text
-from qt_py_convert.mappings import convert_mappings, misplaced_members
+from qt_py_convert.mappings import convert_mappings, misplaced_members, \
+    attribute_module
 from qt_py_convert.log import get_logger
+from qt_py_convert.lines import track
+from qt_py_convert.manifest import Manifest, MANIFEST_NAME
+from qt_py_convert.parallel import imap_unordered, imap_guarded, \
+    largest_first, resolve_jobs, batch_by_size, DEFAULT_BATCH_SIZE
+from qt_py_convert.timings import timed
+from qt_py_convert.cache import environment_key
+from qt_py_convert.visitor import TreeVisitor
 
 COMMON_MODULES = list(Qt._common_members.keys()) + ["QtCompat"]
 
@@ -50,7 +62,7 @@ MAIN_LOG = get_logger("run")
 Qt4_Qt5_LOG = get_logger("qt4->qt5")
 
 
-def _cleanup_imports(red, aliases, mappings, skip_lineno=False):
+def _cleanup_imports(red, aliases, mappings, skip_lineno=False, visitor=None):
     """
     _cleanup_imports fixes the imports.
     Initially changing them as per the following:
@@ -76,7 +88,12 @@ def _cleanup_imports(red, aliases, mappings, skip_lineno=False):
         show the line numbers. This can give great performance increases
         because redbaron has trouble calculating the line number sometimes.
     :type skip_lineno: bool
+    :param visitor: The tree visitor shared by the conversion stages. A new
+        one is created from "red" when it is not passed.
+    :type visitor: qt_py_convert.visitor.TreeVisitor
     """
+    if visitor is None:
+        visitor = TreeVisitor(red)
     replaced = False
     deletion_index = []
     imps = red.find_all("FromImportNode")
@@ -125,7 +142,7 @@ def _cleanup_imports(red, aliases, mappings, skip_lineno=False):
                                  "think is wrong.",
                             color=ANSI.colors.green
                         ))
-                        child.parent.remove(child)
+                        visitor.remove(child)
                         continue
                     # What we want to replace to.
                     replace_text = "from Qt import {key}".format(
@@ -146,7 +163,7 @@ def _cleanup_imports(red, aliases, mappings, skip_lineno=False):
                         skip_lineno=skip_lineno
                     )
 
-                    child.replace(replace_text)
+                    visitor.replace(child, replace_text)
                     replaced = True
                 else:
                     deleting_message = "{name} \"{orig}\"".format(
@@ -160,16 +177,16 @@ def _cleanup_imports(red, aliases, mappings, skip_lineno=False):
                         replacement="",
                         skip_lineno=skip_lineno
                     )
-                    child.parent.remove(child)
+                    visitor.remove(child)
             else:
                 pass
     for child in reversed(deletion_index):
         MAIN_LOG.debug("Deleting {node}".format(node=child))
-        child.parent.remove(child)
+        visitor.remove(child)
         # red.remove(child)
 
 
-def _convert_attributes(red, aliases, skip_lineno=False):
+def _convert_attributes(red, aliases, skip_lineno=False, visitor=None):
     """
     _convert_attributes converts all AtomTrailersNodes and DottenNameNodes to 
       the Qt5/PySide2 api matching Qt.py..
@@ -190,111 +207,99 @@ def _convert_attributes(red, aliases, skip_lineno=False):
         show the line numbers. This can give great performance increases
         because redbaron has trouble calculating the line number sometimes.
     :type skip_lineno: bool
+    :param visitor: The tree visitor shared by the conversion stages. A new
+        one is created from "red" when it is not passed.
+    :type visitor: qt_py_convert.visitor.TreeVisitor
     """
-    # Compile our expressions
-    # Our expressions are basically as follows:
     # From:
     #   <Any Qt SLM>.<any_member of A>
     # To:
-    #   <A>.<\back reference to the member matched>
-    # Where A is the specific Qt SecondLevelModule that we are building this 
-    #   expression for.
-    # 
-    # Also sorry this is longer than 79 chars..
-    # It gets harder to read the more I try to make it more readable.
-    expressions = [
-        (
-            re.compile(
-                r"^(?P<module>{modules})\.(?P<widget>(?:{widgets})(?:[.\[(].*)?)$".format(             # Regular expression
-                    modules="|".join(re.escape(name) for name in Qt._common_members.keys()),
-                    widgets="|".join(re.escape(widget) for widget in Qt._common_members[module_name])
-                ),
-                re.MULTILINE
-            ),
-            module_name
-        )
-        for module_name in Qt._common_members
-    ]
-
-    def finder_function_factory(exprs):
-        """Basic function factory. Used as a find_all delegate for red."""
-        def finder_function(value):
-            """The filter for our red.find_all function."""
-            return any([
-                expression.match(value.dumps()) for expression, mod in exprs
-            ])
-        return finder_function
-
+    #   <A>.<the member matched>
+    # Where A is the Qt SecondLevelModule that the member lives in. It is
+    #   looked up by the whole member name, see mappings.attribute_module.
+    def finder_function(text):
+        """The filter for our visitor.find_all function."""
+        return attribute_module(text) is not None
+
+    def module_function(name):
+        """Only nodes starting with a Qt module are serialized."""
+        return name in Qt._common_members
+
+    if visitor is None:
+        visitor = TreeVisitor(red)
     mappings = {}
-    # Find any AtomTrailersNode that matches any of our expressions.
-    nodes = red.find_all(
-        "AtomTrailersNode",
-        value=finder_function_factory(expressions)
+    # Find any AtomTrailersNode that starts with a member we know about.
+    nodes = visitor.find_all(
+        TreeVisitor.ATOMTRAILERS,
+        name=module_function,
+        text=finder_function
     )
-    nodes += red.find_all(
-        "DottedNameNode",
-        value=finder_function_factory(expressions)
+    nodes += visitor.find_all(
+        TreeVisitor.DOTTED_NAME,
+        name=module_function,
+        text=finder_function
     )
     header_written = False
     for node in nodes:
-        orig_node_str = node.dumps()
-        added_module = False
-        for expr, module_ in expressions:
-            modified = expr.sub(
-                r"{module}.\2".format(module=module_),
-                orig_node_str,
+        orig_node_str = visitor.dumps(node)
+        found = attribute_module(orig_node_str)
+        modified = orig_node_str
+        if found is not None:
+            module_, member_text = found
+            modified = "{module}.{member}".format(
+                module=module_, member=member_text
             )
 
-            if modified != orig_node_str:
-                mappings[orig_node_str] = modified
-                aliases["used"].add(module_)
-                added_module = True
-                if not header_written:
-                    MAIN_LOG.debug(color_text(
-                        text="=========================",
-                        color=ANSI.colors.orange,
-                    ))
-                    MAIN_LOG.debug(color_text(
-                        text="Parsing AtomTrailersNodes",
-                        color=ANSI.colors.orange,
-                        style=ANSI.styles.underline
-                    ))
-                    header_written = True
-
-                repl = str(node).replace(
-                    str(node.value[0]).strip("\n"), 
-                    module_
-                )
+        if modified != orig_node_str:
+            mappings[orig_node_str] = modified
+            aliases["used"].add(module_)
+            if not header_written:
+                MAIN_LOG.debug(color_text(
+                    text="=========================",
+                    color=ANSI.colors.orange,
+                ))
+                MAIN_LOG.debug(color_text(
+                    text="Parsing AtomTrailersNodes",
+                    color=ANSI.colors.orange,
+                    style=ANSI.styles.underline
+                ))
+                header_written = True
+
+            repl = str(node).replace(
+                str(node.value[0]).strip("\n"), 
+                module_
+            )
 
-                change(
-                    logger=Qt4_Qt5_LOG,
-                    node=node,
-                    replacement=repl,
-                    skip_lineno=skip_lineno
-                )
-                # Only replace the first node part of the statement.
-                # This allows us to keep any child nodes that have already
-                # been gathered attached to the main node tree.
-
-                # This was the cause of a bug in our internal code.
-                # http://dd-git.d2.com/ahughes/qt_py_convert/issues/19
-
-                # A node that had child nodes that needed replacements on the
-                # same line would cause an issue if we replaced the entire
-                # line the first replacement. The other replacements on that
-                # line would not stick because they would be replacing to an
-                # orphaned tree.
-                node.value[0].replace(module_)
-                break
-            # else:
-            #     if orig_node_str.split(".")[0] in COMMON_MODULES:
-            #         aliases["used"].add(orig_node_str.split(".")[0])
-        if not added_module:
+            change(
+                logger=Qt4_Qt5_LOG,
+                node=node,
+                replacement=repl,
+                skip_lineno=skip_lineno
+            )
+            # Only replace the first node part of the statement.
+            # This allows us to keep any child nodes that have already
+            # been gathered attached to the main node tree.
+
+            # This was the cause of a bug in our internal code.
+            # http://dd-git.d2.com/ahughes/qt_py_convert/issues/19
+
+            # A node that had child nodes that needed replacements on the
+            # same line would cause an issue if we replaced the entire
+            # line the first replacement. The other replacements on that
+            # line would not stick because they would be replacing to an
+            # orphaned tree.
+            if visitor.edits is not None:
+                # Span edits leave the tree alone, so there is nothing to
+                # orphan. The edit is trimmed down to the module name.
+                visitor.replace(node, modified)
+            else:
+                visitor.replace(node.value[0], module_)
+        else:
             aliases["used"].add(orig_node_str.split(".")[0])
     return mappings
 
 
-def _convert_root_name_imports(red, aliases, skip_lineno=False):
+def _convert_root_name_imports(red, aliases, skip_lineno=False, visitor=None):
     """
     _convert_root_name_imports is a function that should be used in cases
     where the original code just imported the python binding and did not
@@ -317,12 +322,21 @@ def _convert_root_name_imports(red, aliases, skip_lineno=False):
         show the line numbers. This can give great performance increases
         because redbaron has trouble calculating the line number sometimes.
     :type skip_lineno: bool
+    :param visitor: The tree visitor shared by the conversion stages. A new
+        one is created from "red" when it is not passed.
+    :type visitor: qt_py_convert.visitor.TreeVisitor
     """
-    def filter_function(value):
-        """A filter delegate for our red.find_all function."""
-        return value.dumps().startswith("Qt.")
-    matches = red.find_all("AtomTrailersNode", value=filter_function)
-    matches += red.find_all("DottedNameNode", value=filter_function)
+    def filter_function(text):
+        """A filter delegate for our visitor.find_all function."""
+        return text.startswith("Qt.")
+    if visitor is None:
+        visitor = TreeVisitor(red)
+    matches = visitor.find_all(
+        TreeVisitor.ATOMTRAILERS, name="Qt", text=filter_function
+    )
+    matches += visitor.find_all(
+        TreeVisitor.DOTTED_NAME, name="Qt", text=filter_function
+    )
     lstrip_qt_regex = re.compile(r"^Qt\.",)
 
     if matches:
@@ -338,7 +352,7 @@ def _convert_root_name_imports(red, aliases, skip_lineno=False):
 
     for node in matches:
         name = lstrip_qt_regex.sub(
-            "", node.dumps(), count=1
+            "", visitor.dumps(node), count=1
         )
 
         root_name = name.split(".")[0]
@@ -352,7 +366,7 @@ def _convert_root_name_imports(red, aliases, skip_lineno=False):
                 replacement=name,
                 skip_lineno=skip_lineno
             )
-            node.replace(name)
+            visitor.replace(node, name)
         else:
             MAIN_LOG.warning(
                 "Unknown second level module from the Qt package \"{}\""
@@ -362,7 +376,7 @@ def _convert_root_name_imports(red, aliases, skip_lineno=False):
             )
 
 
-def _convert_body(red, aliases, mappings, skip_lineno=False):
+def _convert_body(red, aliases, mappings, skip_lineno=False, visitor=None):
     """
     _convert_body is  one of the first conversion functions to run on the
     redbaron ast.
@@ -386,6 +400,9 @@ def _convert_body(red, aliases, mappings, skip_lineno=False):
         show the line numbers. This can give great performance increases
         because redbaron has trouble calculating the line number sometimes.
     :type skip_lineno: bool
+    :param visitor: The tree visitor shared by the conversion stages. A new
+        one is created from "red" when it is not passed.
+    :type visitor: qt_py_convert.visitor.TreeVisitor
     """
     def expression_factory(expr_key):
         """
@@ -397,16 +414,18 @@ def _convert_body(red, aliases, mappings, skip_lineno=False):
             re.DOTALL
         )
 
-        def expression_filter(value):
+        def expression_filter(text):
             """
-            Basic filter function matching for red.find_all against a regex
+            Basic filter function matching for visitor.find_all against a regex
             previously created from the factory
             ."""
-            return regex.match(value.dumps())
+            return regex.match(text)
 
         return expression_filter
 
     # Body of the function
+    if visitor is None:
+        visitor = TreeVisitor(red)
     for key in sorted(mappings, key=len):
         MAIN_LOG.debug(color_text(
             text="-"*len(key),
@@ -419,16 +438,19 @@ def _convert_body(red, aliases, mappings, skip_lineno=False):
         ))
         if "." in key:
             filter_function = expression_factory(key)
-            matches = red.find_all("AtomTrailersNode", value=filter_function)
-            matches += red.find_all("DottedNameNode", value=filter_function)
+            key_root = key.split(".")[0]
+            matches = visitor.find_all(
+                TreeVisitor.ATOMTRAILERS, name=key_root, text=filter_function
+            )
+            matches += visitor.find_all(
+                TreeVisitor.DOTTED_NAME, name=key_root, text=filter_function
+            )
         else:
-            matches = red.find_all("NameNode", value=key)
+            matches = visitor.names(key)
         if matches:
             for node in matches:
                 # Dont replace imports, we already did that.
-                parent_is_import = node.parent_find("ImportNode")
-                parent_is_fimport = node.parent_find("FromImportNode")
-                if not parent_is_import and not parent_is_fimport:
+                if not visitor.is_imported(node):
                     # If the node's parent has dot syntax. Make sure we are
                     # the first one. Reasoning: We are relying on namespacing,
                     # so we don't want to turn bob.foo.cat into bob.foo.bear.
@@ -439,7 +461,9 @@ def _convert_body(red, aliases, mappings, skip_lineno=False):
                             continue
 
                     if key != mappings[key]:
-                        replacement = node.dumps().replace(key, mappings[key])
+                        replacement = visitor.dumps(node).replace(
+                            key, mappings[key]
+                        )
                         change(
                             logger=MAIN_LOG,
                             node=node,
@@ -449,14 +473,63 @@ def _convert_body(red, aliases, mappings, skip_lineno=False):
                         if mappings[key].split(".")[0] in COMMON_MODULES:
                             aliases["used"].add(mappings[key].split(".")[0])
 
-                        node.replace(replacement)
+                        visitor.replace(node, replacement)
                     else:
-                        if node.dumps().split(".")[0] in COMMON_MODULES:
-                            aliases["used"].add(node.dumps().split(".")[0])
+                        root_name = visitor.dumps(node).split(".")[0]
+                        if root_name in COMMON_MODULES:
+                            aliases["used"].add(root_name)
                     # match.replace(mappings[key])
 
 
-def run(text, skip_lineno=False, tometh_flag=False, explicit_signals_flag=False):
+def _compile_error(text):
+    """
+    _compile_error compiles the text with the running interpreter.
+
+    :param text: Python source code.
+    :type text: str
+    :return: The error or None if the text compiled.
+    :rtype: Exception|None
+    """
+    try:
+        compile(text, "<qt_py_convert>", "exec", 0, True)
+    except (SyntaxError, ValueError, TypeError) as err:
+        return err
+    return None
+
+
+def _span_edits_error(text, dumps, edits):
+    """
+    _span_edits_error checks that the span edited text is still python.
+    Compiling it is cheap and settles it unless the source itself does not
+    compile with this interpreter, python 2 code on python 3 for example.
+    Only then is the text parsed again with baron, and only when an
+    overlapping edit was dropped, which is when the edits can leave a node
+    half rewritten.
+
+    :param text: The source text.
+    :type text: str
+    :param dumps: The text with the edits applied.
+    :type dumps: str
+    :param edits: The edits that were applied.
+    :type edits: qt_py_convert.edits.SpanEdits
+    :return: The error or None if the text is fine.
+    :rtype: Exception|None
+    """
+    if not len(edits):
+        return None
+    err = _compile_error(dumps)
+    if err is None or _compile_error(text) is None:
+        return err
+    if not edits.dropped:
+        return None
+    try:
+        baron.parse(dumps)
+    except Exception as err:
+        return err
+    return None
+
+
+def run(text, skip_lineno=False, tometh_flag=False, explicit_signals_flag=False, span_edits_flag=False, context=None, cache=None, timings=None):
     """
     run is the main driver of the file. It takes the text of a file and any
     flags that you want to set.
@@ -478,54 +551,296 @@ def run(text, skip_lineno=False, tometh_flag=False, explicit_signals_flag=False)
         confirm that you don't have any custom objects with the same method
         signature to PyQt4's apiv1.0 ones.
     :type tometh_flag: bool
+    :param span_edits_flag: span_edits_flag is an optional performance flag.
+        Instead of replacing nodes in the redbaron tree, every stage records
+        its replacement as an edit against the source text and the output
+        is built in one pass at the end. Stages match against the original
+        tree, so a replacement that lands inside of code an earlier stage
+        already rewrote is dropped.
+    :type span_edits_flag: bool
+    :param context: Optional state store for this conversion. A new one is
+        created when it is not passed. Passing your own lets you inspect the
+        errors that were recorded even if the conversion raised.
+    :type context: qt_py_convert.general.ConversionContext
+    :param cache: Optional on disk result cache. On a hit the source is not
+        parsed at all and the stored result is returned instead.
+    :type cache: qt_py_convert.cache.ResultCache
+    :param timings: Optional dictionary that the seconds spent in each stage
+        of the conversion are added to, keyed by the stage name.
+    :type timings: dict
     :return: run will return a tuple of runtime information. aliases,
-        mappings, and the resulting text. Aliases is the replacement
-        information that it built, mappings is information about the bindings
-        that were used.
-    :rtype: tuple[dict,dict,str]
+        mappings, and the resulting text. Aliases is the ConversionContext
+        holding the replacement information that it built and the errors it
+        found, mappings is information about the bindings that were used.
+    :rtype: tuple[qt_py_convert.general.ConversionContext,dict,str]
     """
-    ALIAS_DICT.clean()
+    if context is None:
+        context = ConversionContext()
+    if cache is not None:
+        with timed(timings, "cache"):
+            cache_key = cache.key(
+                text,
+                skip_lineno=skip_lineno,
+                tometh_flag=tometh_flag,
+                explicit_signals_flag=explicit_signals_flag,
+                span_edits_flag=span_edits_flag
+            )
+            cached = cache.get(cache_key, context=context)
+        if cached is not None:
+            return cached
     try:
-        red = redbaron.RedBaron(text)
+        with timed(timings, "parse"):
+            red = redbaron.RedBaron(text)
     except Exception as err:
         MAIN_LOG.critical(str(err))
         traceback.print_exc()
 
-        ErrorClass(row_from=0, row_to=0, reason=traceback.format_exc())
-        return ALIAS_DICT, {}, text
-
-    from_a, from_m = from_imports.process(red, skip_lineno=skip_lineno)
-    import_a, import_m = imports.process(red, skip_lineno=skip_lineno)
+        ErrorClass(
+            row_from=0, row_to=0, reason=traceback.format_exc(),
+            context=context
+        )
+        return context, {}, text
+
+    # Line numbers for the change log and the errors, see lines.node_lines.
+    #   Span edits never modify the tree, so its index can wait until a line
+    #   number is actually asked for.
+    with timed(timings, "lines"):
+        track(red, lazy=span_edits_flag)
+
+    with timed(timings, "from_imports"):
+        _, from_m = from_imports.process(red, context, skip_lineno=skip_lineno)
+    with timed(timings, "imports"):
+        _, import_m = imports.process(red, context, skip_lineno=skip_lineno)
     mappings = merge_dict(from_m, import_m, keys_both=True)
-    aliases = merge_dict(from_a, import_a, keys=["bindings", "root_aliases"])
+    aliases = context
+
+    with timed(timings, "misplaced_members"):
+        aliases, mappings = misplaced_members(aliases, mappings)
+        aliases["used"] = set()
 
-    aliases, mappings = misplaced_members(aliases, mappings)
-    aliases["used"] = set()
+        mappings = convert_mappings(aliases, mappings)
 
-    mappings = convert_mappings(aliases, mappings)
+    # Walk the tree once. Every stage from here on works off of the index
+    #   and replaces nodes through the visitor to keep it up to date.
+    with timed(timings, "index"):
+        visitor = TreeVisitor(red, span_edits=span_edits_flag)
 
     # Convert using the psep0101 module.
-    psep0101.process(
-        red,
-        skip_lineno=skip_lineno,
-        tometh_flag=tometh_flag,
-        explicit_signals_flag=explicit_signals_flag
-    )
-    _convert_body(red, aliases, mappings, skip_lineno=skip_lineno)
-    _convert_root_name_imports(red, aliases, skip_lineno=skip_lineno)
-    _convert_attributes(red, aliases, skip_lineno=skip_lineno)
+    with timed(timings, "psep0101"):
+        psep0101.process(
+            red,
+            context,
+            skip_lineno=skip_lineno,
+            tometh_flag=tometh_flag,
+            explicit_signals_flag=explicit_signals_flag,
+            visitor=visitor
+        )
+    with timed(timings, "convert_body"):
+        _convert_body(
+            red, aliases, mappings, skip_lineno=skip_lineno, visitor=visitor
+        )
+    with timed(timings, "convert_root_name_imports"):
+        _convert_root_name_imports(
+            red, aliases, skip_lineno=skip_lineno, visitor=visitor
+        )
+    with timed(timings, "convert_attributes"):
+        _convert_attributes(
+            red, aliases, skip_lineno=skip_lineno, visitor=visitor
+        )
     if aliases["root_aliases"]:
-        _cleanup_imports(red, aliases, mappings, skip_lineno=skip_lineno)
+        with timed(timings, "cleanup_imports"):
+            _cleanup_imports(
+                red, aliases, mappings, skip_lineno=skip_lineno,
+                visitor=visitor
+            )
 
     # Build errors from our unsupported module.
-    unsupported.process(red, skip_lineno=skip_lineno)
+    with timed(timings, "unsupported"):
+        unsupported.process(
+            red, context, skip_lineno=skip_lineno, visitor=visitor
+        )
 
     # Done!
-    dumps = red.dumps()
+    with timed(timings, "dumps"):
+        dumps = visitor.render()
+    if visitor.edits is not None:
+        # Span edits are spliced into the text without the tree ever seeing
+        # them, so nothing has checked that the result is still python.
+        with timed(timings, "verify"):
+            err = _span_edits_error(text, dumps, visitor.edits)
+        if err is not None:
+            MAIN_LOG.critical(
+                "The span edits produced invalid code, leaving the file "
+                "unchanged: {err}".format(err=err)
+            )
+            ErrorClass(
+                row_from=0, row_to=0,
+                reason="The span edits produced code that can not be "
+                       "parsed, the file was left unchanged. Run again "
+                       "without --span-edits.\n{err}".format(err=err),
+                context=context
+            )
+            return aliases, mappings, text
+    if cache is not None:
+        with timed(timings, "cache"):
+            cache.put(cache_key, aliases, mappings, dumps)
     return aliases, mappings, dumps
 
 
-def process_file(fp, write_mode=None, path=None, backup=False, skip_lineno=False, tometh_flag=False, explicit_signals_flag=False):
+def _process_file(fp, write_mode=None, path=None, backup=False, skip_lineno=False, tometh_flag=False, explicit_signals_flag=False, span_edits_flag=False, cache=None):
+    """
+    _process_file does the actual work behind process_file.
+    It converts and writes the file but leaves reporting the errors to the
+    caller. This is what lets the process pool workers hand a small
+    FileResult back to the parent process instead of logging on their own.
+    Files that never mention a binding are short-circuited before redbaron
+    ever sees them, most files in a large repository are not Qt code.
+
+    See process_file for a description of the parameters.
+
+    :return: A record of what happened to the file or None if the file was
+        not a python file.
+    :rtype: qt_py_convert.general.FileResult|None
+    """
+    if not is_py(fp):
+        MAIN_LOG.debug(
+            "\tSkipping \"{fp}\"... It does not appear to be a python file."
+            .format(fp=fp)
+        )
+        return None
+    start = time.time()
+    result = FileResult(fp)
+    with timed(result.timings, "read"):
+        with open(fp, "rb") as fh:
+            lines = fh.readlines()
+            source = "".join(lines)
+
+    if not references_bindings(source):
+        MAIN_LOG.debug(
+            "\tSkipping \"{fp}\"... It does not reference any Qt bindings."
+            .format(fp=fp)
+        )
+        result.short_circuited = True
+        result.timings["total"] = time.time() - start
+        return result
+
+    context = ConversionContext()
+    MAIN_LOG.info("{line}\nProcessing {path}".format(path=fp, line="-"*50))
+    try:
+        with timed(result.timings, "run"):
+            aliases, mappings, modified_code = run(
+                source,
+                skip_lineno=skip_lineno,
+                tometh_flag=tometh_flag,
+                explicit_signals_flag=explicit_signals_flag,
+                span_edits_flag=span_edits_flag,
+                context=context,
+                cache=cache,
+                timings=result.timings
+            )
+        if aliases["used"] or modified_code != source:
+            result.changed = True
+            with timed(result.timings, "write"):
+                write_path = fp
+                if write_mode & WriteFlag.WRITE_TO_STDOUT:
+                    sys.stdout.write(modified_code)
+                else:
+                    if path and path[0]:  # We are writing elsewhere than the source.
+                        src_root, dst_root = path
+                        root_relative = fp.replace(src_root, "").lstrip("/")
+                        write_path = os.path.join(dst_root, root_relative)
+
+                    if backup:  # We are creating a source backup beside the output
+                        bak_path = os.path.join(
+                            os.path.dirname(write_path),
+                            "." + os.path.basename(write_path) + ".bak"
+                        )
+                        MAIN_LOG.info("Backing up original code to {path}".format(
+                            path=bak_path
+                        ))
+                        with open(bak_path, "wb") as fh:
+                            fh.write(source)
+
+                    # Write to file. If path is None, we are overwriting.
+                    MAIN_LOG.info("Writing modifed code to {path}".format(
+                        path=write_path)
+                    )
+
+                    if not os.path.exists(os.path.dirname(write_path)):
+                        os.makedirs(os.path.dirname(write_path))
+                    with open(write_path, "wb") as fh:
+                        fh.write(modified_code)
+                    result.output = write_path
+
+    except BaseException:
+        MAIN_LOG.critical("Error processing file: \"{path}\"".format(path=fp))
+        traceback.print_exc()
+
+    # Format any errors that may have happened throughout the process.
+    result.errors = format_errors(context[context.ERRORS], lines)
+    result.timings["total"] = time.time() - start
+    return result
+
+
+def _report_errors(result):
+    """
+    _report_errors logs the errors recovered from a single file.
+
+    :param result: The record returned from _process_file.
+    :type result: qt_py_convert.general.FileResult
+    """
+    if not result.errors:
+        return
+    MAIN_LOG.error(color_text(
+        text="The following errors were recovered from {}:\n".format(
+            result.path
+        ),
+        color=ANSI.colors.red,
+    ))
+    for message in result.errors:
+        MAIN_LOG.error(message)
+
+
+def _process_batch_task(task):
+    """
+    _process_batch_task is the entry point for the process pool workers.
+    It has to live at the module level so that it can be pickled.
+    Converting a batch of files in one task means a single message goes back
+    and forth for all of them.
+
+    :param task: Tuple of the file paths and the process_file keyword args.
+    :type task: tuple[list[str...],dict]
+    :return: The records returned from _process_file, in order.
+    :rtype: list[qt_py_convert.general.FileResult|None]
+    """
+    files, kwargs = task
+    return [_process_file(fp, **kwargs) for fp in files]
+
+
+def _aborted_file(fp, reason):
+    """
+    _aborted_file builds the record of a file that imap_guarded gave up on.
+
+    :param fp: The source file that was being processed.
+    :type fp: str
+    :param reason: Why the conversion was aborted.
+    :type reason: str
+    :return: A record holding the reason as its only error.
+    :rtype: qt_py_convert.general.FileResult
+    """
+    return FileResult(
+        fp,
+        aborted=True,
+        errors=[color_text(
+            text="\nSkipped converting the file. {reason}\n".format(
+                reason=reason
+            ),
+            color=ANSI.colors.red,
+        )],
+    )
+
+
+def process_file(fp, write_mode=None, path=None, backup=False, skip_lineno=False, tometh_flag=False, explicit_signals_flag=False, span_edits_flag=False, cache=None):
     """
     One of the entry-point functions in qt_py_convert.
     If you are looking to process a single python file, this is your function.
@@ -553,74 +868,108 @@ def process_file(fp, write_mode=None, path=None, backup=False, skip_lineno=False
         confirm that you don't have any custom objects with the same method
         signature to PyQt4's apiv1.0 ones.
     :type tometh_flag: bool
+    :param span_edits_flag: span_edits_flag is an optional performance flag.
+        Instead of replacing nodes in the redbaron tree, every stage records
+        its replacement as an edit against the source text and the output
+        is built in one pass at the end. Stages match against the original
+        tree, so a replacement that lands inside of code an earlier stage
+        already rewrote is dropped.
+    :type span_edits_flag: bool
+    :param cache: Optional on disk result cache. Files that were already
+        converted with the same flags are not parsed again.
+    :type cache: qt_py_convert.cache.ResultCache
+    :return: A record of what happened to the file or None if the file was
+        not a python file.
+    :rtype: qt_py_convert.general.FileResult|None
     """
-    if not is_py(fp):
-        MAIN_LOG.debug(
-            "\tSkipping \"{fp}\"... It does not appear to be a python file."
-            .format(fp=fp)
-        )
-        return
-    with open(fp, "rb") as fh:
-        lines = fh.readlines()
-        source = "".join(lines)
+    result = _process_file(
+        fp,
+        write_mode=write_mode,
+        path=path,
+        backup=backup,
+        skip_lineno=skip_lineno,
+        tometh_flag=tometh_flag,
+        explicit_signals_flag=explicit_signals_flag,
+        span_edits_flag=span_edits_flag,
+        cache=cache
+    )
+    if result is not None:
+        _report_errors(result)
+    return result
 
-    MAIN_LOG.info("{line}\nProcessing {path}".format(path=fp, line="-"*50))
-    try:
-        aliases, mappings, modified_code = run(
-            source,
-            skip_lineno=skip_lineno,
-            tometh_flag=tometh_flag,
-            explicit_signals_flag=explicit_signals_flag
-        )
-        if aliases["used"] or modified_code != source:
-            write_path = fp
-            if write_mode & WriteFlag.WRITE_TO_STDOUT:
-                sys.stdout.write(modified_code)
-            else:
-                if path and path[0]:  # We are writing elsewhere than the source.
-                    src_root, dst_root = path
-                    root_relative = fp.replace(src_root, "").lstrip("/")
-                    write_path = os.path.join(dst_root, root_relative)
-
-                if backup:  # We are creating a source backup beside the output
-                    bak_path = os.path.join(
-                        os.path.dirname(write_path),
-                        "." + os.path.basename(write_path) + ".bak"
-                    )
-                    MAIN_LOG.info("Backing up original code to {path}".format(
-                        path=bak_path
-                    ))
-                    with open(bak_path, "wb") as fh:
-                        fh.write(source)
-
-                # Write to file. If path is None, we are overwriting.
-                MAIN_LOG.info("Writing modifed code to {path}".format(
-                    path=write_path)
-                )
 
-                if not os.path.exists(os.path.dirname(write_path)):
-                    os.makedirs(os.path.dirname(write_path))
-                with open(write_path, "wb") as fh:
-                    fh.write(modified_code)
+def _collect_files(folder, recursive=False):
+    """
+    _collect_files builds the list of python files that process_folder is
+    going to convert.
 
-    except BaseException:
-        MAIN_LOG.critical("Error processing file: \"{path}\"".format(path=fp))
-        traceback.print_exc()
+    :param folder: The source folder to search.
+    :type folder: str
+    :param recursive: Do you want to continue recursing through sub-folders?
+    :type recursive: bool
+    :return: List of file paths.
+    :rtype: list[str...]
+    """
+    def _is_dir(path):
+        return True if os.path.isdir(os.path.join(folder, path)) else False
 
-    # Process any errors that may have happened throughout the process.
-    if ALIAS_DICT["errors"]:
-        MAIN_LOG.error(color_text(
-            text="The following errors were recovered from {}:\n".format(fp),
-            color=ANSI.colors.red,
-        ))
-        for error in ALIAS_DICT["errors"]:
-            try:
-                build_exc(error, lines)
-            except UserInputRequiredException as err:
-                MAIN_LOG.error(str(err))
+    files = list(filter(
+        is_py, [os.path.join(folder, fp) for fp in os.listdir(folder)]
+    ))
+    if recursive:
+        for fn in filter(_is_dir, os.listdir(folder)):
+            files.extend(
+                _collect_files(os.path.join(folder, fn), recursive=recursive)
+            )
+    return files
+
+
+def _manifest_path(cache=None):
+    """
+    _manifest_path picks where process_folder keeps its manifest.
+    The manifest is only kept in the cache directory, so that nothing is
+    written into the source tree that was not asked for.
+
+    :param cache: Optional on disk result cache.
+    :type cache: qt_py_convert.cache.ResultCache
+    :return: Path of the manifest file or None without a cache.
+    :rtype: str|None
+    """
+    if cache is None:
+        return None
+    return os.path.join(cache.path, MANIFEST_NAME)
 
 
-def process_folder(folder, recursive=False, write_mode=None, path=None, backup=False, skip_lineno=False, tometh_flag=False, explicit_signals_flag=False):
+def _manifest_environment(write_mode=None, path=None, backup=False, skip_lineno=False, tometh_flag=False, explicit_signals_flag=False, span_edits_flag=False):
+    """
+    _manifest_environment describes everything besides the source that
+    decides what process_folder leaves behind. The conversion flags and where
+    and how the converted files are written.
+
+    See process_folder for a description of the parameters.
+
+    :return: A json string of the environment.
+    :rtype: str
+    """
+    destination = None
+    if path and path[0]:  # We are writing elsewhere than the source.
+        destination = os.path.abspath(path[1])
+    return json.dumps(
+        [
+            environment_key(
+                skip_lineno=skip_lineno,
+                tometh_flag=tometh_flag,
+                explicit_signals_flag=explicit_signals_flag,
+                span_edits_flag=span_edits_flag
+            ),
+            write_mode,
+            destination,
+            bool(backup),
+        ]
+    )
+
+
+def process_folder(folder, recursive=False, write_mode=None, path=None, backup=False, skip_lineno=False, tometh_flag=False, explicit_signals_flag=False, span_edits_flag=False, jobs=1, cache=None, batch_size=DEFAULT_BATCH_SIZE, file_timeout=None, max_files_per_worker=None, force=False):
     """
     One of the entry-point functions in qt_py_convert.
     If you are looking to process every python file in a folder, this is your
@@ -652,40 +1001,145 @@ def process_folder(folder, recursive=False, write_mode=None, path=None, backup=F
         confirm that you don't have any custom objects with the same method
         signature to PyQt4's apiv1.0 ones.
     :type tometh_flag: bool
+    :param span_edits_flag: span_edits_flag is an optional performance flag.
+        Instead of replacing nodes in the redbaron tree, every stage records
+        its replacement as an edit against the source text and the output
+        is built in one pass at the end. Stages match against the original
+        tree, so a replacement that lands inside of code an earlier stage
+        already rewrote is dropped.
+    :type span_edits_flag: bool
+    :param jobs: Number of worker processes to convert the files with.
+        Each worker writes its own output and only sends back a FileResult.
+        Anything below 1 will use one worker per core. With more than one
+        worker the largest files are started first.
+    :type jobs: int
+    :param cache: Optional on disk result cache. Files that were already
+        converted with the same flags are not parsed again. How long each
+        file took is kept in it as well, to order the next run by.
+    :type cache: qt_py_convert.cache.ResultCache
+    :param batch_size: With more than one worker, small files are sent to
+        the workers in batches of up to this many bytes. Larger files are
+        sent alone. Anything below 1 sends every file on its own.
+    :type batch_size: int
+    :param file_timeout: Seconds that a single file may take. A file that
+        takes longer is skipped with an error and the worker that was
+        converting it is replaced. This starts a worker process even when
+        jobs is 1.
+    :type file_timeout: float|None
+    :param max_files_per_worker: Replace each worker process after it has
+        converted this many files, so that its memory use cannot keep on
+        growing. This starts a worker process even when jobs is 1.
+    :type max_files_per_worker: int|None
+    :param force: Convert every file, even the ones that have not changed
+        since the last run. A manifest of what each run left behind is kept
+        in the cache directory, without a cache every file is converted.
+    :type force: bool
+    :return: A record for every python file that was processed. Files that
+        had not changed since the last run are not included.
+    :rtype: list[qt_py_convert.general.FileResult]
     """
-
-    def _is_dir(path):
-        return True if os.path.isdir(os.path.join(folder, path)) else False
-
     # TODO: Might need to parse the text to remove whitespace at the EOL.
     #       #101 at https://github.com/PyCQA/baron documents this issue.
-
-    for fn in filter(is_py, [os.path.join(folder, fp) for fp in os.listdir(folder)]):
-        process_file(
-            fn,
-            write_mode=write_mode,
-            path=path,
-            backup=backup,
-            skip_lineno=skip_lineno,
-            tometh_flag=tometh_flag,
-            explicit_signals_flag=explicit_signals_flag
+    files = _collect_files(folder, recursive=recursive)
+
+    manifest = None
+    manifest_path = _manifest_path(cache=cache)
+    if manifest_path is not None and \
+            not (write_mode and write_mode & WriteFlag.WRITE_TO_STDOUT):
+        manifest = Manifest(
+            manifest_path,
+            _manifest_environment(
+                write_mode=write_mode,
+                path=path,
+                backup=backup,
+                skip_lineno=skip_lineno,
+                tometh_flag=tometh_flag,
+                explicit_signals_flag=explicit_signals_flag,
+                span_edits_flag=span_edits_flag
+            )
         )
-        MAIN_LOG.debug(color_text(text="-" * 50, color=ANSI.colors.black))
-
-    if not recursive:
-        return
+    if manifest is not None and not force:
+        unchanged = set(fp for fp in files if manifest.unchanged(fp))
+        if unchanged:
+            MAIN_LOG.info(
+                "Skipping {count} of {total} files that have not changed "
+                "since the last run.".format(
+                    count=len(unchanged), total=len(files)
+                )
+            )
+            files = [fp for fp in files if fp not in unchanged]
 
-    for fn in filter(_is_dir, os.listdir(folder)):
-        process_folder(
-            os.path.join(folder, fn),
-            recursive=recursive,
-            write_mode=write_mode,
-            path=path,
-            backup=backup,
-            skip_lineno=skip_lineno,
-            tometh_flag=tometh_flag,
-            explicit_signals_flag=explicit_signals_flag
+    if write_mode and write_mode & WriteFlag.WRITE_TO_STDOUT and jobs != 1:
+        # Workers writing to stdout at the same time would interleave files.
+        MAIN_LOG.warning(
+            "Writing to stdout, converting the files one at a time."
+        )
+        jobs = 1
+    workers = resolve_jobs(jobs)
+    if workers > 1:
+        files = largest_first(
+            files, history=cache.timings() if cache is not None else None
+        )
+    if cache is not None and files:
+        # The workers count on from this instead of each walking the cache.
+        cache.size()
+
+    kwargs = dict(
+        write_mode=write_mode,
+        path=path,
+        backup=backup,
+        skip_lineno=skip_lineno,
+        tometh_flag=tometh_flag,
+        explicit_signals_flag=explicit_signals_flag,
+        span_edits_flag=span_edits_flag,
+        cache=cache
+    )
+    results = []
+    if workers > 1:
+        batches = batch_by_size(files, workers, batch_size)
+    else:
+        batches = [[fn] for fn in files]
+    if file_timeout or max_files_per_worker:
+        batch_results_iter = imap_guarded(
+            functools.partial(_process_file, **kwargs),
+            batches,
+            jobs,
+            timeout=file_timeout,
+            max_items=max_files_per_worker,
+            on_failure=_aborted_file
+        )
+    else:
+        tasks = [(batch, kwargs) for batch in batches]
+        batch_results_iter = imap_unordered(_process_batch_task, tasks, jobs)
+    for batch_results in batch_results_iter:
+        for result in batch_results:
+            if result is None:
+                continue
+            _report_errors(result)
+            MAIN_LOG.debug(color_text(text="-" * 50, color=ANSI.colors.black))
+            results.append(result)
+
+    if cache is not None:
+        cache.record_timings(results)
+    if manifest is not None:
+        for result in results:
+            manifest.record(result)
+        manifest.save()
+
+    short_circuited = len([result for result in results if result.short_circuited])
+    if short_circuited:
+        MAIN_LOG.info(
+            "Skipped parsing {count} of {total} files that do not reference "
+            "any Qt bindings.".format(count=short_circuited, total=len(results))
+        )
+    aborted = len([result for result in results if result.aborted])
+    if aborted:
+        MAIN_LOG.warning(
+            "Gave up on converting {count} of {total} files.".format(
+                count=aborted, total=len(results)
+            )
         )
+    return results
 
 
 if __name__ == "__main__":
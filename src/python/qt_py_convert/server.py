@@ -0,0 +1,323 @@
+# Copyright 2018 Digital Domain 3.0
+#
+# Licensed under the Apache License, Version 2.0 (the "Apache License")
+# with the following modification; you may not use this file except in
+# compliance with the Apache License and the following modification to it:
+# Section 6. Trademarks. is deleted and replaced with:
+#
+# 6. Trademarks. This License does not grant permission to use the trade
+#    names, trademarks, service marks, or product names of the Licensor
+#    and its affiliates, except as required to comply with Section 4(c) of
+#    the License and to reproduce the content of the NOTICE file.
+#
+# You may obtain a copy of the Apache License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the Apache License with the above modification is
+# distributed on an "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY
+# KIND, either express or implied. See the Apache License for the specific
+# language governing permissions and limitations under the Apache License.
+"""
+server keeps a warm qt_py_convert interpreter around and converts source text
+sent to it over a local unix socket.
+
+Running qt_py_convert once per file spends most of its time importing
+redbaron, compiling the grammar and regular expressions and loading the
+member tables. The server pays for that once, every request after that only
+costs the parse and the rewrite. See qt_py_convert.client for the protocol
+and the thin counterpart.
+
+Every connection is answered by a process forked off of the warm server, so
+a client that keeps its connection open, or a source that never finishes
+converting, only ever holds up its own process.
+"""
+import os
+import select
+import signal
+import socket
+import sys
+import traceback
+
+try:
+    import socketserver
+except ImportError:  # Python 2
+    import SocketServer as socketserver
+
+from qt_py_convert import __version__
+from qt_py_convert.client import FLAGS, read_message, write_message
+from qt_py_convert.general import ConversionContext, format_errors, \
+    references_bindings
+from qt_py_convert.log import get_logger
+from qt_py_convert.run import run
+
+SERVER_LOG = get_logger("server")
+
+# Seconds that a connection may sit idle before it is closed.
+DEFAULT_CONNECTION_TIMEOUT = 300.0
+# Seconds that a single request may take to convert.
+DEFAULT_REQUEST_TIMEOUT = 120.0
+
+# Converted once on start up so that the first real request does not pay for
+#   anything that redbaron or the _modules build lazily.
+_WARM_UP_SOURCE = """\
+from PyQt4 import QtCore, QtGui
+QtCore.QObject.connect(a, QtCore.SIGNAL("clicked()"), b)
+QtGui.QWidget()
+"""
+
+
+def _native(text):
+    """json hands back unicode on python 2, the rest of the code wants str."""
+    if sys.version_info[0] == 2 and not isinstance(text, str):
+        return text.encode("utf-8")
+    return text
+
+
+class RequestTimeout(Exception):
+    """RequestTimeout is raised in a request that took too long."""
+
+
+def _raise_timeout(signum, frame):
+    raise RequestTimeout()
+
+
+def convert(source, cache=None, **flags):
+    """
+    convert runs a single request the way _process_file runs a file, minus
+    the reading and writing.
+
+    :param source: Text from a python file that you want to process.
+    :type source: str
+    :param cache: Optional on disk result cache.
+    :type cache: qt_py_convert.cache.ResultCache
+    :param flags: Any of the qt_py_convert.client.FLAGS.
+    :type flags: bool
+    :return: The response message.
+    :rtype: dict
+    """
+    response = {"source": source, "changed": False, "errors": []}
+    if not references_bindings(source):
+        return response
+
+    context = ConversionContext()
+    timings = {}
+    try:
+        aliases, mappings, modified_code = run(
+            source, context=context, cache=cache, timings=timings, **flags
+        )
+    except (KeyboardInterrupt, SystemExit, RequestTimeout):
+        raise
+    except BaseException:
+        response["failure"] = traceback.format_exc()
+        return response
+
+    response["source"] = modified_code
+    response["changed"] = bool(aliases["used"]) or modified_code != source
+    response["errors"] = format_errors(
+        context[context.ERRORS], source.splitlines(True)
+    )
+    response["timings"] = timings
+    return response
+
+
+class _ConversionHandler(socketserver.StreamRequestHandler):
+    """
+    _ConversionHandler answers every request on a connection until the
+    client hangs up or the connection sits idle for too long.
+    """
+    def setup(self):
+        self.timeout = self.server.connection_timeout
+        socketserver.StreamRequestHandler.setup(self)
+
+    def handle(self):
+        while True:
+            try:
+                request = read_message(self.rfile)
+            except ValueError as err:
+                write_message(self.wfile, {"failure": str(err)})
+                return
+            except socket.timeout:
+                return
+            if request is None:
+                return
+            write_message(self.wfile, self._respond(request))
+            if self.server.stopping:
+                return
+
+    def _respond(self, request):
+        """
+        _respond answers the request, giving up on it after the request
+        timeout of the server. The handler runs in a process of its own,
+        so the alarm only interrupts this connection.
+        """
+        timeout = self.server.request_timeout
+        if not timeout:
+            return self.server.respond(request)
+        previous = signal.signal(signal.SIGALRM, _raise_timeout)
+        signal.setitimer(signal.ITIMER_REAL, timeout)
+        try:
+            return self.server.respond(request)
+        except RequestTimeout:
+            return {
+                "failure": "The request did not finish within {timeout} "
+                           "seconds.".format(timeout=timeout)
+            }
+        finally:
+            signal.setitimer(signal.ITIMER_REAL, 0)
+            signal.signal(signal.SIGALRM, previous)
+
+
+class ConversionServer(socketserver.ForkingMixIn, socketserver.UnixStreamServer):
+    """
+    ConversionServer listens on a unix socket and converts the source sent to
+    it. Each connection is answered in a process forked off of the server,
+    so clients do not wait on each other.
+    """
+    # Connections that are still open when the server stops are left to
+    #   their connection timeout.
+    block_on_close = False
+
+    def __init__(self, socket_path, cache=None, connection_timeout=DEFAULT_CONNECTION_TIMEOUT, request_timeout=DEFAULT_REQUEST_TIMEOUT):
+        """
+        :param socket_path: Path of the unix socket to listen on. A stale
+            socket left behind by a previous server is replaced.
+        :type socket_path: str
+        :param cache: Optional on disk result cache shared by every request.
+        :type cache: qt_py_convert.cache.ResultCache
+        :param connection_timeout: Seconds that a connection may sit idle
+            before it is closed. None keeps it open until the client hangs up.
+        :type connection_timeout: float|None
+        :param request_timeout: Seconds that a single request may take
+            before it fails. None waits forever.
+        :type request_timeout: float|None
+        """
+        self.socket_path = os.path.abspath(socket_path)
+        self.cache = cache
+        self.connection_timeout = connection_timeout
+        self.request_timeout = request_timeout
+        self.stopping = False
+        self._remove_stale_socket()
+        socketserver.UnixStreamServer.__init__(
+            self, self.socket_path, _ConversionHandler
+        )
+        # The connection processes ask the server to stop through this pipe.
+        self._stop_read, self._stop_write = os.pipe()
+
+    def server_close(self):
+        # Python 2's ForkingMixIn has no server_close of its own.
+        close = getattr(
+            socketserver.ForkingMixIn, "server_close",
+            socketserver.UnixStreamServer.server_close
+        )
+        close(self)
+        for fd in (self._stop_read, self._stop_write):
+            try:
+                os.close(fd)
+            except OSError:
+                pass
+
+    def _remove_stale_socket(self):
+        if not os.path.exists(self.socket_path):
+            return
+        probe = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        try:
+            probe.connect(self.socket_path)
+        except socket.error:
+            os.remove(self.socket_path)
+        else:
+            raise IOError(
+                "A server is already listening on {path}".format(
+                    path=self.socket_path
+                )
+            )
+        finally:
+            probe.close()
+
+    def respond(self, request):
+        """
+        respond builds the response message for a single request.
+
+        :param request: The decoded request message.
+        :type request: dict
+        :return: The response message.
+        :rtype: dict
+        """
+        command = request.get("command", "convert")
+        if command == "ping":
+            return {"version": __version__}
+        if command == "shutdown":
+            self.stopping = True
+            os.write(self._stop_write, b"x")
+            return {}
+        if command != "convert" or "source" not in request:
+            return {"failure": "Unknown request: {0!r}".format(request)}
+
+        flags = request.get("flags") or {}
+        unknown = set(flags) - set(FLAGS)
+        if unknown:
+            return {
+                "failure": "Unknown conversion flags: {0}".format(
+                    ", ".join(sorted(unknown))
+                )
+            }
+        return convert(
+            _native(request["source"]),
+            cache=self.cache,
+            **dict((str(key), bool(value)) for key, value in flags.items())
+        )
+
+    def warm_up(self):
+        """
+        warm_up converts a small snippet so that everything that is built
+        lazily is ready before the first request comes in.
+        """
+        convert(_WARM_UP_SOURCE, skip_lineno=True)
+
+    def serve(self):
+        """
+        serve answers requests until a client sends "shutdown" or the process
+        is interrupted. The socket file is removed on the way out.
+        """
+        SERVER_LOG.info("Listening on {path}".format(path=self.socket_path))
+        try:
+            while not self.stopping:
+                try:
+                    ready = select.select(
+                        [self, self._stop_read], [], [], 1.0
+                    )[0]
+                except (IOError, OSError, select.error):
+                    continue  # Interrupted by a signal.
+                if self._stop_read in ready:
+                    self.stopping = True
+                elif self in ready:
+                    self._handle_request_noblock()
+                self.collect_children()
+        except KeyboardInterrupt:
+            pass
+        finally:
+            self.server_close()
+            if os.path.exists(self.socket_path):
+                os.remove(self.socket_path)
+        SERVER_LOG.info("Stopped listening on {path}".format(
+            path=self.socket_path
+        ))
+
+
+def serve(socket_path, cache=None, request_timeout=DEFAULT_REQUEST_TIMEOUT):
+    """
+    serve is the entry point behind "qt_py_convert --serve".
+
+    :param socket_path: Path of the unix socket to listen on.
+    :type socket_path: str
+    :param cache: Optional on disk result cache shared by every request.
+    :type cache: qt_py_convert.cache.ResultCache
+    :param request_timeout: Seconds that a single request may take.
+    :type request_timeout: float|None
+    """
+    server = ConversionServer(
+        socket_path, cache=cache, request_timeout=request_timeout
+    )
+    server.warm_up()
+    server.serve()
@@ -0,0 +1,151 @@
+# Copyright 2018 Digital Domain 3.0
+#
+# Licensed under the Apache License, Version 2.0 (the "Apache License")
+# with the following modification; you may not use this file except in
+# compliance with the Apache License and the following modification to it:
+# Section 6. Trademarks. is deleted and replaced with:
+#
+# 6. Trademarks. This License does not grant permission to use the trade
+#    names, trademarks, service marks, or product names of the Licensor
+#    and its affiliates, except as required to comply with Section 4(c) of
+#    the License and to reproduce the content of the NOTICE file.
+#
+# You may obtain a copy of the Apache License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the Apache License with the above modification is
+# distributed on an "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY
+# KIND, either express or implied. See the Apache License for the specific
+# language governing permissions and limitations under the Apache License.
+"""
+timings records how long each stage of a conversion takes and writes the
+numbers out as json.
+
+run() and process_file fill in a plain dict of stage name to seconds, which
+travels back from the worker processes on the FileResult. write_report turns
+a list of those into the per file and aggregate report for "--timings-json".
+"""
+import contextlib
+import json
+import time
+
+
+# The stages in the order that they run, used to order the report.
+STAGES = (
+    "read",
+    "cache",
+    "parse",
+    "lines",
+    "from_imports",
+    "imports",
+    "misplaced_members",
+    "index",
+    "psep0101",
+    "convert_body",
+    "convert_root_name_imports",
+    "convert_attributes",
+    "cleanup_imports",
+    "unsupported",
+    "dumps",
+    "verify",
+    "run",
+    "write",
+    "total",
+)
+REPORT_VERSION = 1
+
+
+@contextlib.contextmanager
+def timed(timings, stage):
+    """
+    timed adds the time spent in the with block to timings[stage].
+
+    :param timings: Dictionary of stage name to seconds. Nothing is recorded
+        when it is None.
+    :type timings: dict|None
+    :param stage: Name of the stage.
+    :type stage: str
+    """
+    start = time.time()
+    try:
+        yield
+    finally:
+        if timings is not None:
+            timings[stage] = timings.get(stage, 0.0) + time.time() - start
+
+
+def aggregate(results):
+    """
+    aggregate sums up the stage timings of several files.
+
+    :param results: The records returned from process_file/process_folder.
+    :type results: Iterable[qt_py_convert.general.FileResult]
+    :return: Dictionary of stage name to its "count", "total", "mean" and
+        "max" seconds.
+    :rtype: dict
+    """
+    stages = {}
+    for result in results:
+        for stage, seconds in result.timings.items():
+            entry = stages.setdefault(
+                stage, {"count": 0, "total": 0.0, "max": 0.0}
+            )
+            entry["count"] += 1
+            entry["total"] += seconds
+            entry["max"] = max(entry["max"], seconds)
+    for entry in stages.values():
+        entry["mean"] = entry["total"] / entry["count"]
+    return stages
+
+
+def report(results):
+    """
+    report builds the json serializable timing report.
+
+    :param results: The records returned from process_file/process_folder.
+    :type results: list[qt_py_convert.general.FileResult]
+    :return: The report with a "files" list and an "aggregate" block.
+    :rtype: dict
+    """
+    results = sorted(results, key=lambda result: result.path)
+    return {
+        "version": REPORT_VERSION,
+        "stages": [
+            stage for stage in STAGES
+            if any(stage in result.timings for result in results)
+        ],
+        "files": [
+            {
+                "path": result.path,
+                "changed": result.changed,
+                "short_circuited": result.short_circuited,
+                "errors": len(result.errors),
+                "timings": result.timings,
+            }
+            for result in results
+        ],
+        "aggregate": {
+            "files": len(results),
+            "changed": len([result for result in results if result.changed]),
+            "short_circuited": len(
+                [result for result in results if result.short_circuited]
+            ),
+            "stages": aggregate(results),
+        },
+    }
+
+
+def write_report(results, path):
+    """
+    write_report writes the timing report for "results" to "path".
+
+    :param results: The records returned from process_file/process_folder.
+    :type results: list[qt_py_convert.general.FileResult]
+    :param path: File to write the json to.
+    :type path: str
+    """
+    with open(path, "w") as fh:
+        json.dump(report(results), fh, indent=2, sort_keys=True)
+        fh.write("\n")
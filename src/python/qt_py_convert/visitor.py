@@ -0,0 +1,506 @@
+# Copyright 2018 Digital Domain 3.0
+#
+# Licensed under the Apache License, Version 2.0 (the "Apache License")
+# with the following modification; you may not use this file except in
+# compliance with the Apache License and the following modification to it:
+# Section 6. Trademarks. is deleted and replaced with:
+#
+# 6. Trademarks. This License does not grant permission to use the trade
+#    names, trademarks, service marks, or product names of the Licensor
+#    and its affiliates, except as required to comply with Section 4(c) of
+#    the License and to reproduce the content of the NOTICE file.
+#
+# You may obtain a copy of the Apache License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the Apache License with the above modification is
+# distributed on an "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY
+# KIND, either express or implied. See the Apache License for the specific
+# language governing permissions and limitations under the Apache License.
+"""
+visitor walks a redbaron tree once and keeps an index of the nodes that the
+conversion stages are interested in.
+
+Every stage used to call red.find_all for itself, walking the whole tree
+again each time. The TreeVisitor does the walk once, buckets the
+AtomTrailersNodes, DottedNameNodes and NameNodes in document order and hands
+them to the handlers that registered interest in them.
+NameNodes are also indexed by their value and every node remembers whether
+it lives inside of an import, so those are dictionary lookups too.
+Replacements have to go through the visitor so that only the replaced part
+of the tree is walked again to keep the index up to date.
+
+With "span_edits" turned on the tree is never modified at all. The visitor
+records where every node sits in the source and replacements become span
+edits that are applied to the text at the very end.
+"""
+import re
+
+from redbaron.base_nodes import Node, ProxyList
+
+from qt_py_convert.edits import SpanEdits
+
+_IDENTIFIER = re.compile(r"[A-Za-z_]\w*")
+_UNKNOWN = object()
+
+
+def _is_rendered(node, dependent):
+    """
+    _is_rendered is the redbaron side of baron's "dependent" check, which
+    looks at the fst of the node.
+    """
+    value = getattr(node, dependent)
+    if isinstance(value, ProxyList):
+        value = value.node_list
+    if isinstance(value, Node):
+        return True
+    return bool(value)
+
+
+def render_spans(red, nodes=None):
+    """
+    render_spans renders the tree the same way as baron.dumps, taking note of
+    where each node starts and ends on the way.
+
+    :param red: The redbaron ast to render.
+    :type red: redbaron.RedBaron
+    :param nodes: Optional list that every rendered node is added to. The
+        spans are keyed by id, holding on to the nodes stops those ids from
+        being reused.
+    :type nodes: None|list
+    :return: The text of the tree and the (start, end) offsets of every node
+        by the id of the node.
+    :rtype: tuple[str,dict]
+    """
+    pieces = []
+    position = 0
+    starts = {}
+    spans = {}
+    stack = [(True, node) for node in reversed(red.node_list)]
+    while stack:
+        entering, item = stack.pop()
+        if not isinstance(item, Node):
+            pieces.append(item)
+            position += len(item)
+            continue
+        if not entering:
+            spans[id(item)] = (starts.pop(id(item)), position)
+            continue
+
+        if nodes is not None:
+            nodes.append(item)
+        starts[id(item)] = position
+        steps = []
+        for kind, key, dependent in item._render():
+            if not dependent:
+                continue
+            if isinstance(dependent, str) and \
+                    not _is_rendered(item, dependent):
+                continue
+            if isinstance(dependent, list) and not all(
+                    _is_rendered(item, name) for name in dependent):
+                continue
+
+            if kind == "constant":
+                steps.append((True, key))
+            elif kind == "string":
+                steps.append((True, getattr(item, key) or ""))
+            elif kind == "key":
+                child = getattr(item, key)
+                if isinstance(child, Node):
+                    steps.append((True, child))
+            elif kind in ("list", "formatting"):
+                children = getattr(item, key)
+                if isinstance(children, ProxyList):
+                    children = children.node_list
+                steps.extend((True, child) for child in children)
+        stack.append((False, item))
+        stack.extend(reversed(steps))
+    return "".join(pieces), spans
+
+
+class TreeVisitor(object):
+    """
+    TreeVisitor is the single traversal of a redbaron tree shared by all of
+    the conversion stages for one file.
+
+    Nodes are ordered by a tuple key. The first walk gives every node a
+    one item key and any node created by a replacement gets the key of the
+    replaced node with its own position appended. Sorting by those keys
+    always gives the same order that red.find_all would have.
+    """
+    ATOMTRAILERS = "atomtrailers"
+    DOTTED_NAME = "dotted_name"
+    NAME = "name"
+    TYPES = (ATOMTRAILERS, DOTTED_NAME, NAME)
+    IMPORT_TYPES = ("import", "from_import")
+
+    def __init__(self, red, span_edits=False):
+        """
+        :param red: The redbaron ast to walk.
+        :type red: redbaron.RedBaron
+        :param span_edits: Record replacements as span edits against the
+            text of the tree instead of modifying the tree.
+        :type span_edits: bool
+        """
+        super(TreeVisitor, self).__init__()
+        self.red = red
+        self.edits = None
+        self._spans = {}
+        self._removed_from_root = False
+        self._keys = {}
+        self._buckets = dict((node_type, {}) for node_type in self.TYPES)
+        self._sorted = {}
+        self._names = {}
+        self._imported = set()
+        self._handlers = {}
+        self._texts = {}
+        self._leading = {}
+
+        walker = self._walk(list(red.node_list))
+        for index, (node, imported) in enumerate(walker):
+            self._add(node, (index,), imported)
+
+        if span_edits:
+            self.edits = SpanEdits(self._render_spans())
+
+    def _render_spans(self):
+        """
+        _render_spans renders the tree, taking note of where each node
+        starts and ends on the way.
+
+        :return: The text of the tree.
+        :rtype: str
+        """
+        text, self._spans = render_spans(self.red)
+        return text
+
+    @classmethod
+    def _walk(cls, nodes, imported=False):
+        """
+        _walk yields every node below (and including) "nodes" in the same
+        order as redbaron's find_iter.
+
+        :param nodes: The nodes to start walking from.
+        :type nodes: list[redbaron.Node]
+        :param imported: True if "nodes" are inside of an import.
+        :type imported: bool
+        :return: Tuples of the node and whether it is inside of an import.
+        :rtype: generator[tuple[redbaron.Node,bool]]
+        """
+        stack = [(node, imported) for node in reversed(nodes)]
+        while stack:
+            node, imported = stack.pop()
+            yield node, imported
+            imported = imported or node.type in cls.IMPORT_TYPES
+            children = []
+            for kind, key, _ in node._render():
+                if kind == "key":
+                    child = getattr(node, key)
+                    if isinstance(child, Node):
+                        children.append(child)
+                elif kind in ("list", "formatting"):
+                    child_nodes = getattr(node, key)
+                    if isinstance(child_nodes, ProxyList):
+                        child_nodes = child_nodes.node_list
+                    children.extend(child_nodes)
+            stack.extend((child, imported) for child in reversed(children))
+
+    def _add(self, node, key, imported):
+        name = node.value if node.type == self.NAME else None
+        self._keys[id(node)] = (node, key, node.type, name)
+        if imported:
+            self._imported.add(id(node))
+        if node.type in self._buckets:
+            self._buckets[node.type][id(node)] = node
+            self._sorted.pop(node.type, None)
+        if name is not None:
+            self._names.setdefault(name, {})[id(node)] = node
+
+    def _discard(self, node):
+        _, _, node_type, name = self._keys.pop(id(node))
+        self._texts.pop(id(node), None)
+        self._leading.pop(id(node), None)
+        self._imported.discard(id(node))
+        if node_type in self._buckets:
+            del self._buckets[node_type][id(node)]
+            self._sorted.pop(node_type, None)
+        if name is not None:
+            del self._names[name][id(node)]
+
+    def _forget(self, node):
+        """
+        _forget drops the cached text of a node that is about to change and
+        of every node that it is a part of.
+        """
+        while node is not None:
+            self._texts.pop(id(node), None)
+            self._leading.pop(id(node), None)
+            node = getattr(node, "parent", None)
+
+    def _in_order(self, nodes):
+        keys = self._keys
+        return sorted(nodes, key=lambda node: keys[id(node)][1])
+
+    def nodes(self, node_type):
+        """
+        nodes returns the indexed nodes of one type in document order.
+
+        :param node_type: One of the TYPES.
+        :type node_type: str
+        :return: The nodes of that type that are currently in the tree.
+        :rtype: list[redbaron.Node]
+        """
+        if node_type not in self._sorted:
+            self._sorted[node_type] = self._in_order(
+                self._buckets[node_type].values()
+            )
+        return list(self._sorted[node_type])
+
+    def names(self, value):
+        """
+        names returns the NameNodes with the given value in document order.
+
+        :param value: The name to look up.
+        :type value: str
+        :return: The matching NameNodes that are currently in the tree.
+        :rtype: list[redbaron.Node]
+        """
+        return self._in_order(self._names.get(value, {}).values())
+
+    def is_imported(self, node):
+        """
+        is_imported tells us if the node lives inside of an ImportNode or a
+        FromImportNode.
+
+        :param node: The node to query.
+        :type node: redbaron.Node
+        :return: True if one of the node's parents is an import.
+        :rtype: bool
+        """
+        if id(node) not in self._keys:
+            # The node has been cut out of the tree already, ask redbaron.
+            return bool(
+                node.parent_find("ImportNode") or
+                node.parent_find("FromImportNode")
+            )
+        return id(node) in self._imported
+
+    def find_all(self, node_type, value=None, text=None, name=None):
+        """
+        find_all is the indexed version of red.find_all for our node types.
+
+        :param node_type: One of the TYPES.
+        :type node_type: str
+        :param value: Optional filter on the node's value. A callable is
+            called with the value, anything else is compared to it.
+        :type value: None|callable|str
+        :param text: Optional filter called with the current text of the
+            node, see dumps.
+        :type text: None|callable
+        :param name: Optional filter on the name that the text of the node
+            starts with, see leading_name. It runs before "text", so nodes
+            that it turns away are never serialized. A callable is called
+            with the name, anything else is compared to it.
+        :type name: None|callable|str
+        :return: The matching nodes in document order.
+        :rtype: list[redbaron.Node]
+        """
+        if name is not None:
+            if not callable(name):
+                name = name.__eq__
+            nodes = [
+                node for node in self.find_all(node_type, value=value)
+                if name(self.leading_name(node))
+            ]
+            if text is None:
+                return nodes
+            return [node for node in nodes if text(self.dumps(node))]
+        if text is not None:
+            return [
+                node for node in self.find_all(node_type, value=value)
+                if text(self.dumps(node))
+            ]
+        if value is None:
+            return self.nodes(node_type)
+        if callable(value):
+            return [
+                node for node in self.nodes(node_type) if value(node.value)
+            ]
+        if node_type == self.NAME:
+            return self.names(value)
+        return [node for node in self.nodes(node_type) if node.value == value]
+
+    def register(self, node_types, handler):
+        """
+        register adds a handler that will be called with every node of the
+        given types the next time that dispatch is called.
+
+        :param node_types: The TYPES that the handler is interested in.
+        :type node_types: tuple[str...]
+        :param handler: Callable taking a single node.
+        :type handler: callable
+        """
+        for node_type in node_types:
+            self._handlers.setdefault(node_type, []).append(handler)
+
+    def dispatch(self):
+        """
+        dispatch hands the indexed nodes to the registered handlers and then
+        forgets about the handlers.
+        Handlers are free to replace nodes through the visitor, the nodes
+        that are handed out are the ones that were indexed when dispatch
+        started.
+        """
+        handlers, self._handlers = self._handlers, {}
+        for node_type in self.TYPES:
+            if node_type not in handlers:
+                continue
+            for node in self.nodes(node_type):
+                for handler in handlers[node_type]:
+                    handler(node)
+
+    def dumps(self, node):
+        """
+        dumps returns the current text of a node.
+        With span edits this includes the edits made inside of the node so
+        far, which node.dumps() would not know about.
+        The text of the nodes in the tree is cached until they are replaced,
+        so every stage asking about the same node serializes it only once.
+
+        :param node: The node to get the text of.
+        :type node: redbaron.Node
+        :return: The text of the node.
+        :rtype: str
+        """
+        text = self._texts.get(id(node))
+        if text is not None:
+            return text
+        span = self._spans.get(id(node))
+        if self.edits is None or span is None:
+            text = node.dumps()
+        else:
+            text = self.edits.text_of(*span)
+        if id(node) in self._keys:
+            self._texts[id(node)] = text
+        return text
+
+    def leading_name(self, node):
+        """
+        leading_name returns the name that the text of the node starts with.
+        For NameNodes, AtomTrailersNodes and DottedNameNodes it is read off
+        of the tree, which is a lot cheaper than serializing the node.
+
+        :param node: The node to get the name of.
+        :type node: redbaron.Node
+        :return: The name or None if the text does not start with a name.
+        :rtype: str|None
+        """
+        name = self._leading.get(id(node), _UNKNOWN)
+        if name is not _UNKNOWN:
+            return name
+        first = node
+        while first.type in (self.ATOMTRAILERS, self.DOTTED_NAME):
+            first = first.value[0]
+        name = None
+        if first.type == self.NAME:
+            name = first.value
+            span = self._spans.get(id(node))
+            # A span edit can have changed the name, the tree would not know.
+            if self.edits is not None and (
+                    span is None or
+                    self.edits.touched(span[0], span[0] + len(name) + 1)):
+                first = None
+        if first is None or first.type != self.NAME:
+            match = _IDENTIFIER.match(self.dumps(node))
+            name = match.group(0) if match else None
+        if id(node) in self._keys:
+            self._leading[id(node)] = name
+        return name
+
+    def render(self):
+        """
+        render returns the text of the whole converted tree.
+
+        :return: The converted source code.
+        :rtype: str
+        """
+        if self.edits is None:
+            return self.red.dumps()
+        dumps = self.edits.apply()
+        # Redbaron always ends the file with a newline after taking a line
+        #   out of the root of the tree.
+        if self._removed_from_root and not dumps.endswith("\n"):
+            dumps += "\n"
+        return dumps
+
+    def replace(self, node, replacement):
+        """
+        replace is node.replace that keeps the index up to date.
+        Only the replaced node is walked again.
+        With span edits it records the replacement instead.
+
+        :param node: Redbaron node that you are going to replace.
+        :type node: redbaron.Node
+        :param replacement: Replacement string.
+        :type replacement: str
+        """
+        self._forget(node)
+        if self.edits is not None:
+            if id(node) in self._spans:
+                self.edits.add(
+                    self._spans[id(node)][0],
+                    self._spans[id(node)][1],
+                    replacement
+                )
+            return
+        # Discard before replacing, the node changes its type in place.
+        known = self._keys.get(id(node))
+        imported = id(node) in self._imported
+        if known is not None:
+            for old_node, _ in self._walk([node]):
+                self._discard(old_node)
+        node.replace(replacement)
+
+        if known is None:
+            # The node was already cut out of the tree by an earlier
+            #   replacement, what it turns into can never be found again.
+            return
+        key = known[1]
+        walker = self._walk([node], imported=imported)
+        for index, (new_node, new_imported) in enumerate(walker):
+            self._add(
+                new_node, key + (index,) if index else key, new_imported
+            )
+
+    def remove(self, node):
+        """
+        remove takes the node out of its parent and out of the index.
+
+        :param node: Redbaron node that you are going to remove.
+        :type node: redbaron.Node
+        """
+        # Whole lines can go, which touches the text around the node too.
+        self._texts.clear()
+        self._leading.clear()
+        if self.edits is not None:
+            if id(node) not in self._spans:
+                return
+            start, end = self._spans[id(node)]
+            text = self.edits.text
+            # Take the whole line out when the node is the only thing on it.
+            line_start = text.rfind("\n", 0, start) + 1
+            line_end = text.find("\n", end)
+            line_end = len(text) if line_end == -1 else line_end + 1
+            if not text[line_start:start].strip() and \
+                    not text[end:line_end].strip():
+                start, end = line_start, line_end
+            if self.edits.add(start, end, "") and node.parent is self.red:
+                self._removed_from_root = True
+            return
+        if id(node) in self._keys:
+            for old_node, _ in self._walk([node]):
+                self._discard(old_node)
+        node.parent.remove(node)
@@ -0,0 +1,252 @@
+# Copyright 2018 Digital Domain 3.0
+#
+# Licensed under the Apache License, Version 2.0 (the "Apache License")
+# with the following modification; you may not use this file except in
+# compliance with the Apache License and the following modification to it:
+# Section 6. Trademarks. is deleted and replaced with:
+#
+# 6. Trademarks. This License does not grant permission to use the trade
+#    names, trademarks, service marks, or product names of the Licensor
+#    and its affiliates, except as required to comply with Section 4(c) of
+#    the License and to reproduce the content of the NOTICE file.
+#
+# You may obtain a copy of the Apache License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the Apache License with the above modification is
+# distributed on an "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY
+# KIND, either express or implied. See the Apache License for the specific
+# language governing permissions and limitations under the Apache License.
+"""
+bench times qt_py_convert.run.run and process_folder on a generated corpus
+and reports the throughput as json.
+
+The report only holds the parameters, the environment and the numbers, with
+sorted keys, so two reports can be diffed or compared by a script.
+"""
+import argparse
+import json
+import logging
+import os
+import platform
+import shutil
+import sys
+import tempfile
+import time
+
+from qt_py_convert import __version__
+from qt_py_convert.general import WriteFlag
+from qt_py_convert.qt_members import Qt
+from qt_py_convert.run import run, process_folder
+
+from benchmark import corpus
+
+
+REPORT_VERSION = 1
+
+
+def _median(samples):
+    samples = sorted(samples)
+    middle = len(samples) // 2
+    if len(samples) % 2:
+        return samples[middle]
+    return (samples[middle - 1] + samples[middle]) / 2.0
+
+
+def _throughput(samples, files, lines):
+    """
+    _throughput builds the result block for a list of timed samples.
+    The rates are based on the fastest sample, the least disturbed one.
+    """
+    best = min(samples)
+    return {
+        "samples": samples,
+        "best": best,
+        "median": _median(samples),
+        "files": files,
+        "lines": lines,
+        "files_per_sec": files / best if best else 0.0,
+        "lines_per_sec": lines / best if best else 0.0,
+    }
+
+
+def bench_run(sources, repeat=3, **flags):
+    """
+    bench_run times converting every source with run().
+
+    :param sources: Text of the files to convert.
+    :type sources: list[str...]
+    :param repeat: Number of times to convert the whole list.
+    :type repeat: int
+    :param flags: Passed through to run().
+    :return: The throughput block of the report.
+    :rtype: dict
+    """
+    samples = []
+    for _ in range(repeat):
+        start = time.time()
+        for source in sources:
+            run(source, **flags)
+        samples.append(time.time() - start)
+    lines = sum(source.count("\n") for source in sources)
+    return _throughput(samples, len(sources), lines)
+
+
+def bench_folder(folder, repeat=3, jobs=1, **flags):
+    """
+    bench_folder times process_folder on the corpus folder.
+    The converted files are written to a temporary folder so that every
+    repeat starts from the same sources.
+
+    :param folder: The corpus folder.
+    :type folder: str
+    :param repeat: Number of times to convert the folder.
+    :type repeat: int
+    :param jobs: Passed through to process_folder.
+    :type jobs: int
+    :param flags: Passed through to process_folder.
+    :return: The throughput block of the report.
+    :rtype: dict
+    """
+    lines = 0
+    files = 0
+    for name in os.listdir(folder):
+        with open(os.path.join(folder, name), "rb") as fh:
+            lines += fh.read().count(b"\n")
+        files += 1
+    samples = []
+    for _ in range(repeat):
+        output = tempfile.mkdtemp(prefix="qt_py_convert_bench_")
+        try:
+            start = time.time()
+            process_folder(
+                folder,
+                write_mode=WriteFlag.WRITE_TO_FILE,
+                path=(folder, output),
+                jobs=jobs,
+                **flags
+            )
+            samples.append(time.time() - start)
+        finally:
+            shutil.rmtree(output)
+    result = _throughput(samples, files, lines)
+    result["jobs"] = jobs
+    return result
+
+
+def benchmark(folder, repeat=3, jobs=1, skip_lineno=True, corpus_kwargs=None):
+    """
+    benchmark generates the corpus into "folder" and runs both benchmarks.
+
+    :param folder: Directory to generate the corpus into.
+    :type folder: str
+    :param repeat: Number of samples for each benchmark.
+    :type repeat: int
+    :param jobs: Worker processes for the process_folder benchmark.
+    :type jobs: int
+    :param skip_lineno: Passed through to run() and process_folder.
+    :type skip_lineno: bool
+    :param corpus_kwargs: Passed through to corpus.generate_corpus.
+    :type corpus_kwargs: dict
+    :return: The report.
+    :rtype: dict
+    """
+    corpus_kwargs = corpus_kwargs or {}
+    paths = corpus.generate_corpus(folder, **corpus_kwargs)
+    sources = []
+    for path in paths:
+        with open(path, "rb") as fh:
+            sources.append(fh.read().decode("utf-8"))
+        if sys.version_info[0] == 2:
+            sources[-1] = sources[-1].encode("utf-8")
+    return {
+        "version": REPORT_VERSION,
+        "corpus": dict(corpus_kwargs, repeat=repeat, skip_lineno=skip_lineno),
+        "environment": {
+            "python": platform.python_version(),
+            "qt_py_convert": __version__,
+            "qt.py": Qt.__version__,
+            "binding": Qt.__binding__,
+            "qt_members": Qt.source,
+        },
+        "results": {
+            "run": bench_run(sources, repeat=repeat, skip_lineno=skip_lineno),
+            "process_folder": bench_folder(
+                folder, repeat=repeat, jobs=jobs, skip_lineno=skip_lineno
+            ),
+        },
+    }
+
+
+def parse(args=None):
+    parser = argparse.ArgumentParser("benchmark")
+    parser.add_argument("--files", type=int, default=20,
+                        help="Number of files in the corpus.")
+    parser.add_argument("--lines", type=int, default=200,
+                        help="Rough number of lines in each file.")
+    parser.add_argument("--binding", default="PyQt4",
+                        choices=("PyQt4", "PySide"),
+                        help="Binding that the corpus imports.")
+    parser.add_argument("--star-imports", action="store_true",
+                        help="Import the Qt modules with \"import *\".")
+    parser.add_argument("--signal-density", type=float, default=0.5,
+                        help="Chance that a widget signal is connected with "
+                             "the old style SIGNAL/SLOT syntax.")
+    parser.add_argument("--qstring-density", type=float, default=0.25,
+                        help="Chance that a slot uses QString/QVariant.")
+    parser.add_argument("--pyuic-ratio", type=float, default=0.2,
+                        help="Fraction of pyuic generated style files.")
+    parser.add_argument("--seed", type=int, default=0,
+                        help="Seed of the corpus.")
+    parser.add_argument("--repeat", type=int, default=3,
+                        help="Number of samples for each benchmark.")
+    parser.add_argument("-j", "--jobs", type=int, default=1,
+                        help="Worker processes for process_folder.")
+    parser.add_argument("--show-lines", action="store_true",
+                        help="Benchmark with line numbers turned on.")
+    parser.add_argument("--output", default=None,
+                        help="File to write the json report to. Defaults "
+                             "to stdout.")
+    parser.add_argument("--keep-corpus", default=None,
+                        help="Generate the corpus into this folder and keep "
+                             "it instead of using a temporary folder.")
+    return parser.parse_args(args)
+
+
+def main(args=None):
+    args = parse(args)
+    # The converter logs every replacement, which is not what we are timing.
+    logging.disable(logging.CRITICAL)
+
+    folder = args.keep_corpus or tempfile.mkdtemp(
+        prefix="qt_py_convert_corpus_"
+    )
+    try:
+        report = benchmark(
+            folder,
+            repeat=args.repeat,
+            jobs=args.jobs,
+            skip_lineno=not args.show_lines,
+            corpus_kwargs=dict(
+                files=args.files,
+                lines=args.lines,
+                binding=args.binding,
+                star_imports=args.star_imports,
+                signal_density=args.signal_density,
+                qstring_density=args.qstring_density,
+                pyuic_ratio=args.pyuic_ratio,
+                seed=args.seed,
+            ),
+        )
+    finally:
+        if not args.keep_corpus:
+            shutil.rmtree(folder)
+
+    text = json.dumps(report, indent=2, sort_keys=True) + "\n"
+    if args.output:
+        with open(args.output, "w") as fh:
+            fh.write(text)
+    else:
+        sys.stdout.write(text)
@@ -0,0 +1,300 @@
+# Copyright 2018 Digital Domain 3.0
+#
+# Licensed under the Apache License, Version 2.0 (the "Apache License")
+# with the following modification; you may not use this file except in
+# compliance with the Apache License and the following modification to it:
+# Section 6. Trademarks. is deleted and replaced with:
+#
+# 6. Trademarks. This License does not grant permission to use the trade
+#    names, trademarks, service marks, or product names of the Licensor
+#    and its affiliates, except as required to comply with Section 4(c) of
+#    the License and to reproduce the content of the NOTICE file.
+#
+# You may obtain a copy of the Apache License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the Apache License with the above modification is
+# distributed on an "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY
+# KIND, either express or implied. See the Apache License for the specific
+# language governing permissions and limitations under the Apache License.
+"""
+corpus generates synthetic, but realistic, Qt for Python source files.
+
+Every file is built from a seeded random.Random, so the same parameters
+always give byte for byte the same corpus.
+"""
+import os
+import random
+
+
+SIGNALS = (
+    ("clicked()", "button", ""),
+    ("textChanged(const QString &)", "line_edit", "text"),
+    ("valueChanged(int)", "spin_box", "value"),
+    ("currentIndexChanged(int)", "combo_box", "index"),
+    ("stateChanged(int)", "check_box", "state"),
+)
+WIDGETS = (
+    ("button", "QPushButton"),
+    ("line_edit", "QLineEdit"),
+    ("spin_box", "QSpinBox"),
+    ("combo_box", "QComboBox"),
+    ("check_box", "QCheckBox"),
+)
+QSTRING_LINES = (
+    "name = QtCore.QString(\"{name}\")",
+    "name = QtCore.QString(self.{attr}.objectName()).toLower()",
+    "names = QtCore.QStringList()",
+    "value = QtCore.QVariant(self.{attr}.objectName())",
+    "data = self.{attr}.property(\"{name}\").toPyObject()",
+    "settings = QtCore.QSettings(\"{name}\", \"bench\")",
+    "size = settings.value(\"size\", QtCore.QVariant(0)).toPyObject()",
+)
+PYUIC_HEADER = """# -*- coding: utf-8 -*-
+
+# Form implementation generated from reading ui file '{name}.ui'
+#
+# Created by: PyQt4 UI code generator 4.11.4
+#
+# WARNING! All changes made in this file will be lost!
+
+{imports}
+
+try:
+    _fromUtf8 = QtCore.QString.fromUtf8
+except AttributeError:
+    def _fromUtf8(s):
+        return s
+
+try:
+    _encoding = QtGui.QApplication.UnicodeUTF8
+    def _translate(context, text, disambig):
+        return QtGui.QApplication.translate(context, text, disambig, _encoding)
+except AttributeError:
+    def _translate(context, text, disambig):
+        return QtGui.QApplication.translate(context, text, disambig)
+"""
+
+
+def _imports(binding, star_imports):
+    if star_imports:
+        return (
+            "from {binding}.QtCore import *\n"
+            "from {binding}.QtGui import *".format(binding=binding)
+        )
+    return "from {binding} import QtCore, QtGui".format(binding=binding)
+
+
+def _qualify(line, star_imports):
+    """Star imported code uses the members without their module."""
+    if star_imports:
+        return line.replace("QtCore.", "").replace("QtGui.", "")
+    return line
+
+
+def _widget_class(rng, index, signal_density, qstring_density):
+    """
+    _widget_class builds a hand written style widget class.
+
+    :return: The lines of the class.
+    :rtype: list[str...]
+    """
+    name = "Widget{index}".format(index=index)
+    widgets = rng.sample(WIDGETS, rng.randint(2, len(WIDGETS)))
+    lines = [
+        "class {name}(QtGui.QWidget):".format(name=name),
+        "    \"\"\"{name} is a generated benchmark widget.\"\"\"".format(
+            name=name
+        ),
+        "",
+        "    def __init__(self, parent=None):",
+        "        super({name}, self).__init__(parent)".format(name=name),
+        "        self.layout = QtGui.QVBoxLayout(self)",
+    ]
+    for attr, class_name in widgets:
+        lines.append("        self.{attr} = QtGui.{class_name}(self)".format(
+            attr=attr, class_name=class_name
+        ))
+        lines.append("        self.layout.addWidget(self.{attr})".format(
+            attr=attr
+        ))
+    slots = []
+    for attr, _ in widgets:
+        for signal, owner, arg in SIGNALS:
+            if owner != attr or rng.random() >= signal_density:
+                continue
+            slot = "_on_{attr}_{signal}".format(
+                attr=attr, signal=signal.split("(")[0]
+            )
+            lines.append(
+                "        self.connect(self.{attr}, QtCore.SIGNAL(\"{signal}\")"
+                ", self.{slot})".format(attr=attr, signal=signal, slot=slot)
+            )
+            slots.append((slot, signal, arg, attr))
+    for slot, signal, arg, attr in slots:
+        lines.extend([
+            "",
+            "    def {slot}(self{args}):".format(
+                slot=slot, args=", " + arg if arg else ""
+            ),
+        ])
+        if rng.random() < qstring_density:
+            lines.append("        " + rng.choice(QSTRING_LINES).format(
+                name=slot, attr=attr
+            ))
+        lines.append(
+            "        self.emit(QtCore.SIGNAL(\"changed(PyQt_PyObject)\"), "
+            "self.{attr})".format(attr=attr)
+        )
+    if not slots:
+        lines.extend(["", "    def refresh(self):", "        self.update()"])
+    return lines + ["", ""]
+
+
+def _pyuic_class(rng, index):
+    """
+    _pyuic_class builds a pyuic4 style "Ui_" class.
+
+    :return: The lines of the class.
+    :rtype: list[str...]
+    """
+    widgets = [rng.choice(WIDGETS) for _ in range(rng.randint(3, 12))]
+    lines = [
+        "class Ui_Form{index}(object):".format(index=index),
+        "    def setupUi(self, Form):",
+        "        Form.setObjectName(_fromUtf8(\"Form{index}\"))".format(
+            index=index
+        ),
+        "        Form.resize({w}, {h})".format(
+            w=rng.randint(200, 800), h=rng.randint(200, 600)
+        ),
+        "        self.verticalLayout = QtGui.QVBoxLayout(Form)",
+        "        self.verticalLayout.setObjectName("
+        "_fromUtf8(\"verticalLayout\"))",
+    ]
+    names = []
+    for number, (attr, class_name) in enumerate(widgets):
+        name = "{attr}_{number}".format(attr=attr, number=number)
+        names.append(name)
+        lines.extend([
+            "        self.{name} = QtGui.{class_name}(Form)".format(
+                name=name, class_name=class_name
+            ),
+            "        self.{name}.setObjectName(_fromUtf8(\"{name}\"))".format(
+                name=name
+            ),
+            "        self.verticalLayout.addWidget(self.{name})".format(
+                name=name
+            ),
+        ])
+    lines.extend([
+        "",
+        "        self.retranslateUi(Form)",
+        "        QtCore.QObject.connect(self.{name}, QtCore.SIGNAL(_fromUtf8("
+        "\"destroyed()\")), Form.close)".format(name=names[0]),
+        "        QtCore.QMetaObject.connectSlotsByName(Form)",
+        "",
+        "    def retranslateUi(self, Form):",
+        "        Form.setWindowTitle(_translate(\"Form\", \"Form\", None))",
+    ])
+    for name in names:
+        lines.append(
+            "        self.{name}.setToolTip(_translate(\"Form\", \"{name}\", "
+            "None))".format(name=name)
+        )
+    return lines + ["", ""]
+
+
+def generate_source(index=0, lines=200, binding="PyQt4", star_imports=False,
+                    signal_density=0.5, qstring_density=0.25, pyuic=False,
+                    seed=0):
+    """
+    generate_source builds the text of a single python file.
+
+    :param index: Number of the file in the corpus, used for the names and
+        to seed the file.
+    :type index: int
+    :param lines: Rough number of lines. Classes are added until the file
+        reaches it.
+    :type lines: int
+    :param binding: The binding to import from, "PyQt4" or "PySide".
+    :type binding: str
+    :param star_imports: Import the Qt modules with "import *".
+    :type star_imports: bool
+    :param signal_density: Chance that a widget signal is connected with
+        the old style SIGNAL/SLOT syntax.
+    :type signal_density: float
+    :param qstring_density: Chance that a slot uses QString/QVariant.
+    :type qstring_density: float
+    :param pyuic: Build a pyuic generated style file instead.
+    :type pyuic: bool
+    :param seed: Seed of the corpus.
+    :type seed: int
+    :return: The source code.
+    :rtype: str
+    """
+    rng = random.Random(seed * 1000003 + index)
+    imports = _imports(binding, star_imports)
+    if pyuic:
+        source = PYUIC_HEADER.format(
+            name="form{index}".format(index=index), imports=imports
+        ).split("\n") + [""]
+    else:
+        source = [
+            "\"\"\"",
+            "Generated benchmark module {index}.".format(index=index),
+            "\"\"\"",
+            "import os",
+            "",
+            imports,
+            "",
+            "",
+        ]
+    count = 0
+    while len(source) < lines:
+        if pyuic:
+            block = _pyuic_class(rng, "{0}_{1}".format(index, count))
+        else:
+            block = _widget_class(
+                rng, "{0}_{1}".format(index, count),
+                signal_density, qstring_density
+            )
+        source.extend(block)
+        count += 1
+    return _qualify("\n".join(source).rstrip("\n") + "\n", star_imports)
+
+
+def generate_corpus(folder, files=20, pyuic_ratio=0.2, seed=0, **kwargs):
+    """
+    generate_corpus writes a corpus of generated files into "folder".
+
+    :param folder: Directory to write the files to. It is created if needed.
+    :type folder: str
+    :param files: Number of files to generate.
+    :type files: int
+    :param pyuic_ratio: Fraction of the files that are pyuic style.
+    :type pyuic_ratio: float
+    :param seed: Seed of the corpus.
+    :type seed: int
+    :param kwargs: Passed through to generate_source.
+    :return: The paths of the written files.
+    :rtype: list[str...]
+    """
+    if not os.path.isdir(folder):
+        os.makedirs(folder)
+    pyuic_files = int(round(files * pyuic_ratio))
+    paths = []
+    for index in range(files):
+        pyuic = index < pyuic_files
+        name = "{kind}_{index:04d}.py".format(
+            kind="ui" if pyuic else "module", index=index
+        )
+        path = os.path.join(folder, name)
+        with open(path, "wb") as fh:
+            fh.write(generate_source(
+                index=index, pyuic=pyuic, seed=seed, **kwargs
+            ).encode("utf-8"))
+        paths.append(path)
+    return paths
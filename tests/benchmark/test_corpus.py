@@ -0,0 +1,86 @@
+import os
+import shutil
+import tempfile
+
+from benchmark import corpus
+from benchmark.bench import bench_run
+
+
+def test_generate_source_is_deterministic():
+    assert corpus.generate_source(index=3, seed=7) == \
+        corpus.generate_source(index=3, seed=7)
+    assert corpus.generate_source(index=3, seed=7) != \
+        corpus.generate_source(index=3, seed=8)
+
+
+def test_generate_source_is_python():
+    for kwargs in ({}, {"pyuic": True}, {"star_imports": True},
+                   {"binding": "PySide", "signal_density": 1.0,
+                    "qstring_density": 1.0}):
+        source = corpus.generate_source(lines=100, **kwargs)
+        compile(source, "<generated>", "exec")
+        assert source.count("\n") >= 100
+
+
+def test_generate_source_options():
+    assert "QtCore.SIGNAL" not in corpus.generate_source(signal_density=0.0)
+    assert "import *" in corpus.generate_source(star_imports=True)
+    assert "QtGui." not in corpus.generate_source(star_imports=True)
+    assert "class Ui_Form" in corpus.generate_source(pyuic=True)
+    assert "from PySide import" in corpus.generate_source(binding="PySide")
+
+
+def test_generate_corpus():
+    folder = tempfile.mkdtemp()
+    try:
+        paths = corpus.generate_corpus(
+            folder, files=5, pyuic_ratio=0.4, lines=50
+        )
+        assert sorted(os.listdir(folder)) == [
+            "module_0002.py", "module_0003.py", "module_0004.py",
+            "ui_0000.py", "ui_0001.py",
+        ]
+        assert len(paths) == 5
+    finally:
+        shutil.rmtree(folder)
+
+
+def test_bench_run():
+    result = bench_run(
+        [corpus.generate_source(lines=20)], repeat=2, skip_lineno=True
+    )
+    assert len(result["samples"]) == 2
+    assert result["files"] == 1
+    assert result["lines_per_sec"] > 0
+
+
+if __name__ == "__main__":
+    import traceback
+    _tests = filter(
+        lambda key: True if key.startswith("test_") else False,
+        globals().keys()
+    )
+
+    failed = []
+    for test in _tests:
+        try:
+            print("Running %s" % test)
+            globals()[test]()
+            print("    %s succeeded!" % test)
+        except AssertionError as err:
+            print("    %s failed!" % test)
+            failed.append((test, traceback.format_exc()))
+        print("")
+    for failure_name, failure_error in failed:
+        print("""
+------------ %s FAILED ------------
+%s
+""" % (failure_name, failure_error))
+
+    print(
+        "\n\n%d failures, %d success, %s%%" % (
+            len(failed),
+            len(_tests)-len(failed),
+            "%.1f" % ((float(len(_tests)-len(failed))/len(_tests))*100)
+        )
+    )
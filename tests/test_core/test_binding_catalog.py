@@ -0,0 +1,222 @@
+import json
+import os
+import shutil
+import sys
+import tempfile
+
+import redbaron
+
+from qt_py_convert import binding_catalog
+from qt_py_convert._modules import from_imports
+from qt_py_convert._modules.expand_stars.process import Processes, \
+    process, referenced_names
+from qt_py_convert.general import ConversionContext
+
+
+def _write(path, text):
+    with open(path, "w") as fh:
+        fh.write(text)
+
+
+def _fake_binding(folder, name):
+    package = os.path.join(folder, name)
+    os.makedirs(package)
+    _write(os.path.join(package, "__init__.py"), "")
+    _write(
+        os.path.join(package, "QtCore.py"),
+        "class QObject(object):\n    pass\n\n"
+        "def pyqtSignal():\n    pass\n\n"
+        "len = None\n",
+    )
+    return package
+
+
+def test_catalog_without_binding():
+    folder = tempfile.mkdtemp()
+    name = "FakeCatalogBinding"
+    sys.path.insert(0, folder)
+    try:
+        _fake_binding(folder, name)
+        catalog_folder = os.path.join(folder, "catalog")
+        catalog = binding_catalog.BindingCatalog(name, [catalog_folder])
+        assert catalog.generate() == ["QtCore"]
+        # Builtins are left out.
+        assert catalog.members("QtCore") == ["QObject", "pyqtSignal"]
+        assert "QtCore" in catalog.members(binding_catalog.TOP_LEVEL)
+
+        # Once the binding is gone, the catalog is all that is left.
+        sys.path.remove(folder)
+        sys.modules.pop(name + ".QtCore")
+        sys.modules.pop(name)
+        shutil.rmtree(os.path.join(folder, name))
+        catalog = binding_catalog.BindingCatalog(name, [catalog_folder])
+        assert catalog.fingerprint is None
+        assert catalog.members("QtCore") == ["QObject", "pyqtSignal"]
+        try:
+            catalog.members("QtGui")
+        except ImportError:
+            pass
+        else:
+            raise AssertionError("QtGui is not in the catalog.")
+    finally:
+        if folder in sys.path:
+            sys.path.remove(folder)
+        shutil.rmtree(folder)
+
+
+def test_catalog_from_other_install():
+    folder = tempfile.mkdtemp()
+    name = "FakeStaleBinding"
+    sys.path.insert(0, folder)
+    try:
+        _fake_binding(folder, name)
+        catalog_folder = os.path.join(folder, "catalog")
+        catalog = binding_catalog.BindingCatalog(name, [catalog_folder])
+        catalog.members("QtCore")
+        with open(catalog.path) as fh:
+            data = json.load(fh)
+        assert list(data["modules"]) == ["QtCore"]
+
+        data["fingerprint"] = "somewhere/else:0"
+        data["modules"]["QtCore"] = ["QStale"]
+        _write(catalog.path, json.dumps(data))
+        catalog = binding_catalog.BindingCatalog(name, [catalog_folder])
+        assert catalog.modules == {}
+        assert catalog.members("QtCore") == ["QObject", "pyqtSignal"]
+    finally:
+        sys.path.remove(folder)
+        sys.modules.pop(name + ".QtCore", None)
+        sys.modules.pop(name, None)
+        shutil.rmtree(folder)
+
+
+def test_get_children_uses_catalog():
+    folder = tempfile.mkdtemp()
+    name = "FakeChildrenBinding"
+    os.environ[binding_catalog.CATALOG_ENV] = folder
+    try:
+        _write(
+            os.path.join(folder, name + ".json"),
+            json.dumps({
+                "version": binding_catalog.CATALOG_VERSION,
+                "binding": name,
+                "fingerprint": None,
+                "modules": {"QtGui": ["QWidget"], "": ["QtGui"]},
+            })
+        )
+        assert Processes._get_children(name, ["QtGui"]) == \
+            {"QWidget": "QtGui.QWidget"}
+        assert Processes._get_children(name) == \
+            {"QtGui": name + ".QtGui"}
+        try:
+            Processes._get_children(name, ["QtCore"])
+        except ImportError as err:
+            message = str(err)
+            assert "from the {name}.QtCore module".format(name=name) in message
+            assert message.count("not in the catalog") == 1
+        else:
+            raise AssertionError("QtCore is not in the catalog.")
+    finally:
+        del os.environ[binding_catalog.CATALOG_ENV]
+        shutil.rmtree(folder)
+
+
+def test_star_expansion_only_maps_used_names():
+    folder = tempfile.mkdtemp()
+    os.environ[binding_catalog.CATALOG_ENV] = folder
+    try:
+        _write(
+            os.path.join(folder, "PyQt4.json"),
+            json.dumps({
+                "version": binding_catalog.CATALOG_VERSION,
+                "binding": "PyQt4",
+                "fingerprint": binding_catalog.fingerprint("PyQt4"),
+                "modules": {"QtGui": ["QLabel", "QPushButton", "QWidget"]},
+            })
+        )
+        red = redbaron.RedBaron(
+            "from PyQt4.QtGui import *\n"
+            "w = QWidget()\n"
+            "w.QLabel = None\n"
+        )
+        assert referenced_names(red) >= set(["w", "QWidget"])
+        assert "QLabel" not in referenced_names(red)
+        _, mappings = process(red, ConversionContext())
+        assert mappings == {"QWidget": "QtGui.QWidget"}
+    finally:
+        del os.environ[binding_catalog.CATALOG_ENV]
+        shutil.rmtree(folder)
+
+
+def test_stars_expanded_once_per_tree():
+    folder = tempfile.mkdtemp()
+    os.environ[binding_catalog.CATALOG_ENV] = folder
+    calls = []
+    original = Processes.__dict__["EXPAND"]
+
+    def _counted(red, stars, **kwargs):
+        calls.append(len(stars))
+        return Processes._process_star(red, stars, **kwargs)
+
+    Processes.EXPAND = staticmethod(_counted)
+    try:
+        _write(
+            os.path.join(folder, "PyQt4.json"),
+            json.dumps({
+                "version": binding_catalog.CATALOG_VERSION,
+                "binding": "PyQt4",
+                "fingerprint": binding_catalog.fingerprint("PyQt4"),
+                "modules": {
+                    "QtCore": ["QObject", "QTimer"],
+                    "QtGui": ["QLabel", "QWidget"],
+                },
+            })
+        )
+        red = redbaron.RedBaron(
+            "from PyQt4.QtCore import *\n"
+            "from PyQt4.QtGui import *\n"
+            "from PyQt4.QtGui import QLabel as QTimer\n"
+            "w = QWidget()\n"
+            "t = QTimer()\n"
+        )
+        _, mappings = from_imports.process(red, ConversionContext())
+        assert calls == [2]
+        assert mappings["QWidget"] == "QtGui.QWidget"
+        # The explicit import wins over the star import.
+        assert mappings["QTimer"] == "QtGui.QLabel"
+    finally:
+        Processes.EXPAND = original
+        del os.environ[binding_catalog.CATALOG_ENV]
+        shutil.rmtree(folder)
+
+
+if __name__ == "__main__":
+    import traceback
+    _tests = filter(
+        lambda key: True if key.startswith("test_") else False,
+        globals().keys()
+    )
+
+    failed = []
+    for test in _tests:
+        try:
+            print("Running %s" % test)
+            globals()[test]()
+            print("    %s succeeded!" % test)
+        except AssertionError as err:
+            print("    %s failed!" % test)
+            failed.append((test, traceback.format_exc()))
+        print("")
+    for failure_name, failure_error in failed:
+        print("""
+------------ %s FAILED ------------
+%s
+""" % (failure_name, failure_error))
+
+    print(
+        "\n\n%d failures, %d success, %s%%" % (
+            len(failed),
+            len(_tests)-len(failed),
+            "%.1f" % ((float(len(_tests)-len(failed))/len(_tests))*100)
+        )
+    )
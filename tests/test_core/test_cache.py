@@ -0,0 +1,155 @@
+import os
+import pickle
+import shutil
+import tempfile
+
+from qt_py_convert import run as run_module
+from qt_py_convert.run import run
+from qt_py_convert.cache import ResultCache
+from qt_py_convert.general import FileResult
+
+
+SOURCE = """from PyQt4 import QtGui, uic
+
+form, base = uic.loadUiType("foo.ui")
+w = QtGui.QLineEdit()
+"""
+
+
+class _NoParse(object):
+    def __init__(self, *args, **kwargs):
+        raise AssertionError("The source was parsed on a cache hit.")
+
+
+def test_cache_hit_skips_parsing():
+    path = tempfile.mkdtemp()
+    try:
+        cache = ResultCache(path)
+        aliases, mappings, dumps = run(SOURCE, True, cache=cache)
+
+        original = run_module.redbaron.RedBaron
+        run_module.redbaron.RedBaron = _NoParse
+        try:
+            cached_aliases, cached_mappings, cached_dumps = run(
+                SOURCE, True, cache=cache
+            )
+        finally:
+            run_module.redbaron.RedBaron = original
+
+        assert cached_dumps == dumps
+        assert cached_mappings == mappings
+        assert cached_aliases["used"] == aliases["used"]
+        assert cached_aliases["bindings"] == aliases["bindings"]
+        assert len(cached_aliases["errors"]) == len(aliases["errors"]) == 1
+    finally:
+        shutil.rmtree(path)
+
+
+def test_cache_key_flags():
+    assert ResultCache.key(SOURCE) == ResultCache.key(SOURCE)
+    assert ResultCache.key(SOURCE) != ResultCache.key(SOURCE + " ")
+    assert ResultCache.key(SOURCE) != ResultCache.key(SOURCE, tometh_flag=True)
+    assert ResultCache.key(SOURCE) != ResultCache.key(SOURCE, skip_lineno=True)
+    assert ResultCache.key(SOURCE) != ResultCache.key(
+        SOURCE, explicit_signals_flag=True
+    )
+
+
+def test_cache_eviction():
+    path = tempfile.mkdtemp()
+    try:
+        cache = ResultCache(path, max_size=1024)
+        for index in range(20):
+            key = ResultCache.key("source %d" % index)
+            cache.put(key, {"used": set()}, {}, "x" * 200)
+            # Make sure the entries have distinct ages.
+            entry = cache._entry_path(key)
+            os.utime(entry, (index, index))
+        assert cache.size() <= 1024
+        assert cache.get(ResultCache.key("source 19")) is not None
+        assert cache.get(ResultCache.key("source 0")) is None
+    finally:
+        shutil.rmtree(path)
+
+
+def test_cache_size_is_passed_to_workers():
+    path = tempfile.mkdtemp()
+    try:
+        cache = ResultCache(path, max_size=1024)
+        cache.put(ResultCache.key("source"), {"used": set()}, {}, "x" * 200)
+        size = cache.size()
+        worker_cache = pickle.loads(pickle.dumps(cache))
+
+        def _walk():
+            raise AssertionError("The cache folder should not be walked.")
+        worker_cache._entries = _walk
+        worker_cache.put(
+            ResultCache.key("other"), {"used": set()}, {}, "x" * 200
+        )
+        assert worker_cache._size > size
+
+        # Writing the same entry again does not grow the cache.
+        size = worker_cache._size
+        worker_cache.put(
+            ResultCache.key("other"), {"used": set()}, {}, "x" * 200
+        )
+        assert worker_cache._size == size
+    finally:
+        shutil.rmtree(path)
+
+
+def test_cache_timings():
+    path = tempfile.mkdtemp()
+    try:
+        source = os.path.join(path, "source.py")
+        with open(source, "w") as fh:
+            fh.write(SOURCE)
+        cache = ResultCache(os.path.join(path, "cache"), max_size=1)
+        assert cache.timings() == {}
+
+        skipped = FileResult(source)
+        cache.record_timings([skipped])
+        assert cache.timings() == {}
+
+        cache.record_timings([FileResult(source, timings={"total": 2.5})])
+        assert cache.timings() == {
+            os.path.abspath(source): (len(SOURCE), 2.5)
+        }
+        # The timings are not a cache entry and are never evicted.
+        assert cache.size() == 0
+        cache.evict()
+        assert cache.timings()
+    finally:
+        shutil.rmtree(path)
+
+
+if __name__ == "__main__":
+    import traceback
+    _tests = filter(
+        lambda key: True if key.startswith("test_") else False,
+        globals().keys()
+    )
+
+    failed = []
+    for test in _tests:
+        try:
+            print("Running %s" % test)
+            globals()[test]()
+            print("    %s succeeded!" % test)
+        except AssertionError as err:
+            print("    %s failed!" % test)
+            failed.append((test, traceback.format_exc()))
+        print("")
+    for failure_name, failure_error in failed:
+        print("""
+------------ %s FAILED ------------
+%s
+""" % (failure_name, failure_error))
+
+    print(
+        "\n\n%d failures, %d success, %s%%" % (
+            len(failed),
+            len(_tests)-len(failed),
+            "%.1f" % ((float(len(_tests)-len(failed))/len(_tests))*100)
+        )
+    )
@@ -0,0 +1,94 @@
+import logging
+import os
+
+import redbaron
+
+from qt_py_convert import color
+from qt_py_convert.general import ChangeEvent, change
+
+
+class _Unrenderable(object):
+    def __str__(self):
+        raise AssertionError("The node was rendered.")
+
+
+class _Records(logging.Handler):
+    def __init__(self):
+        logging.Handler.__init__(self)
+        self.records = []
+
+    def emit(self, record):
+        self.records.append(record)
+
+
+def _logger(name, level):
+    logger = logging.getLogger("test_change." + name)
+    logger.propagate = False
+    logger.setLevel(level)
+    handler = _Records()
+    logger.addHandler(handler)
+    return logger, handler
+
+
+def test_change_skipped_without_debug():
+    logger, handler = _logger("info", logging.INFO)
+    assert change(logger, _Unrenderable(), "QtWidgets.QWidget") is None
+    assert not handler.records
+
+
+def test_change_event_rendered_when_written():
+    logger, handler = _logger("debug", logging.DEBUG)
+    red = redbaron.RedBaron("a = 1\nw = QtGui.QWidget()\n")
+    node = red.find("AtomTrailersNode")
+    saved = os.environ.get(color.COLOR_ENV)
+    color.set_color("never")
+    try:
+        change(logger, node, "QtWidgets.QWidget()")
+        change(logger, node, "QtWidgets.QWidget()", skip_lineno=True)
+        event = handler.records[0].msg
+        assert isinstance(event, ChangeEvent)
+        assert event.stage == "test_change.debug"
+        assert event.lines == (1, 1)
+        assert handler.records[0].getMessage() == (
+            "Replacing \"QtGui.QWidget()\" with \"QtWidgets.QWidget()\" "
+            "at line 1"
+        )
+        assert handler.records[1].getMessage() == (
+            "Replacing \"QtGui.QWidget()\" with \"QtWidgets.QWidget()\""
+        )
+    finally:
+        color.set_color(saved or "auto")
+        if saved is None:
+            del os.environ[color.COLOR_ENV]
+
+
+if __name__ == "__main__":
+    import traceback
+    _tests = filter(
+        lambda key: True if key.startswith("test_") else False,
+        globals().keys()
+    )
+
+    failed = []
+    for test in _tests:
+        try:
+            print("Running %s" % test)
+            globals()[test]()
+            print("    %s succeeded!" % test)
+        except AssertionError as err:
+            print("    %s failed!" % test)
+            failed.append((test, traceback.format_exc()))
+        print("")
+    for failure_name, failure_error in failed:
+        print("""
+------------ %s FAILED ------------
+%s
+""" % (failure_name, failure_error))
+
+    print(
+        "\n\n%d failures, %d success, %s%%" % (
+            len(failed),
+            len(_tests)-len(failed),
+            "%.1f" % ((float(len(_tests)-len(failed))/len(_tests))*100)
+        )
+    )
@@ -0,0 +1,114 @@
+import os
+import subprocess
+import sys
+
+from qt_py_convert import color
+
+
+class _Stream(object):
+    def __init__(self, tty):
+        self.tty = tty
+
+    def isatty(self):
+        return self.tty
+
+
+def _detect(env=None, tty=True):
+    """Runs a fresh detection with the given environment and stdout."""
+    saved_environ = dict(os.environ)
+    saved_stdout = sys.stdout
+    saved_popen = subprocess.Popen
+    calls = []
+
+    def _popen(*args, **kwargs):
+        calls.append(args)
+        return saved_popen(*args, **kwargs)
+
+    try:
+        for key in (color.COLOR_ENV, color.NO_COLOR_ENV):
+            os.environ.pop(key, None)
+        os.environ.update(env or {})
+        sys.stdout = _Stream(tty)
+        subprocess.Popen = _popen
+        color._supports_color = None
+        return color.supports_color(), calls
+    finally:
+        subprocess.Popen = saved_popen
+        sys.stdout = saved_stdout
+        os.environ.clear()
+        os.environ.update(saved_environ)
+        color._supports_color = None
+
+
+def test_not_a_tty_skips_tput():
+    supported, calls = _detect(tty=False)
+    assert supported is False
+    assert calls == []
+
+
+def test_env_override():
+    supported, calls = _detect({color.COLOR_ENV: "always"}, tty=False)
+    assert supported is True
+    assert calls == []
+    supported, calls = _detect({color.COLOR_ENV: "never"}, tty=True)
+    assert supported is False
+    assert calls == []
+
+
+def test_no_color():
+    supported, calls = _detect({color.NO_COLOR_ENV: ""}, tty=True)
+    assert supported is False
+    assert calls == []
+    supported, _ = _detect(
+        {color.NO_COLOR_ENV: "1", color.COLOR_ENV: "always"}, tty=True
+    )
+    assert supported is True
+
+
+def test_cached_and_set_color():
+    saved = os.environ.get(color.COLOR_ENV)
+    try:
+        color.set_color("never")
+        assert color.color_text(text="abc") == "abc"
+        color._supports_color = True
+        assert color.supports_color() is True
+        color.set_color("always")
+        assert color.color_text(text="abc") == color.ansi_text(text="abc")
+    finally:
+        if saved is None:
+            os.environ.pop(color.COLOR_ENV, None)
+        else:
+            os.environ[color.COLOR_ENV] = saved
+        color._supports_color = None
+
+
+if __name__ == "__main__":
+    import traceback
+    _tests = filter(
+        lambda key: True if key.startswith("test_") else False,
+        globals().keys()
+    )
+
+    failed = []
+    for test in _tests:
+        try:
+            print("Running %s" % test)
+            globals()[test]()
+            print("    %s succeeded!" % test)
+        except AssertionError as err:
+            print("    %s failed!" % test)
+            failed.append((test, traceback.format_exc()))
+        print("")
+    for failure_name, failure_error in failed:
+        print("""
+------------ %s FAILED ------------
+%s
+""" % (failure_name, failure_error))
+
+    print(
+        "\n\n%d failures, %d success, %s%%" % (
+            len(failed),
+            len(_tests)-len(failed),
+            "%.1f" % ((float(len(_tests)-len(failed))/len(_tests))*100)
+        )
+    )
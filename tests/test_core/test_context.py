@@ -0,0 +1,92 @@
+import threading
+
+from qt_py_convert.run import run
+from qt_py_convert.general import ConversionContext
+
+
+UNSUPPORTED = """from PyQt4 import QtGui, uic
+
+form, base = uic.loadUiType("foo.ui")
+w = QtGui.QWidget()
+"""
+
+SUPPORTED = """from PySide import QtGui
+
+w = QtGui.QWidget()
+"""
+
+
+def test_run_creates_a_context():
+    aliases, mappings, dumps = run(UNSUPPORTED, True)
+    assert isinstance(aliases, ConversionContext)
+    assert len(aliases["errors"]) == 1
+
+
+def test_run_uses_passed_context():
+    context = ConversionContext()
+    aliases, mappings, dumps = run(UNSUPPORTED, True, context=context)
+    assert aliases is context
+    assert len(context["errors"]) == 1
+
+
+def test_contexts_do_not_leak():
+    run(UNSUPPORTED, True)
+    aliases, mappings, dumps = run(SUPPORTED, True)
+    assert not aliases["errors"]
+    assert aliases["bindings"] == set(["PySide"])
+
+
+def test_threaded_conversions():
+    results = {}
+
+    def _convert(name, source):
+        for _ in range(5):
+            results.setdefault(name, []).append(run(source, True)[0])
+
+    threads = [
+        threading.Thread(target=_convert, args=("unsupported", UNSUPPORTED)),
+        threading.Thread(target=_convert, args=("supported", SUPPORTED)),
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    for aliases in results["unsupported"]:
+        assert len(aliases["errors"]) == 1
+        assert aliases["bindings"] == set(["PyQt4"])
+    for aliases in results["supported"]:
+        assert not aliases["errors"]
+        assert aliases["bindings"] == set(["PySide"])
+
+
+if __name__ == "__main__":
+    import traceback
+    _tests = filter(
+        lambda key: True if key.startswith("test_") else False,
+        globals().keys()
+    )
+
+    failed = []
+    for test in _tests:
+        try:
+            print("Running %s" % test)
+            globals()[test]()
+            print("    %s succeeded!" % test)
+        except AssertionError as err:
+            print("    %s failed!" % test)
+            failed.append((test, traceback.format_exc()))
+        print("")
+    for failure_name, failure_error in failed:
+        print("""
+------------ %s FAILED ------------
+%s
+""" % (failure_name, failure_error))
+
+    print(
+        "\n\n%d failures, %d success, %s%%" % (
+            len(failed),
+            len(_tests)-len(failed),
+            "%.1f" % ((float(len(_tests)-len(failed))/len(_tests))*100)
+        )
+    )
@@ -0,0 +1,130 @@
+from qt_py_convert.edits import SpanEdits
+from qt_py_convert.general import ConversionContext
+from qt_py_convert.run import run, _span_edits_error
+
+
+SOURCE = "abcdefghij"
+
+
+def test_apply_without_edits():
+    assert SpanEdits(SOURCE).apply() == SOURCE
+
+
+def test_edits_are_trimmed():
+    edits = SpanEdits(SOURCE)
+    assert edits.add(0, 4, "abXd")
+    assert edits._edits == [(2, 3, "X")]
+    assert edits.apply() == "abXdefghij"
+
+
+def test_edit_of_edited_text():
+    edits = SpanEdits(SOURCE)
+    assert edits.add(0, 3, "")
+    # Offsets in the replacement are relative to text_of, not the source.
+    assert edits.text_of(0, 6) == "def"
+    assert edits.add(0, 6, "dXf")
+    assert edits.apply() == "dXfghij"
+
+
+def test_covering_edit_replaces_earlier_ones():
+    edits = SpanEdits(SOURCE)
+    assert edits.add(2, 3, "X")
+    assert edits.add(6, 7, "Y")
+    assert edits.add(0, 10, "Z")
+    assert len(edits) == 1
+    assert edits.apply() == "Z"
+
+
+def test_edit_inside_edit_is_dropped():
+    edits = SpanEdits(SOURCE)
+    assert edits.add(2, 6, "XY")
+    assert not edits.add(3, 4, "Q")
+    assert not edits.add(5, 8, "Q")
+    assert edits.dropped == [(3, 4, "Q"), (5, 8, "Q")]
+    assert edits.apply() == "abXYghij"
+
+
+def test_touched():
+    edits = SpanEdits(SOURCE)
+    assert edits.add(2, 3, "X")
+    assert edits.touched(0, 3)
+    assert edits.touched(2, 6)
+    assert not edits.touched(0, 2)
+    assert not edits.touched(3, 6)
+
+
+def test_span_edits_match_the_tree():
+    source = """from PyQt4 import QtGui
+import sip
+
+w = QtGui.QWidget(QtGui.QLabel("a"))
+w.connect(w, QtCore.SIGNAL("clicked()"), w.close)
+sip.wrapinstance(long(ptr), QtGui.QWidget)"""
+    _, _, tree_dumps = run(source, True, True)
+    _, _, span_dumps = run(source, True, True, span_edits_flag=True)
+    assert span_dumps == tree_dumps
+
+
+def _check_invalid_span_edits(source):
+    context = ConversionContext()
+    _, _, dumps = run(
+        source, True, True, span_edits_flag=True, context=context
+    )
+    assert dumps == source
+    assert len(context[context.ERRORS]) == 1
+    reason = list(context[context.ERRORS])[0].reason
+    assert "span edits" in reason
+
+
+def test_span_edits_error():
+    text = "v = f(1)\n"
+    edits = SpanEdits(text)
+    assert _span_edits_error(text, edits.apply(), edits) is None
+    edits.add(4, 8, "g(2)")
+    assert _span_edits_error(text, edits.apply(), edits) is None
+    edits.add(0, 1, "(")
+    assert _span_edits_error(text, edits.apply(), edits) is not None
+
+
+def test_invalid_span_edits_of_a_call_are_not_written():
+    _check_invalid_span_edits(
+        "from PyQt4 import QtCore\nv = QtCore.QVariant(1).toPyObject()\n"
+    )
+
+
+def test_invalid_span_edits_of_aliased_imports_are_not_written():
+    _check_invalid_span_edits(
+        "from PyQt4 import QtGui as G, QtCore as C\nw = G.QWidget()\n"
+    )
+
+
+if __name__ == "__main__":
+    import traceback
+    _tests = filter(
+        lambda key: True if key.startswith("test_") else False,
+        globals().keys()
+    )
+
+    failed = []
+    for test in _tests:
+        try:
+            print("Running %s" % test)
+            globals()[test]()
+            print("    %s succeeded!" % test)
+        except AssertionError as err:
+            print("    %s failed!" % test)
+            failed.append((test, traceback.format_exc()))
+        print("")
+    for failure_name, failure_error in failed:
+        print("""
+------------ %s FAILED ------------
+%s
+""" % (failure_name, failure_error))
+
+    print(
+        "\n\n%d failures, %d success, %s%%" % (
+            len(failed),
+            len(_tests)-len(failed),
+            "%.1f" % ((float(len(_tests)-len(failed))/len(_tests))*100)
+        )
+    )
@@ -0,0 +1,108 @@
+import redbaron
+
+from qt_py_convert import lines
+from qt_py_convert.general import ConversionContext, ErrorClass
+
+
+SOURCE = """from PyQt4 import (
+    QtCore,
+    QtGui,
+)
+
+
+class Widget(QtGui.QWidget):
+    def __init__(self):
+        super(Widget, self).__init__()
+        self.timer = QtCore.QTimer(
+            self
+        )
+"""
+
+
+def _bbox_lines(node):
+    bbox = node.absolute_bounding_box
+    return bbox.top_left.line - 1, bbox.bottom_right.line - 1
+
+
+def test_lines_match_bounding_box():
+    red = redbaron.RedBaron(SOURCE)
+    index = lines.LineIndex(red)
+    nodes = red.find_all("AtomTrailersNode") + red.find_all("NameNode")
+    nodes += red.find_all("ClassNode") + red.find_all("DefNode")
+    assert nodes
+    for node in nodes:
+        assert index.node_lines(node) == _bbox_lines(node)
+
+
+def test_lines_of_original_source():
+    red = redbaron.RedBaron(SOURCE)
+    lines.track(red)
+    timer = red.find_all("AtomTrailersNode")[-1]
+    assert lines.node_lines(timer) == (9, 11)
+    # Taking lines out before the node does not move it.
+    red.find("FromImportNode").replace("from Qt import QtCore, QtGui")
+    assert lines.node_lines(timer) == (9, 11)
+    assert _bbox_lines(timer) != (9, 11)
+
+
+def test_untracked_falls_back():
+    red = redbaron.RedBaron(SOURCE)
+    node = red.find("ClassNode")
+    assert lines.node_lines(node) == _bbox_lines(node)
+
+
+def test_lines_before_the_first_lookup():
+    red = redbaron.RedBaron(SOURCE)
+    lines.track(red)
+    # The tree is edited before any line is asked for.
+    red.find("FromImportNode").replace("from Qt import QtCore, QtGui")
+    timer = red.find_all("AtomTrailersNode")[-1]
+    assert _bbox_lines(timer) != (9, 11)
+    assert lines.node_lines(timer) == (9, 11)
+
+
+def test_lazy_index_is_built_on_first_lookup():
+    red = redbaron.RedBaron(SOURCE)
+    lines.track(red, lazy=True)
+    assert lines._indexes[red] is None
+    lines.node_lines(red.find("ClassNode"))
+    assert isinstance(lines._indexes[red], lines.LineIndex)
+
+
+def test_error_without_lines():
+    context = ConversionContext()
+    error = ErrorClass.from_node(object(), "reason", context)
+    assert (error.row, error.row_to) == (0, 0)
+    assert error in context[context.ERRORS]
+
+
+if __name__ == "__main__":
+    import traceback
+    _tests = filter(
+        lambda key: True if key.startswith("test_") else False,
+        globals().keys()
+    )
+
+    failed = []
+    for test in _tests:
+        try:
+            print("Running %s" % test)
+            globals()[test]()
+            print("    %s succeeded!" % test)
+        except AssertionError as err:
+            print("    %s failed!" % test)
+            failed.append((test, traceback.format_exc()))
+        print("")
+    for failure_name, failure_error in failed:
+        print("""
+------------ %s FAILED ------------
+%s
+""" % (failure_name, failure_error))
+
+    print(
+        "\n\n%d failures, %d success, %s%%" % (
+            len(failed),
+            len(_tests)-len(failed),
+            "%.1f" % ((float(len(_tests)-len(failed))/len(_tests))*100)
+        )
+    )
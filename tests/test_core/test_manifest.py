@@ -0,0 +1,144 @@
+import os
+import shutil
+import tempfile
+
+from qt_py_convert import manifest
+from qt_py_convert.cache import ResultCache, environment_key
+from qt_py_convert.general import FileResult, WriteFlag
+from qt_py_convert.manifest import Manifest
+from qt_py_convert.run import _manifest_environment, _manifest_path
+
+
+def _write(path, text):
+    with open(path, "w") as fh:
+        fh.write(text)
+
+
+def test_manifest_skips_unchanged():
+    folder = tempfile.mkdtemp()
+    try:
+        source = os.path.join(folder, "source.py")
+        _write(source, "from Qt import QtWidgets\n")
+        path = os.path.join(folder, manifest.MANIFEST_NAME)
+        environment = environment_key()
+
+        records = Manifest(path, environment)
+        assert not records.unchanged(source)
+        records.record(FileResult(source, changed=True))
+        records.save()
+
+        records = Manifest(path, environment)
+        assert records.unchanged(source)
+        # Only the modified time moved, the content hash decides.
+        os.utime(source, (1, 1))
+        assert records.unchanged(source)
+        _write(source, "from Qt import QtGui\n\n")
+        assert not records.unchanged(source)
+
+        # Different flags, the old manifest does not apply.
+        assert not Manifest(path, environment_key(tometh_flag=True)).entries
+    finally:
+        shutil.rmtree(folder)
+
+
+def test_manifest_retries_errors():
+    folder = tempfile.mkdtemp()
+    try:
+        source = os.path.join(folder, "source.py")
+        _write(source, "from PyQt4 import uic\n")
+        records = Manifest(
+            os.path.join(folder, manifest.MANIFEST_NAME), environment_key()
+        )
+        records.record(FileResult(source, errors=["uic is not supported"]))
+        assert records.entries[source]["outcome"] == manifest.ERRORS
+        assert not records.unchanged(source)
+        records.record(FileResult(source, aborted=True))
+        assert not records.unchanged(source)
+        records.record(FileResult(source, short_circuited=True))
+        assert records.unchanged(source)
+    finally:
+        shutil.rmtree(folder)
+
+
+def test_manifest_follows_the_output():
+    folder = tempfile.mkdtemp()
+    try:
+        source_folder = os.path.join(folder, "src")
+        os.makedirs(source_folder)
+        source = os.path.join(source_folder, "a.py")
+        _write(source, "from PyQt4 import QtGui\n")
+        path = os.path.join(folder, manifest.MANIFEST_NAME)
+
+        def _environment(destination, backup=False):
+            return _manifest_environment(
+                write_mode=WriteFlag.WRITE_TO_FILE,
+                path=(source_folder, os.path.join(folder, destination)),
+                backup=backup
+            )
+
+        # The first run writes out1/a.py.
+        output = os.path.join(folder, "out1", "a.py")
+        os.makedirs(os.path.dirname(output))
+        _write(output, "from Qt import QtWidgets\n")
+        records = Manifest(path, _environment("out1"))
+        records.record(FileResult(source, changed=True, output=output))
+        records.save()
+        assert Manifest(path, _environment("out1")).unchanged(source)
+
+        # Writing somewhere else, or with backups, converts it again.
+        assert not Manifest(path, _environment("out2")).unchanged(source)
+        assert not Manifest(
+            path, _environment("out1", backup=True)
+        ).unchanged(source)
+
+        # So does editing or removing the output.
+        _write(output, "from Qt import QtWidgets, QtGui\n")
+        assert not Manifest(path, _environment("out1")).unchanged(source)
+        os.remove(output)
+        assert not Manifest(path, _environment("out1")).unchanged(source)
+    finally:
+        shutil.rmtree(folder)
+
+
+def test_manifest_path():
+    folder = tempfile.mkdtemp()
+    try:
+        # Nothing is written into the source tree without a cache.
+        assert _manifest_path() is None
+        cache = ResultCache(folder)
+        assert _manifest_path(cache=cache) == \
+            os.path.join(cache.path, manifest.MANIFEST_NAME)
+    finally:
+        shutil.rmtree(folder)
+
+
+if __name__ == "__main__":
+    import traceback
+    _tests = filter(
+        lambda key: True if key.startswith("test_") else False,
+        globals().keys()
+    )
+
+    failed = []
+    for test in _tests:
+        try:
+            print("Running %s" % test)
+            globals()[test]()
+            print("    %s succeeded!" % test)
+        except AssertionError as err:
+            print("    %s failed!" % test)
+            failed.append((test, traceback.format_exc()))
+        print("")
+    for failure_name, failure_error in failed:
+        print("""
+------------ %s FAILED ------------
+%s
+""" % (failure_name, failure_error))
+
+    print(
+        "\n\n%d failures, %d success, %s%%" % (
+            len(failed),
+            len(_tests)-len(failed),
+            "%.1f" % ((float(len(_tests)-len(failed))/len(_tests))*100)
+        )
+    )
@@ -0,0 +1,81 @@
+from qt_py_convert import mappings
+from qt_py_convert.mappings import misplaced_members
+from qt_py_convert.qt_members import Qt
+
+
+def _dest(value):
+    if isinstance(value, (list, tuple)):
+        return value[0]
+    return value
+
+
+def test_misplaced_members():
+    pyqt4 = Qt._misplaced_members["PyQt4"]
+    aliases, result = misplaced_members(
+        {"bindings": set(["PyQt4"])},
+        {
+            "pyqtSignal": "QtCore.pyqtSignal",
+            "QObject": "QtCore.QObject",
+        }
+    )
+    assert result["pyqtSignal"] == _dest(pyqt4["QtCore.pyqtSignal"])
+    assert result["QObject"] == "QtCore.QObject"
+    # Referenced members are not added, everything else is.
+    assert "QtCore.pyqtSignal" not in result
+    for source, dest in pyqt4.items():
+        if source != "QtCore.pyqtSignal":
+            assert result[source] == _dest(dest)
+
+    # Nothing to do without a binding.
+    assert misplaced_members({"bindings": set()}, {"a": "b"})[1] == {"a": "b"}
+
+
+def test_misplaced_tables_are_not_shared_state():
+    before = dict(
+        (binding, dict(members))
+        for binding, members in Qt._misplaced_members.items()
+    )
+    first = misplaced_members({"bindings": set(["PyQt4", "sip"])}, {})[1]
+    misplaced_members({"bindings": set(["PySide"])}, {"x": "y"})
+    second = misplaced_members({"bindings": set(["sip", "PyQt4"])}, {})[1]
+    assert first == second
+    assert dict(
+        (binding, dict(members))
+        for binding, members in Qt._misplaced_members.items()
+    ) == before
+
+    # Built once for each combination of bindings.
+    assert mappings._misplaced_table(["sip", "PyQt4"]) is \
+        mappings._misplaced_table(set(["PyQt4", "sip"]))
+
+
+if __name__ == "__main__":
+    import traceback
+    _tests = filter(
+        lambda key: True if key.startswith("test_") else False,
+        globals().keys()
+    )
+
+    failed = []
+    for test in _tests:
+        try:
+            print("Running %s" % test)
+            globals()[test]()
+            print("    %s succeeded!" % test)
+        except AssertionError as err:
+            print("    %s failed!" % test)
+            failed.append((test, traceback.format_exc()))
+        print("")
+    for failure_name, failure_error in failed:
+        print("""
+------------ %s FAILED ------------
+%s
+""" % (failure_name, failure_error))
+
+    print(
+        "\n\n%d failures, %d success, %s%%" % (
+            len(failed),
+            len(_tests)-len(failed),
+            "%.1f" % ((float(len(_tests)-len(failed))/len(_tests))*100)
+        )
+    )
@@ -0,0 +1,175 @@
+import os
+import shutil
+import tempfile
+import time
+
+from qt_py_convert.parallel import batch_by_size, imap_guarded, \
+    largest_first
+
+
+def _write(folder, name, size):
+    path = os.path.join(folder, name)
+    with open(path, "w") as fh:
+        fh.write("#" * size)
+    return path
+
+
+def test_largest_first_by_size():
+    folder = tempfile.mkdtemp()
+    try:
+        small = _write(folder, "small.py", 10)
+        large = _write(folder, "large.py", 1000)
+        medium = _write(folder, "medium.py", 100)
+        other = _write(folder, "other.py", 100)
+        missing = os.path.join(folder, "missing.py")
+        assert largest_first([small, medium, missing, large, other]) == \
+            [large, medium, other, small, missing]
+    finally:
+        shutil.rmtree(folder)
+
+
+def test_largest_first_by_history():
+    folder = tempfile.mkdtemp()
+    try:
+        small = _write(folder, "small.py", 10)
+        large = _write(folder, "large.py", 1000)
+        medium = _write(folder, "medium.py", 100)
+        history = {
+            # The small file has been slow before, it goes first.
+            os.path.abspath(small): (10, 5.0),
+            os.path.abspath(large): (1000, 1.0),
+            # The medium file changed since, it is estimated from its size.
+            os.path.abspath(medium): (50, 0.0),
+        }
+        # 6 seconds over 1060 bytes, 100 bytes are about 0.57 seconds.
+        assert largest_first([large, medium, small], history=history) == \
+            [small, large, medium]
+    finally:
+        shutil.rmtree(folder)
+
+
+def test_batch_by_size():
+    folder = tempfile.mkdtemp()
+    try:
+        large = _write(folder, "large.py", 5000)
+        small = [
+            _write(folder, "small_%d.py" % index, 300) for index in range(10)
+        ]
+        files = [large] + small
+        batches = batch_by_size(files, 1, batch_size=1000)
+        assert batches[0] == [large]
+        assert [fp for batch in batches for fp in batch] == files
+        assert [len(batch) for batch in batches[1:]] == [3, 3, 3, 1]
+
+        # Every worker gets several batches, even when they would all fit
+        #   in a single one.
+        batches = batch_by_size(small, 1, batch_size=1000000)
+        assert [len(batch) for batch in batches] == [2] * 5
+        assert batch_by_size(small, 2, batch_size=0) == [[fp] for fp in small]
+    finally:
+        shutil.rmtree(folder)
+
+
+def _convert(item):
+    if item == "hang":
+        time.sleep(60)
+    elif item == "crash":
+        os._exit(1)
+    return item, os.getpid()
+
+
+def _failed(item, reason):
+    return item, reason
+
+
+def test_imap_guarded_timeout():
+    batches = [["a", "hang", "b"], ["c"], ["crash", "d"]]
+    start = time.time()
+    results = dict(
+        item for batch in imap_guarded(
+            _convert, batches, 2, timeout=1, on_failure=_failed
+        )
+        for item in batch
+    )
+    assert time.time() - start < 30
+    assert sorted(results) == ["a", "b", "c", "crash", "d", "hang"]
+    assert "1 seconds" in results["hang"]
+    assert "exited" in results["crash"]
+    for item in "abcd":
+        assert isinstance(results[item], int)
+
+
+def test_imap_guarded_crash_in_batch():
+    batches = [["a", "crash", "b", "c"]]
+    results = [
+        item
+        for batch in imap_guarded(_convert, batches, 1, on_failure=_failed)
+        for item in batch
+    ]
+    assert sorted(item for item, _ in results) == ["a", "b", "c", "crash"]
+    results = dict(results)
+    assert "exited" in results["crash"]
+    for item in "abc":
+        assert isinstance(results[item], int)
+    assert results["a"] != results["b"]
+
+
+def test_imap_guarded_without_batches():
+    assert list(imap_guarded(_convert, [], 2)) == []
+    assert list(imap_guarded(_convert, [[], []], 2)) == []
+
+
+def test_imap_guarded_max_items():
+    batches = [[index] for index in range(6)]
+    pids = [
+        pid
+        for batch in imap_guarded(_convert, batches, 1, max_items=2)
+        for _, pid in batch
+    ]
+    assert pids[0] == pids[1]
+    assert pids[2] == pids[3]
+    assert len(set(pids)) == 3
+    assert os.getpid() not in pids
+
+
+def test_imap_guarded_max_items_splits_batches():
+    batches = [list(range(5)), list(range(5, 8))]
+    results = list(imap_guarded(_convert, batches, 1, max_items=2))
+    assert [len(result) for result in results] == [2, 2, 1, 1, 2]
+    items = sorted(item for result in results for item, _ in result)
+    assert items == list(range(8))
+    for result in results:
+        assert len(set(pid for _, pid in result)) == 1
+    assert len(set(pid for result in results for _, pid in result)) == 4
+
+
+if __name__ == "__main__":
+    import traceback
+    _tests = filter(
+        lambda key: True if key.startswith("test_") else False,
+        globals().keys()
+    )
+
+    failed = []
+    for test in _tests:
+        try:
+            print("Running %s" % test)
+            globals()[test]()
+            print("    %s succeeded!" % test)
+        except AssertionError as err:
+            print("    %s failed!" % test)
+            failed.append((test, traceback.format_exc()))
+        print("")
+    for failure_name, failure_error in failed:
+        print("""
+------------ %s FAILED ------------
+%s
+""" % (failure_name, failure_error))
+
+    print(
+        "\n\n%d failures, %d success, %s%%" % (
+            len(failed),
+            len(_tests)-len(failed),
+            "%.1f" % ((float(len(_tests)-len(failed))/len(_tests))*100)
+        )
+    )
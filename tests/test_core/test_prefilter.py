@@ -0,0 +1,59 @@
+from qt_py_convert.general import references_bindings
+
+
+def test_binding_import_is_referenced():
+    assert references_bindings("from PyQt4 import QtGui\n")
+    assert references_bindings("import PySide2.QtWidgets\n")
+    assert references_bindings("from PyQt5.QtCore import Qt\n")
+
+
+def test_suplimentary_binding_is_referenced():
+    assert references_bindings("import sip\nsip.setapi('QString', 2)\n")
+    assert references_bindings("import shiboken\n")
+
+
+def test_qt_py_is_referenced():
+    assert references_bindings("from Qt import QtGui\n")
+    assert references_bindings("import Qt\nQt.QtCompat.wrapInstance(1)\n")
+
+
+def test_plain_python_is_not_referenced():
+    assert not references_bindings("import os\nprint(os.getcwd())\n")
+    assert not references_bindings("")
+
+
+def test_partial_names_are_not_referenced():
+    assert not references_bindings("import mysip\nPyQt4Helper = 1\n")
+    assert not references_bindings("QtGuiThing = None\n")
+
+
+if __name__ == "__main__":
+    import traceback
+    _tests = filter(
+        lambda key: True if key.startswith("test_") else False,
+        globals().keys()
+    )
+
+    failed = []
+    for test in _tests:
+        try:
+            print("Running %s" % test)
+            globals()[test]()
+            print("    %s succeeded!" % test)
+        except AssertionError as err:
+            print("    %s failed!" % test)
+            failed.append((test, traceback.format_exc()))
+        print("")
+    for failure_name, failure_error in failed:
+        print("""
+------------ %s FAILED ------------
+%s
+""" % (failure_name, failure_error))
+
+    print(
+        "\n\n%d failures, %d success, %s%%" % (
+            len(failed),
+            len(_tests)-len(failed),
+            "%.1f" % ((float(len(_tests)-len(failed))/len(_tests))*100)
+        )
+    )
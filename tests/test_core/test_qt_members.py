@@ -0,0 +1,132 @@
+import json
+import os
+import shutil
+import tempfile
+
+from qt_py_convert import qt_members
+
+
+def _dest(value):
+    if isinstance(value, (list, tuple)):
+        return value[0]
+    return value
+
+
+def test_snapshot_matches_qt():
+    snapshot = qt_members.from_snapshot()
+    live = qt_members.live()
+    assert snapshot is not None
+    assert snapshot.__version__ == live.__version__
+    assert dict(snapshot._common_members) == dict(live._common_members)
+    assert sorted(snapshot._misplaced_members) == \
+        sorted(live._misplaced_members)
+    for binding, members in live._misplaced_members.items():
+        assert dict(
+            (source, _dest(dest))
+            for source, dest in snapshot._misplaced_members[binding].items()
+        ) == dict((source, _dest(dest)) for source, dest in members.items())
+
+
+def test_generate_round_trip():
+    folder = tempfile.mkdtemp()
+    try:
+        path = os.path.join(folder, "members.json")
+        qt_members.generate(path)
+        members = qt_members.from_snapshot(path)
+        assert members.source == "snapshot"
+        assert "QtWidgets" in members._common_members
+        for misplaced in members._misplaced_members.values():
+            for dest in misplaced.values():
+                if isinstance(dest, list):
+                    assert dest[1] is None
+    finally:
+        shutil.rmtree(folder)
+
+
+def test_unusable_snapshot_falls_back_to_live():
+    folder = tempfile.mkdtemp()
+    try:
+        path = os.path.join(folder, "members.json")
+        assert qt_members.from_snapshot(path) is None
+        assert qt_members.load(path).source == "live"
+
+        with open(path, "w") as fh:
+            json.dump({"snapshot_version": -1}, fh)
+        assert qt_members.from_snapshot(path) is None
+        assert qt_members.load(path).source == "live"
+    finally:
+        shutil.rmtree(folder)
+
+
+def test_live_members_environment():
+    os.environ[qt_members.LIVE_MEMBERS_ENV] = "1"
+    try:
+        assert qt_members.load().source == "live"
+    finally:
+        del os.environ[qt_members.LIVE_MEMBERS_ENV]
+    assert qt_members.load().source == "snapshot"
+
+
+def test_other_installed_version_uses_snapshot():
+    saved_live = qt_members.live
+    saved_version = qt_members._installed_version
+
+    def _live():
+        raise AssertionError("Qt.py should not be imported.")
+
+    qt_members.live = _live
+    qt_members._installed_version = lambda: "0.0.0-other"
+    try:
+        assert qt_members.load().source == "snapshot"
+    finally:
+        qt_members.live = saved_live
+        qt_members._installed_version = saved_version
+
+
+def test_failed_live_import_falls_back_to_snapshot():
+    saved_live = qt_members.live
+
+    def _live():
+        raise ImportError("No Qt binding were found.")
+
+    qt_members.live = _live
+    folder = tempfile.mkdtemp()
+    try:
+        # An unusable snapshot falls back to the one that ships with us.
+        members = qt_members.load(os.path.join(folder, "missing.json"))
+        assert members.source == "snapshot"
+    finally:
+        qt_members.live = saved_live
+        shutil.rmtree(folder)
+
+
+if __name__ == "__main__":
+    import traceback
+    _tests = filter(
+        lambda key: True if key.startswith("test_") else False,
+        globals().keys()
+    )
+
+    failed = []
+    for test in _tests:
+        try:
+            print("Running %s" % test)
+            globals()[test]()
+            print("    %s succeeded!" % test)
+        except AssertionError as err:
+            print("    %s failed!" % test)
+            failed.append((test, traceback.format_exc()))
+        print("")
+    for failure_name, failure_error in failed:
+        print("""
+------------ %s FAILED ------------
+%s
+""" % (failure_name, failure_error))
+
+    print(
+        "\n\n%d failures, %d success, %s%%" % (
+            len(failed),
+            len(_tests)-len(failed),
+            "%.1f" % ((float(len(_tests)-len(failed))/len(_tests))*100)
+        )
+    )
@@ -1,5 +1,6 @@
 from qt_py_convert.run import run
 from qt_py_convert.diff import highlight_diffs
+from qt_py_convert.mappings import attribute_module, convert_mappings
 
 
 def check(source, dest):
@@ -41,6 +42,47 @@ x = 42"""
     )
 
 
+def test_qline_attribute_replacement():
+    aliases, mappings, dumps = run(
+        """from PyQt4 import QtGui
+
+edit = QtGui.QLineEdit()
+line = QtGui.QLine(0, 0, 1, 1)
+font = QtGui.QFont
+""", True, True)
+    # The order of the modules in the import is not stable.
+    assert dumps.splitlines()[1:] == [
+        "",
+        "edit = QtWidgets.QLineEdit()",
+        "line = QtCore.QLine(0, 0, 1, 1)",
+        "font = QtGui.QFont",
+    ]
+    assert aliases["used"] >= set(["QtCore", "QtGui", "QtWidgets"])
+
+
+def test_member_lookup():
+    assert attribute_module("QtGui.QLineEdit().text()") == \
+        ("QtWidgets", "QLineEdit().text()")
+    assert attribute_module("QtGui.QLine[0]") == ("QtCore", "QLine[0]")
+    assert attribute_module("QtGui.QLineEditor()") is None
+    assert attribute_module("QtGui.QLineEdit ()") is None
+    assert attribute_module("PyQt4.QtGui.QLineEdit") is None
+    assert attribute_module("QLineEdit") is None
+
+    mappings = convert_mappings(set(), {
+        "QLineEdit": "QtGui.QLineEdit",
+        "QLine": "PyQt4.QtGui.QLine",
+        "QtGui": "PyQt4.QtGui",
+        "loadUi": "QtCompat.loadUi",
+    })
+    assert mappings == {
+        "QLineEdit": "QtWidgets.QLineEdit",
+        "QLine": "PyQt4.QtCore.QLine",
+        "QtGui": "PyQt4.QtGui",
+        "loadUi": "QtCompat.loadUi",
+    }
+
+
 def test_refchef_bug_replacement():
     check(
         """from PyQt4.QtCore import *
@@ -0,0 +1,181 @@
+import multiprocessing
+import os
+import shutil
+import tempfile
+import time
+
+from qt_py_convert import server as server_module
+from qt_py_convert.client import Client, ServerError, convert
+from qt_py_convert.server import ConversionServer
+
+
+SOURCE = """\
+from PyQt4 import QtGui
+widget = QtGui.QWidget()
+"""
+
+
+def _start(folder, **kwargs):
+    # The server runs in a process of its own like it would for real. The
+    #   connection processes it forks must not inherit the client sockets.
+    server = ConversionServer(os.path.join(folder, "convert.sock"), **kwargs)
+    process = multiprocessing.Process(target=server.serve)
+    process.daemon = True
+    process.start()
+    server.server_close()
+    return server, process
+
+
+def test_convert_over_socket():
+    folder = tempfile.mkdtemp()
+    try:
+        server, process = _start(folder)
+        with Client(server.socket_path) as client:
+            converted, changed, errors = client.convert(
+                SOURCE, skip_lineno=True
+            )
+            assert changed
+            assert errors == []
+            assert converted == (
+                "from Qt import QtWidgets\n"
+                "widget = QtWidgets.QWidget()\n"
+            )
+
+            # Several requests are answered on the same connection.
+            converted, changed, errors = client.convert("import os\n")
+            assert converted == "import os\n"
+            assert not changed
+
+            try:
+                client.convert(SOURCE, not_a_flag=True)
+            except TypeError:
+                pass
+            else:
+                assert False, "Unknown flags should be rejected."
+
+        assert convert(server.socket_path, SOURCE)[1]
+
+        with Client(server.socket_path) as client:
+            try:
+                client.request({"command": "unknown"})
+            except ServerError:
+                pass
+            else:
+                assert False, "Unknown commands should fail."
+            client.shutdown()
+        process.join(10)
+        assert not process.is_alive()
+        assert not os.path.exists(server.socket_path)
+    finally:
+        shutil.rmtree(folder)
+
+
+def test_stale_socket_is_replaced():
+    folder = tempfile.mkdtemp()
+    try:
+        path = os.path.join(folder, "convert.sock")
+        server = ConversionServer(path)
+        server.server_close()  # Leaves the socket file behind.
+        assert os.path.exists(path)
+
+        server, process = _start(folder)
+        try:
+            ConversionServer(path)
+        except IOError:
+            pass
+        else:
+            assert False, "A live server should not be replaced."
+        with Client(path) as client:
+            client.shutdown()
+        process.join(10)
+    finally:
+        shutil.rmtree(folder)
+
+
+def test_concurrent_clients():
+    folder = tempfile.mkdtemp()
+    try:
+        server, process = _start(folder)
+        with Client(server.socket_path, timeout=10) as first:
+            assert first.convert(SOURCE, skip_lineno=True)[1]
+            # The first client holds on to its connection.
+            with Client(server.socket_path, timeout=10) as second:
+                assert second.convert(SOURCE, skip_lineno=True)[1]
+            assert first.convert("import os\n")[0] == "import os\n"
+            first.shutdown()
+        process.join(10)
+        assert not process.is_alive()
+    finally:
+        shutil.rmtree(folder)
+
+
+def test_timeouts():
+    folder = tempfile.mkdtemp()
+    original = server_module.convert
+
+    def _hang(source, cache=None, **flags):
+        if "hang" in source:
+            time.sleep(30)
+        return original(source, cache=cache, **flags)
+    # Inherited by the connection processes forked off of the server.
+    server_module.convert = _hang
+    try:
+        server, process = _start(
+            folder, connection_timeout=0.5, request_timeout=0.5
+        )
+        with Client(server.socket_path, timeout=10) as client:
+            try:
+                client.convert("# hang\n")
+            except ServerError as err:
+                assert "did not finish" in str(err)
+            else:
+                assert False, "The request should have timed out."
+            assert client.convert(SOURCE, skip_lineno=True)[1]
+
+            # An idle connection is closed by the server.
+            time.sleep(1)
+            try:
+                client.ping()
+            except (ServerError, IOError, OSError):
+                pass
+            else:
+                assert False, "The idle connection should have been closed."
+        with Client(server.socket_path, timeout=10) as client:
+            client.shutdown()
+        process.join(10)
+        assert not process.is_alive()
+    finally:
+        server_module.convert = original
+        shutil.rmtree(folder)
+
+
+if __name__ == "__main__":
+    import traceback
+    _tests = filter(
+        lambda key: True if key.startswith("test_") else False,
+        globals().keys()
+    )
+
+    failed = []
+    for test in _tests:
+        try:
+            print("Running %s" % test)
+            globals()[test]()
+            print("    %s succeeded!" % test)
+        except AssertionError as err:
+            print("    %s failed!" % test)
+            failed.append((test, traceback.format_exc()))
+        print("")
+    for failure_name, failure_error in failed:
+        print("""
+------------ %s FAILED ------------
+%s
+""" % (failure_name, failure_error))
+
+    print(
+        "\n\n%d failures, %d success, %s%%" % (
+            len(failed),
+            len(_tests)-len(failed),
+            "%.1f" % ((float(len(_tests)-len(failed))/len(_tests))*100)
+        )
+    )
@@ -0,0 +1,98 @@
+import json
+import os
+import shutil
+import tempfile
+
+from qt_py_convert.general import FileResult
+from qt_py_convert.run import run
+from qt_py_convert.timings import aggregate, report, timed, write_report
+
+
+SOURCE = """from PyQt4 import QtGui
+
+w = QtGui.QWidget()
+w.emit(QtCore.SIGNAL("done()"))
+"""
+
+
+def test_timed_accumulates():
+    timings = {}
+    with timed(timings, "stage"):
+        pass
+    first = timings["stage"]
+    with timed(timings, "stage"):
+        pass
+    assert timings["stage"] >= first
+    with timed(None, "stage"):  # Nothing to record into.
+        pass
+
+
+def test_run_times_each_stage():
+    timings = {}
+    run(SOURCE, True, timings=timings)
+    for stage in ("parse", "from_imports", "imports", "misplaced_members",
+                  "psep0101", "convert_body", "convert_root_name_imports",
+                  "convert_attributes", "unsupported", "dumps"):
+        assert stage in timings, stage
+
+
+def test_aggregate():
+    results = [
+        FileResult("a.py", timings={"parse": 1.0, "total": 2.0}),
+        FileResult("b.py", timings={"parse": 3.0, "total": 4.0}),
+        FileResult("c.py", short_circuited=True, timings={"total": 0.5}),
+    ]
+    stages = aggregate(results)
+    assert stages["parse"] == {"count": 2, "total": 4.0, "max": 3.0, "mean": 2.0}
+    assert stages["total"]["count"] == 3
+    assert report(results)["aggregate"]["short_circuited"] == 1
+
+
+def test_write_report():
+    folder = tempfile.mkdtemp()
+    try:
+        path = os.path.join(folder, "timings.json")
+        write_report(
+            [FileResult("b.py", changed=True, timings={"parse": 1.0}),
+             FileResult("a.py", timings={"total": 1.0})],
+            path
+        )
+        with open(path) as fh:
+            data = json.load(fh)
+        assert [entry["path"] for entry in data["files"]] == ["a.py", "b.py"]
+        assert data["stages"] == ["parse", "total"]
+        assert data["aggregate"]["changed"] == 1
+    finally:
+        shutil.rmtree(folder)
+
+
+if __name__ == "__main__":
+    import traceback
+    _tests = filter(
+        lambda key: True if key.startswith("test_") else False,
+        globals().keys()
+    )
+
+    failed = []
+    for test in _tests:
+        try:
+            print("Running %s" % test)
+            globals()[test]()
+            print("    %s succeeded!" % test)
+        except AssertionError as err:
+            print("    %s failed!" % test)
+            failed.append((test, traceback.format_exc()))
+        print("")
+    for failure_name, failure_error in failed:
+        print("""
+------------ %s FAILED ------------
+%s
+""" % (failure_name, failure_error))
+
+    print(
+        "\n\n%d failures, %d success, %s%%" % (
+            len(failed),
+            len(_tests)-len(failed),
+            "%.1f" % ((float(len(_tests)-len(failed))/len(_tests))*100)
+        )
+    )
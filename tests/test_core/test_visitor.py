@@ -0,0 +1,196 @@
+import redbaron
+
+from qt_py_convert.visitor import TreeVisitor
+
+
+SOURCE = """from PyQt4 import QtGui
+
+w = QtGui.QWidget(QtGui.QLabel("a"))
+x.y.z = QtGui.QString(w)
+"""
+
+
+def _ids(nodes):
+    return [id(node) for node in nodes]
+
+
+def test_index_matches_find_all():
+    red = redbaron.RedBaron(SOURCE)
+    visitor = TreeVisitor(red)
+    assert _ids(visitor.nodes(visitor.ATOMTRAILERS)) == \
+        _ids(red.find_all("AtomTrailersNode"))
+    assert _ids(visitor.nodes(visitor.DOTTED_NAME)) == \
+        _ids(red.find_all("DottedNameNode"))
+    assert _ids(visitor.nodes(visitor.NAME)) == _ids(red.find_all("NameNode"))
+
+
+def test_find_all_value_filter():
+    red = redbaron.RedBaron(SOURCE)
+    visitor = TreeVisitor(red)
+    names = visitor.find_all(visitor.NAME, value="QtGui")
+    assert _ids(names) == _ids(red.find_all("NameNode", value="QtGui"))
+
+    def starts_with_qtgui(value):
+        return value.dumps().startswith("QtGui.")
+    assert _ids(visitor.find_all(visitor.ATOMTRAILERS, starts_with_qtgui)) == \
+        _ids(red.find_all("AtomTrailersNode", value=starts_with_qtgui))
+
+
+def test_replace_keeps_index_in_order():
+    red = redbaron.RedBaron(SOURCE)
+    visitor = TreeVisitor(red)
+    outer = visitor.nodes(visitor.ATOMTRAILERS)[0]
+    visitor.replace(outer, "QtWidgets.QWidget(QtWidgets.QLabel(\"a\"))")
+    assert _ids(visitor.nodes(visitor.ATOMTRAILERS)) == \
+        _ids(red.find_all("AtomTrailersNode"))
+    assert _ids(visitor.nodes(visitor.NAME)) == _ids(red.find_all("NameNode"))
+
+
+def test_replace_changes_node_type():
+    red = redbaron.RedBaron(SOURCE)
+    visitor = TreeVisitor(red)
+    node = visitor.find_all(
+        visitor.ATOMTRAILERS, lambda value: "QString" in value.dumps()
+    )[0]
+    visitor.replace(node, "w")
+    assert node.type == "name"
+    assert _ids(visitor.nodes(visitor.ATOMTRAILERS)) == \
+        _ids(red.find_all("AtomTrailersNode"))
+    assert _ids(visitor.nodes(visitor.NAME)) == _ids(red.find_all("NameNode"))
+
+
+def test_replace_orphaned_node_is_not_indexed():
+    red = redbaron.RedBaron(SOURCE)
+    visitor = TreeVisitor(red)
+    outer, inner = visitor.nodes(visitor.ATOMTRAILERS)[:2]
+    visitor.replace(outer, "foo()")
+    visitor.replace(inner, "bar()")
+    assert "bar" not in red.dumps()
+    assert _ids(visitor.nodes(visitor.NAME)) == _ids(red.find_all("NameNode"))
+
+
+def test_remove():
+    red = redbaron.RedBaron(SOURCE)
+    visitor = TreeVisitor(red)
+    visitor.remove(red.find("FromImportNode"))
+    assert _ids(visitor.nodes(visitor.DOTTED_NAME)) == \
+        _ids(red.find_all("DottedNameNode"))
+    assert _ids(visitor.nodes(visitor.NAME)) == _ids(red.find_all("NameNode"))
+
+
+def test_names():
+    red = redbaron.RedBaron(SOURCE)
+    visitor = TreeVisitor(red)
+    for value in ("QtGui", "w", "QString", "missing"):
+        assert _ids(visitor.names(value)) == \
+            _ids(red.find_all("NameNode", value=value))
+
+    visitor.replace(visitor.names("w")[0], "widget")
+    assert _ids(visitor.names("widget")) == \
+        _ids(red.find_all("NameNode", value="widget"))
+    assert _ids(visitor.names("w")) == _ids(red.find_all("NameNode", value="w"))
+
+
+def test_is_imported():
+    red = redbaron.RedBaron(SOURCE)
+    visitor = TreeVisitor(red)
+    visitor.replace(red.find("FromImportNode"), "from PyQt4 import QtCore")
+    for node in red.find_all("NameNode") + red.find_all("DottedNameNode"):
+        expected = bool(
+            node.parent_find("ImportNode") or
+            node.parent_find("FromImportNode")
+        )
+        assert visitor.is_imported(node) == expected
+
+
+def test_dispatch():
+    red = redbaron.RedBaron(SOURCE)
+    visitor = TreeVisitor(red)
+    seen = []
+    visitor.register((visitor.ATOMTRAILERS, visitor.NAME), seen.append)
+    visitor.dispatch()
+    assert _ids(seen) == _ids(
+        visitor.nodes(visitor.ATOMTRAILERS) + visitor.nodes(visitor.NAME)
+    )
+
+    # Handlers are only used for a single dispatch.
+    del seen[:]
+    visitor.dispatch()
+    assert not seen
+
+
+
+def test_dumps_is_cached_until_replaced():
+    for span_edits in (False, True):
+        red = redbaron.RedBaron(SOURCE)
+        visitor = TreeVisitor(red, span_edits=span_edits)
+        outer, inner = visitor.nodes(visitor.ATOMTRAILERS)[:2]
+        assert visitor.dumps(outer) == "QtGui.QWidget(QtGui.QLabel(\"a\"))"
+        assert id(outer) in visitor._texts
+
+        # Replacing a part of the node changes its text too.
+        visitor.replace(inner, "QtWidgets.QLabel(\"a\")")
+        assert visitor.dumps(outer) == \
+            "QtGui.QWidget(QtWidgets.QLabel(\"a\"))"
+
+
+def test_leading_name():
+    for span_edits in (False, True):
+        red = redbaron.RedBaron(SOURCE + "(a).b\n")
+        visitor = TreeVisitor(red, span_edits=span_edits)
+        names = [
+            visitor.leading_name(node)
+            for node in visitor.nodes(visitor.ATOMTRAILERS)
+        ]
+        assert names == ["QtGui", "QtGui", "x", "QtGui", None]
+        # Only the node that does not start with a name was serialized.
+        assert list(visitor._texts.values()) == ["(a).b"]
+
+        outer = visitor.nodes(visitor.ATOMTRAILERS)[0]
+        visitor.replace(outer, "QtWidgets.QWidget()")
+        outer = visitor.nodes(visitor.ATOMTRAILERS)[0]
+        assert visitor.leading_name(outer) == "QtWidgets"
+
+
+def test_find_all_name_filter():
+    red = redbaron.RedBaron(SOURCE)
+    visitor = TreeVisitor(red)
+    nodes = visitor.find_all(
+        visitor.ATOMTRAILERS, name="QtGui",
+        text=lambda text: text.startswith("QtGui.QString")
+    )
+    assert [visitor.dumps(node) for node in nodes] == ["QtGui.QString(w)"]
+    # Only the nodes starting with the name were serialized.
+    assert len(visitor._texts) == 3
+
+
+if __name__ == "__main__":
+    import traceback
+    _tests = filter(
+        lambda key: True if key.startswith("test_") else False,
+        globals().keys()
+    )
+
+    failed = []
+    for test in _tests:
+        try:
+            print("Running %s" % test)
+            globals()[test]()
+            print("    %s succeeded!" % test)
+        except AssertionError as err:
+            print("    %s failed!" % test)
+            failed.append((test, traceback.format_exc()))
+        print("")
+    for failure_name, failure_error in failed:
+        print("""
+------------ %s FAILED ------------
+%s
+""" % (failure_name, failure_error))
+
+    print(
+        "\n\n%d failures, %d success, %s%%" % (
+            len(failed),
+            len(_tests)-len(failed),
+            "%.1f" % ((float(len(_tests)-len(failed))/len(_tests))*100)
+        )
+    )
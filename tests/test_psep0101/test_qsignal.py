@@ -563,6 +563,37 @@ def test_connect_jstemplate_explorer_EXTRA_COMMA4():
     )
 
 
+def test_connect_multiline_slot():
+    check_connection(
+        """self.connect(self.button, QtCore.SIGNAL("clicked()"), lambda: self.load(
+    "a, b (c)",
+))""",
+        """self.button.clicked.connect(lambda: self.load(
+    "a, b (c)",
+))"""
+    )
+
+
+def test_emit_brackets_in_string_args():
+    check_emit(
+        """self.emit(SIGNAL("message(QString)"), ")", "(a, b")""",
+        """self.message.emit(")", "(a, b")"""
+    )
+
+
+def test_connect_with_comment_is_untouched():
+    source = """self.connect(self.button,  # The ok button.
+             QtCore.SIGNAL("clicked()"), self.accept)"""
+    check_connection(source, source)
+
+
+def test_connect_new_style_is_untouched():
+    check_connection(
+        "self.button.clicked.connect(self.accept)",
+        "self.button.clicked.connect(self.accept)"
+    )
+
+
 if __name__ == "__main__":
     import traceback
     _tests = filter(
@@ -1,16 +1,18 @@
 from qt_py_convert._modules.psep0101 import process
 from redbaron import redbaron
-from qt_py_convert.general import ALIAS_DICT
+from qt_py_convert.general import ConversionContext
 
 
 def check(source, dest):
     red = redbaron.RedBaron(source)
-    process(red, skip_lineno=True, tometh_flag=False)
+    context = ConversionContext()
+    process(red, context, skip_lineno=True, tometh_flag=False)
     convert = red.dumps()
     try:
         assert convert == dest
     except AssertionError as err:
         raise AssertionError("\n%s\n!=\n%s" % (convert, dest))
+    return context
 
 
 def test_qvariant_basic():
@@ -47,12 +49,12 @@ def test_qvariant_error_basic():
             ):
     pass
 """
-    check(
+    context = check(
         s,
         s,
     )
-    assert len(ALIAS_DICT["errors"]) == 1,\
-        "There are %d errors, there should be 1" % len(ALIAS_DICT["errors"])
+    assert len(context["errors"]) == 1,\
+        "There are %d errors, there should be 1" % len(context["errors"])
 
 
 if __name__ == "__main__":